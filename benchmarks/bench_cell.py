@@ -0,0 +1,45 @@
+"""Per-cell cost of building a colored cell, with and without the interned SGR attribute table
+
+Usage: python benchmarks/bench_cell.py [-n NUMBER]
+"""
+import argparse
+import timeit
+
+from display_colors.cell  import (
+	SGR_RESET,
+	cell_text,
+	colored_cell,
+	create_attrs,
+)
+from display_colors.const import (
+	ALL_WEIGHTS,
+	COLOR_REPR,
+	COLORS,
+	SGR_BEG,
+	SGR_END,
+)
+
+REPRS = ['df'] + [COLOR_REPR[c].lower() for c in COLORS] + [COLOR_REPR[c].upper() for c in COLORS]
+CELLS = [(w, fg, bg, rv) for w in ALL_WEIGHTS for fg in REPRS for bg in REPRS for rv in (False, True)]
+
+def uncached() -> None:
+	for weight, fg, bg, rv in CELLS:
+		attrs = create_attrs.__wrapped__(weight, fg, bg, rev_video = rv)
+		text  = cell_text.__wrapped__(text = 'gYw', cell_w = 7)
+		f'{SGR_BEG}{attrs}{SGR_END}{text}{SGR_RESET}'
+
+def cached() -> None:
+	for weight, fg, bg, rv in CELLS:
+		str(colored_cell(create_attrs(weight, fg, bg, rev_video = rv), cell_text(text = 'gYw', cell_w = 7)))
+
+def main() -> None:
+	parser = argparse.ArgumentParser(description = __doc__.splitlines()[0])
+	parser.add_argument('-n', '--number', type = int, default = 200, help = 'passes over all cell combinations per timing')
+	args = parser.parse_args()
+	cached()                                                         ## Warm the table
+	for name, fn in (('before (per-cell formatting)', uncached), ('after (interned table)', cached)):
+		best = min(timeit.repeat(fn, number = args.number, repeat = 5))
+		print(f'{name:<30} {best / (args.number * len(CELLS)) * 1e9:8.1f} ns/cell')
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,57 @@
+"""Throughput of the render library API called from a thread pool, and a check that concurrent renders match serial ones
+
+Usage: python benchmarks/bench_concurrency.py [-n NUMBER] [--workers N ...]
+
+Every render in every pool is compared with the same render done serially, so a data race in the
+render path fails the run.  On a Python built with the GIL, threads share one core and throughput
+stays near that of one worker; on a free-threaded build it scales with the cores.
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from display_colors import render
+
+## A mix of the palettes a dashboard might ask for at once
+
+JOBS = (
+	(render.four_bit,        {}),
+	(render.four_bit,        {'weights': ['all'], 'reverse_video': True}),
+	(render.four_bit,        {'transpose': True, 'fit': 80}),
+	(render.eight_bit,       {}),
+	(render.eight_bit,       {'decimal': True, 'faces': ['back', 'bottom', 'right'], 'minimal_sgr': True}),
+	(render.eight_bit,       {'fit': 120, 'fmt': 'ansi'}),
+	(render.twenty_four_bit, {'width': 120}),
+	(render.effects,         {'fmt': 'ndjson'}),
+)
+
+def run(job: int) -> str:
+	(fn, kwargs) = JOBS[job % len(JOBS)]
+	return ''.join(fn(**kwargs))
+
+def main() -> None:
+	parser = argparse.ArgumentParser(description = __doc__.splitlines()[0])
+	parser.add_argument('-n', '--number',  type = int, default = 400, help = 'renders per pool size')
+	parser.add_argument('--workers',       type = int, nargs = '+', default = [1, 2, 4, 8, 16], help = 'thread pool sizes')
+	args = parser.parse_args()
+
+	expected = [run(job) for job in range(len(JOBS))]
+	gil      = getattr(sys, '_is_gil_enabled', lambda: True)()
+	print(f'{os.cpu_count()} CPUs, GIL {"enabled" if gil else "disabled"}, {args.number} renders per pool')
+	base = None
+	for workers in args.workers:
+		with ThreadPoolExecutor(max_workers = workers) as pool:
+			start   = time.perf_counter()
+			results = list(pool.map(run, range(args.number)))
+			elapsed = time.perf_counter() - start
+		mismatches = sum(result != expected[job % len(JOBS)] for job, result in enumerate(results))
+		if mismatches:
+			raise SystemExit(f'{workers} workers: {mismatches} renders differ from the serial render')
+		rate = args.number / elapsed
+		base = base or rate
+		print(f'{workers:>3} workers  {rate:9.1f} renders/s  x{rate / base:5.2f}')
+
+if __name__ == '__main__':
+	main()
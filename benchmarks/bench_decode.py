@@ -0,0 +1,42 @@
+"""Megabytes per second decoded by the SGR stream decoder behind the verify command
+
+Usage: python benchmarks/bench_decode.py [-n NUMBER] [--copies N]
+
+Each capture is a command's output repeated --copies times, a few megabytes, decoded in the
+chunks verify reads; the full-SGR and --minimal-sgr captures are then compared.
+"""
+import argparse
+import timeit
+
+from display_colors        import render
+from display_colors.decode import (
+	READ_CHUNK,
+	compare,
+	decode,
+)
+
+CAPTURES = {
+	'4-bit -w all --reverse-video': lambda **kwargs: render.four_bit(weights = ['all'], reverse_video = True, **kwargs),
+	'8-bit':                        lambda **kwargs: render.eight_bit(**kwargs),
+	'24-bit --width 200':           lambda **kwargs: render.twenty_four_bit(width = 200, **kwargs),
+}
+
+def chunks(text: str) -> list[str]:
+	return [text[i:i + READ_CHUNK] for i in range(0, len(text), READ_CHUNK)]
+
+def main() -> None:
+	parser = argparse.ArgumentParser(description = __doc__.splitlines()[0])
+	parser.add_argument('-n', '--number', type = int, default = 3,  help = 'decodes per timing')
+	parser.add_argument('--copies',       type = int, default = 40, help = 'copies of the output in each capture')
+	args = parser.parse_args()
+	for name, fn in CAPTURES.items():
+		for minimal_sgr in (False, True):
+			capture = ''.join(fn(minimal_sgr = minimal_sgr)) * args.copies
+			best    = min(timeit.repeat(lambda: decode(chunks(capture)), number = args.number, repeat = 3)) / args.number
+			label   = f'{name}{" --minimal-sgr" if minimal_sgr else ""}'
+			print(f'{label:<48} {len(capture) / 2 ** 20:6.1f} MiB  {len(capture) / 2 ** 20 / best:6.1f} MiB/s')
+		(full, minimal) = (''.join(fn()) * args.copies, ''.join(fn(minimal_sgr = True)) * args.copies)
+		print(f'{"  compare, full with minimal SGR":<48} {sum(1 for _ in compare(decode(chunks(full)), decode(chunks(minimal))))} differences')
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,51 @@
+"""Colors per second matched to the nearest 8-bit and 4-bit colors, by linear scan and by the Lab bucket index
+
+Usage: python benchmarks/bench_nearest.py [-n NUMBER] [--seed SEED]
+"""
+import argparse
+import random
+import time
+from collections.abc import Callable
+
+from display_colors.colors  import (
+	RGB,
+)
+from display_colors.nearest import (
+	Palette_Index,
+	_4_BIT_INDEX,
+	_8_BIT_INDEX,
+	nearest_codes,
+	rgb_lab,
+)
+
+def brute_force(index: Palette_Index, rgb: RGB) -> object:
+	"""Compare the color with every palette color"""
+	(l, a, b) = rgb_lab(rgb)
+	return min(index.colors, key = lambda color: (l - color[1][0]) ** 2 + (a - color[1][1]) ** 2 + (b - color[1][2]) ** 2)[0]
+
+def brute_force_codes(rgb: RGB) -> tuple[int, str]:
+	return (brute_force(_8_BIT_INDEX, rgb), brute_force(_4_BIT_INDEX, rgb))
+
+def rate(fn: Callable[[RGB], tuple[int, str]], colors: list[RGB]) -> tuple[float, list[tuple[int, str]]]:
+	start   = time.perf_counter()
+	matches = [fn(rgb) for rgb in colors]
+	return (len(colors) / (time.perf_counter() - start), matches)
+
+def main() -> None:
+	parser = argparse.ArgumentParser(description = __doc__.splitlines()[0])
+	parser.add_argument('-n', '--number', type = int, default = 100000, help = 'random colors matched per run')
+	parser.add_argument('--seed',         type = int, default = 0)
+	args   = parser.parse_args()
+	rng    = random.Random(args.seed)
+	colors = [(rng.randrange(256), rng.randrange(256), rng.randrange(256)) for _ in range(args.number)]
+	(brute_rate, expected) = rate(brute_force_codes, colors)
+	(cold_rate,  cold)     = rate(nearest_codes, colors)                     ## Fills the index's buckets
+	(warm_rate,  warm)     = rate(nearest_codes, colors)
+	if not expected == cold == warm:
+		raise SystemExit('The index and the linear scan disagree')
+	for name, value in (('linear scan', brute_rate), ('index, first pass', cold_rate), ('index, buckets filled', warm_rate)):
+		print(f'{name:<24} {value:>10,.0f} colors/s')
+	print(f'{len(_8_BIT_INDEX.buckets)} 8-bit buckets of {sum(map(len, _8_BIT_INDEX.buckets.values())) / len(_8_BIT_INDEX.buckets):.1f} candidates on average, of {len(_8_BIT_INDEX.colors)}')
+
+if __name__ == '__main__':
+	main()
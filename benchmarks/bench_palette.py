@@ -0,0 +1,66 @@
+"""Time to render the 8-bit palette at several cell widths, by per-cell code arithmetic and by the precomputed palette code tables
+
+Usage: python benchmarks/bench_palette.py [-n NUMBER]
+"""
+import argparse
+import timeit
+
+from display_colors.cell          import (
+	cell_text,
+	colored_cell,
+)
+from display_colors.cmd.eight_bit import (
+	code_bgattr,
+	code_fgattr,
+	display_palette,
+)
+from display_colors.const         import (
+	_8_BIT_PALETTE_CUBE_SIDE,
+	_8_BIT_PALETTE_OFFSET,
+	Point,
+)
+from display_colors.formats       import (
+	ansi_lines,
+)
+
+WIDTHS = (3, 8, 20)
+
+def base_n_10(n: int, *digits: int) -> int:
+	"""The recursive conversion the cube views used before the code tables"""
+	def cont(result: int, digit_list: tuple[int, ...]) -> int:
+		return result if not digit_list else cont((result * n) + digit_list[-1], digit_list[:-1])
+
+	return cont(0, digits)
+
+def per_cell_cube(cell_w: int) -> None:
+	"""The three cube views as rendered before: code arithmetic, attributes and text for every cell"""
+	side = _8_BIT_PALETTE_CUBE_SIDE
+	for p_code in (
+		lambda p: base_n_10(side, p.x, p.y, p.z) + _8_BIT_PALETTE_OFFSET,
+		lambda p: base_n_10(side, p.x, p.z, p.y) + _8_BIT_PALETTE_OFFSET,
+		lambda p: base_n_10(side, p.z, p.y, p.x) + _8_BIT_PALETTE_OFFSET,
+	):
+		for y in range(side):
+			row = []
+			for z in range(side):
+				for x in range(side):
+					p = Point(x, y, z)
+					row.append(colored_cell(f'{code_fgattr(p_code(p))};{code_bgattr(p_code(p))}', cell_text(text = f'{p_code(p):X}', cell_w = cell_w)))
+				row.append(' ')
+			''.join(map(str, row))
+
+def tabled_cube(cell_w: int) -> None:
+	for _ in ansi_lines(display_palette(7, cell_w, 5, False)):
+		pass
+
+def main() -> None:
+	parser = argparse.ArgumentParser(description = __doc__.splitlines()[0])
+	parser.add_argument('-n', '--number', type = int, default = 200, help = 'renders per timing')
+	args = parser.parse_args()
+	for cell_w in WIDTHS:
+		for name, fn in (('per-cell arithmetic (cube only)', per_cell_cube), ('code tables (whole palette)', tabled_cube)):
+			best = min(timeit.repeat(lambda: fn(cell_w), number = args.number, repeat = 5))
+			print(f'width {cell_w:>2}  {name:<32} {best / args.number * 1e6:8.1f} us/render')
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,32 @@
+"""Bytes emitted by each command with and without --minimal-sgr
+
+Usage: python benchmarks/bench_sgr.py
+"""
+from click.testing import CliRunner
+
+from display_colors.__main__ import cli
+
+CASES = (
+	('4-bit',),
+	('4-bit', '-w', 'all', '--reverse-video', '--stanzas'),
+	('4-bit', '--transpose', '-w', 'all', '--reverse-video'),
+	('8-bit',),
+	('8-bit', '--compact'),
+	('24-bit', '--width', '80'),
+	('24-bit', '--width', '200', '--height', '24', '--slices', '8'),
+)
+
+def output_bytes(args: tuple[str, ...]) -> int:
+	result = CliRunner().invoke(cli, args)
+	if result.exit_code:
+		raise SystemExit(result.output)
+	return len(result.stdout_bytes)
+
+def main() -> None:
+	print(f'{"command":<50} {"full":>8} {"minimal":>8} {"ratio":>6}')
+	for args in CASES:
+		(full, minimal) = (output_bytes(args), output_bytes(args + ('--minimal-sgr',)))
+		print(f'{" ".join(args):<50} {full:>8} {minimal:>8} {full / minimal:>6.2f}')
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,67 @@
+"""Cold-start latency of the display-colors command line
+
+Usage: python benchmarks/bench_startup.py [-n NUMBER] [--json]
+
+Reports the wall time of a few typical invocations and the import time of click
+and of each display_colors module imported at startup, as reported by
+'python -X importtime' (which does not see the command modules the cli loads
+lazily; their cost shows in the wall time).
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+INVOCATIONS = (
+	('--version',),
+	('--help',),
+	('8-bit', '--help'),
+	('4-bit', '--output', '/dev/null'),
+)
+
+def wall_times(args: tuple[str, ...], number: int) -> list[float]:
+	times = []
+	for _ in range(number):
+		start = time.perf_counter()
+		subprocess.run([sys.executable, '-m', 'display_colors', *args], check = True, stdout = subprocess.DEVNULL)
+		times.append(time.perf_counter() - start)
+	return times
+
+def import_times(args: tuple[str, ...]) -> dict[str, int]:
+	"""Cumulative import time in microseconds of each top-level import of interest"""
+	proc = subprocess.run([sys.executable, '-X', 'importtime', '-m', 'display_colors', *args], check = True, stdout = subprocess.DEVNULL, stderr = subprocess.PIPE, text = True)
+	times = dict()
+	for line in proc.stderr.splitlines():
+		if not line.startswith('import time:') or '|' not in line:
+			continue
+		(_, cumulative, name) = line[len('import time:'):].split('|')
+		name = name.strip()
+		if name == 'click' or name.startswith('display_colors'):
+			times[name] = int(cumulative)
+	return times
+
+def main() -> None:
+	parser = argparse.ArgumentParser(description = __doc__.splitlines()[0])
+	parser.add_argument('-n', '--number', type = int, default = 10, help = 'runs per invocation')
+	parser.add_argument('--json', action = 'store_true', help = 'print a machine-readable summary')
+	args = parser.parse_args()
+	summary = dict()
+	for invocation in INVOCATIONS:
+		times = wall_times(invocation, args.number)
+		summary[' '.join(invocation)] = {
+			'median_ms': statistics.median(times) * 1e3,
+			'min_ms':    min(times) * 1e3,
+			'imports_us': import_times(invocation),
+		}
+	if args.json:
+		print(json.dumps(summary, indent = 2))
+		return
+	for invocation, result in summary.items():
+		print(f'{invocation:<30} median {result["median_ms"]:7.1f} ms  min {result["min_ms"]:7.1f} ms')
+		for name, us in result['imports_us'].items():
+			print(f'    {name:<40} {us / 1e3:7.2f} ms')
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,134 @@
+"""Rendering benchmarks for every command across its option matrix
+
+Usage: python benchmarks/bench_suite.py [-n NUMBER] [-k SUBSTRING] [--save FILE] [--compare FILE [--tolerance FRACTION]]
+
+Each case runs a command through click's test runner and reports the terminal
+cells written per second, the bytes emitted, the peak Python memory allocated
+and the best wall time of NUMBER runs.  --save writes the results as JSON;
+--compare reads such a file and exits with status 1 if any case got slower
+by more than the tolerance or emits more bytes than it did.
+"""
+import argparse
+import itertools
+import json
+import re
+import shlex
+import sys
+import time
+import tracemalloc
+from collections.abc import Iterator
+
+from click.testing import CliRunner
+
+from display_colors.__main__ import cli
+
+SGR_PATTERN = re.compile(rb'\033\[[0-9;]*m')
+
+## Each command's option matrix: one tuple of alternative argument lists per option
+MATRIX = {
+	'4-bit': (
+		([], ['-w', 'all'], ['-w', 'dim']),
+		([], ['--reverse-video']),
+		([], ['--transpose']),
+		([], ['--stanzas']),
+		([], ['--col-width', '12']),
+		([], ['--gutter', ' ']),
+		([], ['--minimal-sgr']),
+		([], ['--fit', '80']),
+	),
+	'8-bit': (
+		([], ['--decimal']),
+		([], ['--std-col-width', '9', '--rgb-col-width', '5', '--gray-col-width', '7']),
+		([], ['--face', 'back', '--face', 'bottom', '--face', 'right']),
+		([], ['--compact']),
+		([], ['--minimal-sgr']),
+		([], ['--fit', '80'], ['--fit', '240']),
+	),
+	'24-bit': (
+		(['--width', '80'], ['--width', '240', '--height', '24', '--slices', '8']),
+		([], ['--minimal-sgr']),
+	),
+	'effects': (
+		([], ['--gutter', ' ']),
+		([], ['--pattern', 'XYZ']),
+		([], ['--fit', '80']),
+	),
+}
+
+def cases() -> Iterator[tuple[str, ...]]:
+	for command, options in MATRIX.items():
+		for combination in itertools.product(*options):
+			args = (command, *itertools.chain.from_iterable(combination))
+			if '--transpose' in args and '--stanzas' in args:
+				continue                                         ## --stanzas applies to non-transposed output only
+			yield args
+
+def invoke(runner: CliRunner, args: tuple[str, ...]) -> bytes:
+	result = runner.invoke(cli, args)
+	if result.exit_code:
+		raise SystemExit(f'{shlex.join(args)}: {result.output}')
+	return result.stdout_bytes
+
+def measure(args: tuple[str, ...], number: int) -> dict[str, float]:
+	runner = CliRunner()
+	output = invoke(runner, args)                                ## Warm up lazy imports and caches
+	tracemalloc.start()
+	invoke(runner, args)
+	(_, peak) = tracemalloc.get_traced_memory()
+	tracemalloc.stop()
+	best = float('inf')
+	for _ in range(number):
+		start = time.perf_counter()
+		invoke(runner, args)
+		best = min(best, time.perf_counter() - start)
+	cells = len(SGR_PATTERN.sub(b'', output).decode().replace('\n', ''))
+	return {
+		'cells':          cells,
+		'cells_per_s':    cells / best,
+		'bytes':          len(output),
+		'peak_bytes':     peak,
+		'wall_s':         best,
+	}
+
+def regressions(results: dict[str, dict], baseline: dict[str, dict], tolerance: float) -> list[str]:
+	found = []
+	for name, result in results.items():
+		if name not in baseline:
+			continue
+		base = baseline[name]
+		if result['wall_s'] > base['wall_s'] * (1 + tolerance):
+			found.append(f'{name}: wall time {base["wall_s"] * 1e3:.2f} ms -> {result["wall_s"] * 1e3:.2f} ms')
+		if result['bytes'] > base['bytes']:
+			found.append(f'{name}: bytes {base["bytes"]} -> {result["bytes"]}')
+	return found
+
+def main() -> None:
+	parser = argparse.ArgumentParser(description = __doc__.splitlines()[0])
+	parser.add_argument('-n', '--number', type = int, default = 5, help = 'timed runs per case (the best is kept)')
+	parser.add_argument('-k', '--filter', default = '', help = 'run only the cases whose arguments contain SUBSTRING')
+	parser.add_argument('--save', metavar = 'FILE', help = 'write the results to FILE as JSON')
+	parser.add_argument('--compare', metavar = 'FILE', help = 'compare the results with a baseline saved by --save')
+	parser.add_argument('--tolerance', type = float, default = 0.10, help = 'allowed fractional slowdown against the baseline')
+	args = parser.parse_args()
+
+	results = dict()
+	print(f'{"case":<88} {"cells/s":>10} {"bytes":>8} {"peak KiB":>9} {"ms":>8}')
+	for case in cases():
+		name = shlex.join(case)
+		if args.filter not in name:
+			continue
+		result = results[name] = measure(case, args.number)
+		print(f'{name:<88} {result["cells_per_s"]:>10.0f} {result["bytes"]:>8} {result["peak_bytes"] / 1024:>9.1f} {result["wall_s"] * 1e3:>8.2f}')
+
+	if args.save:
+		with open(args.save, 'w') as f:
+			json.dump(results, f, indent = 1)
+	if args.compare:
+		with open(args.compare) as f:
+			found = regressions(results, json.load(f), args.tolerance)
+		for line in found:
+			print(f'REGRESSION {line}', file = sys.stderr)
+		sys.exit(1 if found else 0)
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,105 @@
+"""Load test of the serve command: many concurrent clients requesting a mix of patterns over keep-alive connections
+
+Usage: python benchmarks/load_serve.py [--clients N] [--requests N] [--revalidate] [--url URL]
+
+Without --url, a server is started on a free port for the run.  Reports requests per second, latency
+percentiles, status counts and the share of responses served from the response cache.  With
+--revalidate, clients send the ETag of their last response for each URL, as a browser does.
+"""
+import argparse
+import asyncio
+import collections
+import random
+import re
+import subprocess
+import sys
+import time
+from urllib.parse import urlsplit
+
+PATHS = (
+	'/4-bit',
+	'/4-bit?output=ansi',
+	'/4-bit?weight=all&reverse-video',
+	'/4-bit?transpose&fit=100',
+	'/8-bit',
+	'/8-bit?decimal&output=ansi',
+	'/8-bit?face=back&face=bottom&face=right',
+	'/8-bit?fit=120&minimal-sgr',
+	'/effects',
+	'/effects?fit=80&output=ansi',
+)
+
+async def read_response(reader: asyncio.StreamReader) -> tuple[int, dict[str, str], int]:
+	"""Status, headers and body length of one response"""
+	head = (await reader.readuntil(b'\r\n\r\n')).decode('latin-1').split('\r\n')
+	status  = int(head[0].split(' ')[1])
+	headers = {name.strip().lower(): value.strip() for name, _, value in (line.partition(':') for line in head[1:] if line)}
+	if 'content-length' in headers:
+		return (status, headers, len(await reader.readexactly(int(headers['content-length']))))
+	length = 0
+	if headers.get('transfer-encoding') == 'chunked':
+		while True:
+			size = int((await reader.readuntil(b'\r\n')).strip(), 16)
+			await reader.readexactly(size + 2)
+			if not size:
+				break
+			length += size
+	return (status, headers, length)
+
+async def client(host: str, port: int, n: int, revalidate: bool, rng: random.Random, stats: dict) -> None:
+	(reader, writer) = await asyncio.open_connection(host, port)
+	etags: dict[str, str] = {}
+	try:
+		for _ in range(n):
+			path  = rng.choice(PATHS)
+			extra = f'If-None-Match: {etags[path]}\r\n' if revalidate and path in etags else ''
+			start = time.perf_counter()
+			writer.write(f'GET {path} HTTP/1.1\r\nHost: {host}\r\n{extra}\r\n'.encode())
+			(status, headers, length) = await read_response(reader)
+			stats['latency'].append(time.perf_counter() - start)
+			stats['status'][status] += 1
+			stats['cache'][headers.get('x-cache', '-')] += 1
+			stats['bytes'] += length
+			if 'etag' in headers:
+				etags[path] = headers['etag']
+	finally:
+		writer.close()
+
+def percentile(values: list[float], p: float) -> float:
+	return sorted(values)[min(len(values) - 1, int(len(values) * p))]
+
+async def load(url: str, clients: int, requests: int, revalidate: bool, seed: int) -> None:
+	(host, port) = (urlsplit(url).hostname, urlsplit(url).port)
+	stats = {'latency': [], 'status': collections.Counter(), 'cache': collections.Counter(), 'bytes': 0}
+	rng   = random.Random(seed)
+	start = time.perf_counter()
+	await asyncio.gather(*(client(host, port, requests // clients, revalidate, random.Random(rng.random()), stats) for _ in range(clients)))
+	elapsed = time.perf_counter() - start
+	n = len(stats['latency'])
+	print(f'{n} requests from {clients} clients in {elapsed:.2f} s: {n / elapsed:.0f} requests/s, {stats["bytes"] / elapsed / 2 ** 20:.1f} MiB/s')
+	print(f'latency p50 {percentile(stats["latency"], 0.5) * 1e3:.2f} ms  p95 {percentile(stats["latency"], 0.95) * 1e3:.2f} ms  p99 {percentile(stats["latency"], 0.99) * 1e3:.2f} ms')
+	print(f'status {dict(stats["status"])}  cache {dict(stats["cache"])}')
+
+def main() -> None:
+	parser = argparse.ArgumentParser(description = __doc__.splitlines()[0])
+	parser.add_argument('--clients',    type = int, default = 100,  help = 'concurrent connections')
+	parser.add_argument('--requests',   type = int, default = 5000, help = 'requests in all')
+	parser.add_argument('--revalidate', action = 'store_true',     help = 'send If-None-Match with the last ETag for a URL')
+	parser.add_argument('--seed',       type = int, default = 0,    help = 'seed of the request mix')
+	parser.add_argument('--url',        help = 'URL of a running server  [default: start one]')
+	args = parser.parse_args()
+
+	server = None
+	url    = args.url
+	if url is None:
+		server = subprocess.Popen([sys.executable, '-m', 'display_colors', 'serve', '--port', '0'], stdout = subprocess.PIPE, text = True)
+		url    = re.search(r'http://\S+', server.stdout.readline()).group(0)
+	try:
+		asyncio.run(load(url, args.clients, args.requests, args.revalidate, args.seed))
+	finally:
+		if server is not None:
+			server.terminate()
+			server.wait()
+
+if __name__ == '__main__':
+	main()
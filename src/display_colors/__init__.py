@@ -0,0 +1 @@
+__version__ = '1.0.6'                  ## As in pyproject.toml: part of the key of whatever is cached from this version's output
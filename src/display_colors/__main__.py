@@ -22,21 +22,69 @@
 # limitations under the License.
 
 import click
+import importlib
+from typing import Optional
 
-from display_colors.cmd.effects   import display_effects
-from display_colors.cmd.four_bit  import display_4_bit
-from display_colors.cmd.eight_bit import display_8_bit
-from display_colors.init          import init_mappings
+from display_colors         import (
+	__version__,
+)
+from display_colors.profile import (
+	phase,
+	profile_json_option,
+	profile_option,
+	profile_stats_option,
+)
 
-@click.group()
-@click.version_option(package_name = 'display-colors')
+## Each subcommand's import path and the first line of its help, listed by --help without importing it
+
+LAZY_SUBCOMMANDS = {
+	'4-bit':   ('display_colors.cmd.four_bit.display_4_bit',          "All combinations (FG on BG) of the 16 standard 4-bit colors"),
+	'8-bit':   ('display_colors.cmd.eight_bit.display_8_bit',         "The 16 standard colors, the RGB 6x6x6 palette, and 24 grays (BG)"),
+	'24-bit':  ('display_colors.cmd.twenty_four_bit.display_24_bit',  "RGB ramps, hue sweep and slices of the RGB cube in truecolor (BG)"),
+	'bench':   ('display_colors.cmd.bench.bench_throughput',          "Push test patterns to a terminal as fast as it takes them and report the throughput"),
+	'cache':   ('display_colors.cmd.cache.pattern_cache',             "Inspect or empty the cache of rendered test patterns (--cache)"),
+	'catalog': ('display_colors.cmd.catalog.display_catalog',         "Render the 4-bit and 8-bit patterns of each theme file (or directory of them) to HTML or SVG"),
+	'effects': ('display_colors.cmd.effects.display_effects',         "Complete display of effects the terminal emulator may support"),
+	'nearest': ('display_colors.cmd.nearest.nearest_colors',          "The 8-bit palette code and 4-bit color perceptually nearest to each '#rrggbb' color"),
+	'probe':   ('display_colors.cmd.probe.probe_capabilities',        "The effects and color depths the terminal emulator reports supporting"),
+	'query':   ('display_colors.cmd.query.query_colors',              "The RGB values of the 256 palette colors and default FG and BG, as reported by the terminal emulator"),
+	'serve':   ('display_colors.cmd.serve.serve_patterns',            "Serve the 4-bit, 8-bit and effects patterns to a browser on this machine, as HTML or ANSI text"),
+	'verify':  ('display_colors.cmd.verify.verify_captures',          "Compare what two captured ANSI streams show, cell by cell, rather than their bytes"),
+}
+
+class Lazy_Group(click.Group):
+	"""Import a subcommand's module only when that subcommand is looked up"""
+	def __init__(self, *args, lazy_subcommands: dict[str, tuple[str, str]], **kwargs) -> None:
+		super().__init__(*args, **kwargs)
+		self.lazy_subcommands = lazy_subcommands
+
+	def list_commands(self, ctx: click.Context) -> list[str]:
+		return sorted([*super().list_commands(ctx), *self.lazy_subcommands])
+
+	def get_command(self, ctx: click.Context, cmd_name: str) -> Optional[click.Command]:
+		if cmd_name not in self.lazy_subcommands:
+			return super().get_command(ctx, cmd_name)
+		(module, name) = self.lazy_subcommands[cmd_name][0].rsplit('.', 1)
+		with phase('import'):
+			return getattr(importlib.import_module(module), name)
+
+	def format_commands(self, ctx: click.Context, formatter: click.HelpFormatter) -> None:
+		"""List the subcommands as click does, with the help kept for the lazy ones rather than importing them"""
+		commands = [(name, click.Command(name, help = self.lazy_subcommands[name][1]) if name in self.lazy_subcommands else super().get_command(ctx, name))
+								for name in self.list_commands(ctx)]
+		commands = [(name, cmd) for name, cmd in commands if cmd is not None and not cmd.hidden]
+		if commands:
+			limit = formatter.width - 6 - max(len(name) for name, _ in commands)
+			with formatter.section('Commands'):
+				formatter.write_dl([(name, cmd.get_short_help_str(limit)) for name, cmd in commands])
+
+@click.group(cls = Lazy_Group, lazy_subcommands = LAZY_SUBCOMMANDS)
+@click.version_option(__version__, package_name = 'display-colors')
+@profile_option
+@profile_json_option
+@profile_stats_option
 def cli():
 	"""Prints test patterns to show the color and display effect capabilities of a terminal emulator"""
-	init_mappings()
-
-cli.add_command(display_4_bit)
-cli.add_command(display_8_bit)
-cli.add_command(display_effects)
 
 if __name__ == '__main__':
 	cli()
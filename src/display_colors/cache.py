@@ -0,0 +1,194 @@
+import hashlib
+import os
+from collections.abc import Callable
+from pathlib         import Path
+from typing          import Any, BinaryIO, Optional
+
+from display_colors import (
+	__version__,
+)
+
+CACHE_NAME = 'display-colors'
+
+TERMINAL_ENV = ('TERM', 'TERM_PROGRAM', 'TERM_PROGRAM_VERSION')    ## Identify the terminal emulator without asking it
+
+PATTERNS_DIR     = 'patterns'
+PATTERN_SUFFIX   = '.ansi'
+PATTERN_COUNTS   = ('hits', 'misses')
+COUNT_SUFFIX     = '.count'            ## A count is the size of its file: a byte is appended for each
+COUNT_MAX        = 2 ** 16             ## When a count reaches this, both are halved, so their files stay small
+PATTERN_SIZE_ENV = 'DISPLAY_COLORS_CACHE_MB'
+PATTERN_SIZE_MB  = 32                  ## Bound on the rendered patterns kept, least recently used evicted first
+
+def cache_dir(*parts: str) -> Path:
+	"""A directory under $XDG_CACHE_HOME (default ~/.cache) for display-colors; it is not created"""
+	base = os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache'
+	return Path(base, CACHE_NAME, *parts)
+
+def cache_key(*parts: str) -> str:
+	return hashlib.sha256('\0'.join(parts).encode()).hexdigest()[:32]
+
+def terminal_cache_path(kind: str) -> Path:
+	"""The cache file of one kind ('palette', 'capabilities') for the terminal emulator running this process"""
+	return cache_dir(kind) / f'{cache_key(*[os.environ.get(name, "") for name in TERMINAL_ENV])}.json'
+
+def read_json(path: Path, valid: Callable[[Any], bool] = lambda data: True) -> Optional[Any]:
+	"""The contents of a JSON cache file, or None if it is missing, unreadable or not of the shape valid() expects"""
+	import json
+	try:
+		with open(path, encoding = 'utf-8') as f:
+			data = json.load(f)
+	except (OSError, ValueError):
+		return None
+	return data if valid(data) else None
+
+def write_json(path: Path, data: Any) -> None:
+	"""Replace a JSON cache file atomically, so concurrent readers never see a partial file"""
+	import json
+	path.parent.mkdir(parents = True, exist_ok = True)
+	tmp = path.with_name(f'.{path.name}.{os.getpid()}')
+	with open(tmp, 'w', encoding = 'utf-8') as f:
+		json.dump(data, f, indent = 1)
+	os.replace(tmp, path)
+
+def replace_json(path: Path, data: Any, known: Callable[[Any], int]) -> bool:
+	"""Replace a JSON cache file unless what it holds knows more (by known()), so a partial result never replaces a complete one"""
+	cached = read_json(path)
+	if cached is not None and known(cached) > known(data):
+		return False
+	write_json(path, data)
+	return True
+
+## Rendered test patterns (--cache): one file of output bytes per command, options, version, terminal
+## width and encoding.  A file's mtime is when it was last used; the least recently used are evicted first
+
+def pattern_cache_path(command: str, options: dict[str, Any], width: int, encoding: str) -> Path:
+	normalized = repr(sorted(options.items()))                ## Option values are None, bool, int, str or tuples of them
+	return cache_dir(PATTERNS_DIR) / f'{cache_key(__version__, command, normalized, str(width), encoding.lower())}{PATTERN_SUFFIX}'
+
+def pattern_cache_limit() -> int:
+	"""The size bound of the pattern cache in bytes, from $DISPLAY_COLORS_CACHE_MB"""
+	value = os.environ.get(PATTERN_SIZE_ENV, '')
+	try:
+		mb = float(value) if value else PATTERN_SIZE_MB
+	except ValueError:
+		mb = -1
+	if mb < 0:
+		raise ValueError(f'{PATTERN_SIZE_ENV}: expected a size in MiB, got {value!r}')
+	return int(mb * 2 ** 20)
+
+def pattern_entries() -> list[tuple[Path, os.stat_result]]:
+	"""The cached patterns and their stats, least recently used first"""
+	entries = []
+	try:
+		with os.scandir(cache_dir(PATTERNS_DIR)) as it:
+			for entry in it:
+				if entry.name.endswith(PATTERN_SUFFIX):
+					try:
+						entries.append((Path(entry.path), entry.stat()))
+					except FileNotFoundError:                    ## Evicted by another process
+						pass
+	except FileNotFoundError:
+		pass
+	return sorted(entries, key = lambda entry: entry[1].st_mtime)
+
+def evict_patterns(limit: int) -> tuple[int, int]:
+	"""Remove the least recently used patterns until they add up to limit bytes; returns how many and their bytes"""
+	entries = pattern_entries()
+	total   = sum(stat.st_size for (_, stat) in entries)
+	(removed, freed) = (0, 0)
+	for path, stat in entries:
+		if total <= limit:
+			break
+		path.unlink(missing_ok = True)
+		total   -= stat.st_size
+		removed += 1
+		freed   += stat.st_size
+	return (removed, freed)
+
+def clear_patterns() -> tuple[int, int]:
+	"""Remove every cached pattern, unfinished ones and the hit counts too; returns how many patterns and their bytes"""
+	entries = pattern_entries()
+	try:
+		with os.scandir(cache_dir(PATTERNS_DIR)) as it:
+			for entry in it:
+				Path(entry.path).unlink(missing_ok = True)
+	except FileNotFoundError:
+		pass
+	return (len(entries), sum(stat.st_size for (_, stat) in entries))
+
+def touch_pattern(path: Path) -> None:
+	"""Mark a cached pattern as the most recently used"""
+	try:
+		os.utime(path)
+	except OSError:                                      ## A cache it may read but not write
+		pass
+
+def count_pattern_use(outcome: str) -> None:
+	"""Count a 'hits' or 'misses' of the pattern cache, for the cache stats command
+
+	A byte is appended to the count's file: nothing is read or rewritten, so a hit costs one small
+	write, and counts from concurrent processes are not lost.  When a count reaches COUNT_MAX, both
+	are halved: the files stay small, outside the size bound of the patterns, and the hit rate is kept.
+	"""
+	try:
+		fd = os.open(cache_dir(PATTERNS_DIR, f'{outcome}{COUNT_SUFFIX}'), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+		try:
+			os.write(fd, b'.')
+			full = os.fstat(fd).st_size >= COUNT_MAX
+		finally:
+			os.close(fd)
+	except OSError:                                      ## A cache it may read but not write
+		return
+	if full:
+		for (name, count) in pattern_stats().items():
+			try:
+				os.truncate(cache_dir(PATTERNS_DIR, f'{name}{COUNT_SUFFIX}'), count // 2)
+			except OSError:
+				pass
+
+def pattern_stats() -> dict[str, int]:
+	stats = dict()
+	for outcome in PATTERN_COUNTS:
+		try:
+			stats[outcome] = os.stat(cache_dir(PATTERNS_DIR, f'{outcome}{COUNT_SUFFIX}')).st_size
+		except OSError:
+			stats[outcome] = 0
+	return stats
+
+class Stored_Pattern:
+	"""A rendered pattern being written to the cache: it replaces the entry atomically if written in full, and is removed otherwise
+
+	A write that fails (the disk is full, say) gives up the entry, not the output: later writes are
+	ignored and nothing is raised, so the pattern is still written to the stream.
+	"""
+	def __init__(self, path: Path) -> None:
+		path.parent.mkdir(parents = True, exist_ok = True)
+		self.path   = path
+		self.tmp    = path.with_name(f'.{path.name}.{os.getpid()}')
+		self.file   = open(self.tmp, 'wb')
+		self.failed = False
+
+	def __enter__(self) -> 'Stored_Pattern':
+		return self
+
+	def write(self, data: bytes) -> None:
+		if self.failed:
+			return
+		try:
+			self.file.write(data)
+		except OSError:
+			self.failed = True
+
+	def __exit__(self, exc_type, *exc_info) -> None:
+		try:
+			self.file.close()                                  ## Writes what is buffered: it may fail too
+			if exc_type is None and not self.failed:
+				os.replace(self.tmp, self.path)
+				return
+		except OSError:
+			pass
+		try:
+			self.tmp.unlink(missing_ok = True)
+		except OSError:
+			pass
@@ -1,3 +1,6 @@
+from functools import lru_cache
+from typing    import NamedTuple, Union
+
 from display_colors.const import (
 	RESET,
 	REV_VIDEO,
@@ -12,15 +15,41 @@ from display_colors.init import (
 	_8_BIT_FG_REPR_ATTR,
 )
 
-def colored_cell(attrs: str, text: str) -> str:
-	return f'{SGR_BEG}{attrs}{SGR_END}{text}{SGR_BEG}{RESET}{SGR_END}'
+SGR_RESET = f'{SGR_BEG}{RESET}{SGR_END}'
+
+## There are only a few hundred distinct attribute combinations, so the escape sequences
+## are interned in these caches the first time they are built and looked up thereafter
+
+@lru_cache(maxsize = None)
+def sgr_seq(attrs: str) -> str:
+	return f'{SGR_BEG}{attrs}{SGR_END}'
+
+class Cell(NamedTuple):
+	"""Store a cell of a test pattern: its text and the SGR attributes it is displayed with"""
+	attrs: str
+	text:  str
+	reset: bool = True
+
+	def __str__(self) -> str:
+		return f'{sgr_seq(self.attrs)}{self.text}{SGR_RESET}' if self.reset else f'{sgr_seq(self.attrs)}{self.text}'
+
+Row = list[Union[Cell, str]]    ## One output line: cells and the plain text (labels, gutters) between them
+
+class Segment(list[Union[Cell, str]]):
+	"""Part of an output line too long to build at once: the next row continues the same line"""
+
+@lru_cache(maxsize = 4096)
+def colored_cell(attrs: str, text: str) -> Cell:
+	return Cell(attrs, text)
 
+@lru_cache(maxsize = None)
 def create_attrs(weight: str, fg_repr: str, bg_repr: str, rev_video: bool = False, _8_bit: bool = False) -> str:
 	(fg, bg) = (bg_repr, fg_repr) if rev_video else (fg_repr, bg_repr)
 	(fg_repr_attr, bg_repr_attr) = (_8_BIT_FG_REPR_ATTR, _8_BIT_BG_REPR_ATTR) if _8_bit else (_4_BIT_FG_REPR_ATTR, _4_BIT_BG_REPR_ATTR)
 	rev_video_attr = f';{REV_VIDEO}' if rev_video else f''
 	return f'{WEIGHT_ATTR[weight]};{fg_repr_attr[fg]};{bg_repr_attr[bg]}{rev_video_attr}'
 
+@lru_cache(maxsize = None)
 def cell_text(fg_repr: str = '', bg_repr: str = '', text: str = '', transpose: bool = False, cell_w: int = 0) -> str:
 	str = f'{fg_repr}/{bg_repr}' if transpose else text
 	w   = cell_w or len(str) + 2
@@ -0,0 +1,88 @@
+import click
+import json
+import os
+from collections.abc import Iterator
+from typing          import Optional
+
+from display_colors.cache      import (
+	TERMINAL_ENV,
+)
+from display_colors.const      import (
+	OUTPUT_CHUNK_SIZE,
+)
+from display_colors.sgr        import (
+	minimal_sgr_option,
+)
+from display_colors.throughput import (
+	DEFAULT_PATTERNS,
+	MINIMAL_SGR_PATTERNS,
+	PATTERNS,
+	TARGETS,
+	Pty_Target,
+	Throughput,
+	Tty_Target,
+	pattern_payload,
+	percentile,
+	push,
+)
+
+PERCENTILES = (0.5, 0.95, 0.99)
+
+def summary(target: str, patterns: tuple[str, ...], minimal_sgr: bool, flush_size: int, received: Optional[int], result: Throughput) -> dict:
+	return {
+		'target':           target,
+		'terminal':         {name: os.environ.get(name, '') for name in TERMINAL_ENV} if target == 'tty' else None,
+		'patterns':         list(patterns),
+		'minimal_sgr':      minimal_sgr,
+		'flush_size':       flush_size,
+		'bytes':            result.bytes,
+		'received':         received,
+		'cells':            result.cells,
+		'flushes':          result.flushes,
+		'seconds':          result.seconds,
+		'bytes_per_second': result.bytes / result.seconds,
+		'cells_per_second': result.cells / result.seconds,
+		'flush_latency':    {**{f'p{round(p * 100)}': percentile(result.latencies, p) for p in PERCENTILES}, 'max': max(result.latencies)},
+		'stalls':           result.stalls,
+		'partial_writes':   result.partial_writes,
+	}
+
+def report(s: dict) -> Iterator[str]:
+	terminal = ' '.join(value for value in s['terminal'].values() if value) if s['terminal'] else ''
+	lines = [
+		('target',        f'tty ({terminal or "unknown terminal"})' if s['target'] == 'tty' else 'pty, read by another process'),
+		('patterns',      ', '.join(f'{name} --minimal-sgr' if s['minimal_sgr'] and name in MINIMAL_SGR_PATTERNS else name for name in s['patterns'])),
+		('pushed',        f'{s["bytes"] / 2 ** 20:.1f} MiB, {s["cells"]:,} cells in {s["flushes"]:,} flushes of up to {s["flush_size"]:,} bytes'),
+		('read',          f'{s["received"]:,} bytes (the pty sends CR LF for each newline)' if s['received'] is not None else None),
+		('elapsed',       f'{s["seconds"]:.3f} s'),
+		('throughput',    f'{s["bytes_per_second"] / 2 ** 20:.1f} MiB/s, {s["cells_per_second"]:,.0f} cells/s'),
+		('flush',         '  '.join(f'{name} {value * 1e3:.3f} ms' for name, value in s['flush_latency'].items())),
+		('back-pressure', f'{s["stalls"]:,} waits for room, {s["partial_writes"]:,} partial writes'),
+	]
+	for label, value in lines:
+		if value is not None:
+			yield f'{label:<15}{value}\n'
+
+@click.command('bench')
+@click.option('--flush-size',  '_flush_size', type = click.IntRange(min = 1),   help = "Bytes written per flush",                                   default = OUTPUT_CHUNK_SIZE, show_default = True)
+@click.option('--json',        '_json',       is_flag = True,                   help = "Print the results as JSON",                                 default = False, show_default = True)
+@click.option('--megabytes',   '_megabytes',  type = click.FloatRange(min = 0, min_open = True), help = "MiB to push",                             default = 16.0,  show_default = True)
+@minimal_sgr_option
+@click.option('--pattern',     '_patterns',   type = click.Choice(list(PATTERNS)), multiple = True, help = "Test pattern to push (repeatable)",     default = DEFAULT_PATTERNS, show_default = True)
+@click.option('--target',      '_target',     type = click.Choice(TARGETS),     help = "Where to write: a pty read by another process, or this terminal", default = 'pty', show_default = True)
+def bench_throughput(_flush_size: int, _json: bool, _megabytes: float, _minimal_sgr: bool, _patterns: tuple[str, ...], _target: str) -> None:
+	"""Push test patterns to a terminal as fast as it takes them and report the throughput
+
+	The patterns are rendered once, at a fixed size, and written over and over in flushes of
+	--flush-size bytes to a non-blocking fd, waiting for room whenever the terminal falls behind.
+	The clock stops once the output has drained.
+	"""
+	payload = pattern_payload(_patterns, _minimal_sgr)
+	target  = Pty_Target() if _target == 'pty' else Tty_Target()
+	try:
+		with target as fd:
+			result = push(fd, payload, int(_megabytes * 2 ** 20), _flush_size)
+	except OSError as e:
+		raise click.ClickException(f'Cannot write to the {_target}: {e.strerror}')
+	s = summary(_target, _patterns, _minimal_sgr, _flush_size, target.received, result)
+	click.echo(json.dumps(s) if _json else ''.join(report(s)), nl = _json)
@@ -0,0 +1,49 @@
+import click
+from collections.abc import Iterator
+
+from display_colors.cache import (
+	PATTERN_SIZE_ENV,
+	PATTERNS_DIR,
+	cache_dir,
+	clear_patterns,
+	pattern_cache_limit,
+	pattern_entries,
+	pattern_stats,
+)
+
+def report() -> Iterator[str]:
+	try:
+		limit = f'{pattern_cache_limit() / 2 ** 20:.1f} MiB'
+	except ValueError as e:
+		raise click.UsageError(str(e))
+	entries = pattern_entries()
+	size    = sum(stat.st_size for (_, stat) in entries)
+	stats   = pattern_stats()
+	uses    = stats['hits'] + stats['misses']
+	lines = [
+		('directory', str(cache_dir(PATTERNS_DIR))),
+		('patterns',  f'{len(entries):,}, {size:,} bytes of {limit}  [env var: {PATTERN_SIZE_ENV}]'),
+		('hits',      f'{stats["hits"]:,} of {uses:,} ({stats["hits"] / uses:.0%})' if uses else '0'),
+		('misses',    f'{stats["misses"]:,}'),
+	]
+	for label, value in lines:
+		yield f'{label:<11}{value}\n'
+
+@click.group('cache')
+def pattern_cache() -> None:
+	"""Inspect or empty the cache of rendered test patterns (--cache)"""
+
+@pattern_cache.command('stats')
+def cache_stats() -> None:
+	"""Where the cache is, its size and how often it was hit
+
+	The hits and misses are counted since the cache was cleared, both halved whenever one reaches
+	65,536, so the counts take little room and still give the hit rate.
+	"""
+	click.echo(''.join(report()), nl = False)
+
+@pattern_cache.command('clear')
+def cache_clear() -> None:
+	"""Remove every cached test pattern and the hit counts"""
+	(removed, freed) = clear_patterns()
+	click.echo(f'Removed {removed:,} pattern{"" if removed == 1 else "s"}, {freed:,} bytes')
@@ -0,0 +1,160 @@
+import click
+import hashlib
+import html
+from collections.abc    import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools          import chain
+from pathlib            import Path
+from urllib.parse       import quote
+
+from display_colors                import (
+	__version__,
+)
+from display_colors.cache          import (
+	cache_key,
+	read_json,
+	write_json,
+)
+from display_colors.cell           import (
+	Row,
+)
+from display_colors.cmd.eight_bit  import (
+	display_palette,
+)
+from display_colors.cmd.four_bit   import (
+	display_theme,
+)
+from display_colors.colors         import (
+	rgb_hex,
+)
+from display_colors.markup         import (
+	html_pre,
+	svg_document,
+)
+from display_colors.output         import (
+	write_frame,
+)
+from display_colors.themes         import (
+	THEME_SUFFIXES,
+	Theme,
+	Theme_Error,
+	load_theme,
+)
+
+MANIFEST_NAME = '.catalog.json'
+INDEX_NAME    = 'index.html'
+
+def catalog_sections() -> list[tuple[str, Iterator[Row]]]:
+	"""The test patterns in a catalog page, as the 4-bit and 8-bit commands show them by default"""
+	return [
+		('4-bit', display_theme(('Default', 'Bold'), reverse_video = False, cell_txt = 'gYw', col_w = 7, gutter = '', stanzas = False, transpose = False)),
+		('8-bit', display_palette(std_col_w = 7, rgb_col_w = 3, gray_col_w = 5, decimal = False)),
+	]
+
+def html_page(theme: Theme) -> Iterator[str]:
+	title = html.escape(theme.name)
+	yield f'<!DOCTYPE html>\n<html><head><meta charset="utf-8"><title>{title}</title></head>\n'
+	yield f'<body style="background:{rgb_hex(theme.background)};color:{rgb_hex(theme.foreground)};font-family:sans-serif">\n<h1>{title}</h1>\n'
+	for name, rows in catalog_sections():
+		yield f'<h2>{name}</h2>\n'
+		yield from html_pre(rows, theme)
+	yield '</body></html>\n'
+
+def svg_page(theme: Theme) -> Iterator[str]:
+	rows = chain.from_iterable(chain([[f'{name}:']], rows, [['']]) for name, rows in catalog_sections())
+	yield from svg_document(chain([[theme.name], ['']], rows), theme)
+
+def render_theme_file(path: str, out_path: str, fmt: str) -> str:
+	"""Render one theme's catalog page; runs in a worker process, so it takes and returns plain values"""
+	theme = load_theme(Path(path))
+	Path(out_path).parent.mkdir(parents = True, exist_ok = True)
+	with open(out_path, 'w', encoding = 'utf-8') as f:
+		write_frame(html_page(theme) if fmt == 'html' else svg_page(theme), f)
+	return theme.name
+
+def theme_paths(paths: Iterable[Path], out_dir: Path) -> list[tuple[Path, Path]]:
+	"""The theme files given, and those in the directories given other than out_dir, each with its path relative to the directory"""
+	(found, out_dir) = ([], out_dir.resolve())
+	for path in paths:
+		if path.is_dir():
+			found.extend((p, p.relative_to(path)) for p in sorted(p for p in path.rglob('*')
+													if p.suffix in THEME_SUFFIXES and not p.name.startswith('.') and out_dir not in p.resolve().parents and p.is_file()))
+		else:
+			found.append((path, Path(path.name)))
+	return found
+
+def output_names(paths: Iterable[tuple[Path, Path]], fmt: str) -> list[str]:
+	"""A distinct page for each theme, named by its relative path, source suffix included ('dark/Solarized.json.html')
+
+	Themes given with the same relative path are told apart by a hash of their full path.
+	"""
+	(names, used) = ([], set())
+	for path, relative in paths:
+		name = f'{relative.as_posix()}.{fmt}'
+		if name in used:
+			name = f'{relative.as_posix()}-{cache_key(str(path.resolve()))[:8]}.{fmt}'
+		used.add(name)
+		names.append(name)
+	return names
+
+def theme_digest(path: Path, fmt: str) -> str:
+	"""Changes when the theme file, the output format or the program that renders it does"""
+	return hashlib.sha256(b'\0'.join([path.read_bytes(), fmt.encode(), __version__.encode()])).hexdigest()
+
+def failure(path: Path, out_name: str, e: Exception) -> str:
+	"""Why a theme was not rendered: a Theme_Error names its file, an OSError the theme and the file it failed on"""
+	return str(e) if isinstance(e, Theme_Error) else f'{path}: {e.filename or out_name}: {e.strerror or e}'
+
+def index_page(entries: list[tuple[str, str]], fmt: str) -> Iterator[str]:
+	yield '<!DOCTYPE html>\n<html><head><meta charset="utf-8"><title>Theme catalog</title></head>\n<body style="font-family:sans-serif">\n<h1>Theme catalog</h1>\n'
+	for name, out_name in sorted(entries, key = lambda entry: entry[0].lower()):
+		(name, out_name) = (html.escape(name), html.escape(quote(out_name)))
+		if fmt == 'svg':
+			yield f'<figure><a href="{out_name}"><img src="{out_name}" alt="{name}"></a><figcaption>{name}</figcaption></figure>\n'
+		else:
+			yield f'<p><a href="{out_name}">{name}</a></p>\n'
+	yield '</body></html>\n'
+
+@click.command('catalog')
+@click.argument('themes', nargs = -1, required = True, type = click.Path(exists = True, path_type = Path))
+@click.option('--force',         '_force',     is_flag = True, help = "Render every theme, even those unchanged since the last run",    default = False, show_default = True)
+@click.option('--format',        '_format',       type = click.Choice(['html', 'svg']), help = "Page format",                           default = 'html', show_default = True)
+@click.option('--jobs', '-j',    '_jobs',         type = click.IntRange(min = 1), help = "Worker processes  [default: one per CPU]")
+@click.option('--out-dir',       '_out_dir',      type = click.Path(file_okay = False, path_type = Path), help = "Directory for the catalog", default = 'catalog', show_default = True)
+def display_catalog(themes: tuple[Path, ...], _force: bool, _format: str, _jobs: int, _out_dir: Path) -> None:
+	"""Render the 4-bit and 8-bit patterns of each theme file (or directory of them) to HTML or SVG"""
+	_out_dir.mkdir(parents = True, exist_ok = True)
+	manifest_path = _out_dir / MANIFEST_NAME
+	manifest      = read_json(manifest_path) or dict()
+	(entries, todo, failed) = ([], dict(), 0)
+	paths = theme_paths(themes, _out_dir)
+	for (path, _), out_name in zip(paths, output_names(paths, _format)):
+		key      = str(path.resolve())
+		digest   = theme_digest(path, _format)
+		known    = manifest.get(key)
+		if not _force and known and known['digest'] == digest and known.get('output') == out_name and (_out_dir / out_name).exists():
+			entries.append((known['name'], out_name))
+		else:
+			todo[key] = (path, out_name, digest)
+
+	with ProcessPoolExecutor(max_workers = _jobs) as pool:
+		futures = {pool.submit(render_theme_file, str(path), str(_out_dir / out_name), _format): key for key, (path, out_name, _) in todo.items()}
+		for future in as_completed(futures):
+			key = futures[future]
+			(path, out_name, digest) = todo[key]
+			try:
+				name = future.result()
+			except (Theme_Error, OSError) as e:                 ## OSError: reading the theme or writing its page
+				click.echo(f'Skipping {failure(path, out_name, e)}', err = True)
+				manifest.pop(key, None)
+				failed += 1
+				continue
+			manifest[key] = {'digest': digest, 'name': name, 'output': out_name}
+			entries.append((name, out_name))
+
+	write_json(manifest_path, manifest)
+	with open(_out_dir / INDEX_NAME, 'w', encoding = 'utf-8') as f:
+		write_frame(index_page(entries, _format), f)
+	click.echo(f'{len(todo) - failed} rendered, {len(entries) - len(todo) + failed} unchanged, {failed} failed: {_out_dir / INDEX_NAME}', err = True)
+	if failed:
+		raise SystemExit(1)
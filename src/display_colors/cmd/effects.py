@@ -1,45 +1,97 @@
 import click
+from collections.abc import Iterator
+from pathlib         import Path
+from typing          import Optional, TextIO
 
+from display_colors.cell    import (
+	Cell,
+	Row,
+)
 from display_colors.const   import (
 	COLOR_REPR,
 	COLORS,
 	RESET,
 	SGR_BEG,
 	SGR_END,
-	Switch_Attr,
+)
+from display_colors.formats import (
+	format_option,
+	format_rows,
 )
 from display_colors.init    import (
 	_4_BIT_BG_REPR_ATTR,
 	_4_BIT_FG_REPR_ATTR,
-	init_display_attributes,
+	EFFECT_SWITCH,
+)
+from display_colors.layout  import (
+	Block,
+	check_layout_options,
+	fit_option,
+	layout_rows,
+)
+from display_colors.output  import (
+	cache_option,
+	cached_frame,
+	check_cache_options,
+	output_option,
+	page_frame,
+	page_option,
+	write_frame,
+)
+from display_colors.watch   import (
+	check_watch_options,
+	theme_option,
+	watch,
+	watch_option,
 )
 
-EFFECT_SWITCH: dict[str, Switch_Attr] = dict()
-
-def color_text(attrs: str, text: str) -> str:
-	return f'{SGR_BEG}{attrs}{SGR_END}{text}'
+def color_text(attrs: str, text: str) -> Cell:
+	return Cell(attrs, text, reset = False)
 
-def test_attributes(neutral_text: str, on_text: str, off_text: str, gutter: str) -> None:
+def test_attributes(neutral_text: str, on_text: str, off_text: str, gutter: str) -> Iterator[Row]:
 	l_col_w = max(len(name + ':') for name in EFFECT_SWITCH.keys())
 	for name, sw in EFFECT_SWITCH.items():
 		on_attr  = getattr(sw, 'on')
 		off_attr = getattr(sw, 'off')
 		label = name + ':'
-		print(f'{label:<{l_col_w}}', end = ' ')
+		row: Row = [f'{label:<{l_col_w}} ']
 		for repr_attr in (_4_BIT_FG_REPR_ATTR, _4_BIT_BG_REPR_ATTR):
 			for modifier in (str.lower, str.upper):
 				for color in COLORS:
 					color_attr = repr_attr[modifier(COLOR_REPR[color])]
-					print(color_text(   color_attr,          neutral_text), end = '')
-					print(color_text(f'{color_attr};{on_attr}',   on_text), end = '')
-					print(color_text(f'{color_attr};{off_attr}', off_text), end = '')
-					print(color_text(RESET, ''), end = gutter)
-		print()
+					row.append(color_text(   color_attr,          neutral_text))
+					row.append(color_text(f'{color_attr};{on_attr}',   on_text))
+					row.append(color_text(f'{color_attr};{off_attr}', off_text))
+					row.append(f'{SGR_BEG}{RESET}{SGR_END}{gutter}')
+		yield row
+
+def attribute_blocks(neutral_text: str, on_text: str, off_text: str, gutter: str) -> list[Block]:
+	"""The rows of test_attributes as a block: each row is labelled by its effect, and each color's three samples and reset are a unit"""
+	return [Block(list(test_attributes(neutral_text, on_text, off_text, gutter)), key = 1, unit = 4)]
 
 @click.command('effects')
+@cache_option
+@fit_option
 @click.option('--gutter',        '_gutter',       type = str,  help = "String delimiting output columns  [default: empty string]",     default = '',    show_default = True)
 @click.option('--pattern',       '_pattern',      type = str,  help = "Sample pattern character for the --test option",                default = '|',   show_default = True)
-def display_effects(_gutter: str, _pattern: str):
+@format_option
+@output_option
+@page_option
+@theme_option
+@watch_option
+def display_effects(_cache: bool, _fit: Optional[int], _gutter: str, _pattern: str, _format: str, _output: TextIO, _page: bool, _theme: Optional[Path], _watch: bool):
 	"""Complete display of effects the terminal emulator may support"""
-	init_display_attributes(EFFECT_SWITCH)
-	test_attributes(_pattern, _pattern, _pattern, _gutter)
+	check_watch_options(_watch, _theme, _format)
+	check_layout_options(_fit, _page, _format, _output, _watch)
+	check_cache_options(_cache, _page, _watch)
+	if _watch:
+		watch(lambda: layout_rows(attribute_blocks(_pattern, _pattern, _pattern, _gutter), _fit), _output, theme = _theme)
+		return
+	rows   = test_attributes(_pattern, _pattern, _pattern, _gutter) if _fit is None else layout_rows(attribute_blocks(_pattern, _pattern, _pattern, _gutter), _fit)
+	chunks = format_rows(rows, _format)
+	if _page:
+		page_frame(chunks)
+	elif _cache:
+		cached_frame(chunks, _output)
+	else:
+		write_frame(chunks, _output)
@@ -1,20 +1,22 @@
 import click
-from functools import partial
-from typing    import Callable, NamedTuple
+from collections.abc import Iterable, Iterator, Sequence
+from functools       import lru_cache
+from pathlib         import Path
+from typing          import Optional, TextIO
 
 from display_colors.cell  import (
+	Cell,
+	Row,
 	cell_text,
 	colored_cell,
 )
 from display_colors.const import (
-	_8_BIT_GRAYSCALE_N,
-	_8_BIT_GRAYSCALE_OFFSET,
+	_8_BIT_COLORS_N,
 	_8_BIT_PALETTE_CUBE_SIDE,
-	_8_BIT_PALETTE_OFFSET,
-	_8_BIT_STANDARD_N,
 	_8_BIT_STANDARD_OFFSET,
 	COLOR_REPR,
 	COLORS,
+	Point,
 )
 from display_colors.init  import (
 	_4_BIT_BG_REPR_ATTR,
@@ -22,110 +24,199 @@ from display_colors.init  import (
 	_8_BIT_BG_REPR_ATTR,
 	_8_BIT_FG_REPR_ATTR,
 )
-from display_colors.math  import (
-	base_n_10,
+from display_colors.formats import (
+	check_format_options,
+	format_option,
+	format_rows,
 )
+from display_colors.layout import (
+	Block,
+	block_rows,
+	check_layout_options,
+	fit_option,
+	layout_rows,
+)
+from display_colors.output import (
+	cache_option,
+	cached_frame,
+	check_cache_options,
+	output_option,
+	page_frame,
+	page_option,
+	write_frame,
+)
+from display_colors.palette import (
+	CUBE_VIEWS,
+	GRAYSCALE_CODES,
+	STANDARD_CODES,
+	dark_text,
+	view_codes,
+)
+from display_colors.sgr   import (
+	minimal_sgr_option,
+)
+from display_colors.watch import (
+	check_watch_options,
+	cycle,
+	theme_option,
+	toggle,
+	watch,
+	watch_option,
+)
+
+FACE_NAME = {
+	'front':  'front',
+	'top':    'top',
+	'left':   'left side',
+	'back':   'back',
+	'bottom': 'bottom',
+	'right':  'right side',
+}
 
-class Point(NamedTuple):
-	"""Store a point in a three-dimensional cuboid"""
-	x: int
-	y: int
-	z: int
+DEFAULT_FACES = ('front', 'top', 'left')
 
-def p_disc_fgattr(p: Point, discriminant: Callable, _4_bit = False) -> str:
-	(color, modifier) = ('black', str.lower) if discriminant(p) else ('white', str.upper)
+COL_WIDTHS         = (7, 3, 5)          ## Standard, RGB and grayscale cell widths
+COMPACT_COL_WIDTHS = (3, 1, 4)          ## With --compact: an RGB cell is then about square
+
+HALF_BLOCK = '\u2580'                   ## Upper half block: its FG color fills the top half of the cell, its BG color the bottom
+
+OPPOSITE_FACE = {
+	'front':  'back',
+	'top':    'bottom',
+	'left':   'right',
+	'back':   'front',
+	'bottom': 'top',
+	'right':  'left',
+}
+
+def code_fgattr(code: int, _4_bit = False) -> str:
+	(color, modifier) = ('black', str.lower) if dark_text(code) else ('white', str.upper)
 	repr = modifier(COLOR_REPR[color])
-	return _4_BIT_FG_REPR_ATTR[repr]if _4_bit else _8_BIT_FG_REPR_ATTR[repr]
+	return _4_BIT_FG_REPR_ATTR[repr] if _4_bit else _8_BIT_FG_REPR_ATTR[repr]
 
-def p_code_bgattr(p: Point, p_code: Callable, _4_bit = False) -> str:
+def code_bgattr(code: int, _4_bit = False) -> str:
 	if _4_bit:
-		code     = p_code(p) - _8_BIT_STANDARD_OFFSET
+		code     = code - _8_BIT_STANDARD_OFFSET
 		color    = COLORS[code % len(COLORS)]
 		modifier = str.upper if code // len(COLORS) else str.lower
 		repr     = modifier(COLOR_REPR[color])
 		return _4_BIT_BG_REPR_ATTR[repr]
-	return _8_BIT_BG_REPR_ATTR[str(p_code(p))]
+	return _8_BIT_BG_REPR_ATTR[str(code)]
 
-def p_code_text(p: Point, p_code: Callable, decimal: bool) -> str:
+@lru_cache(maxsize = 64)
+def code_cells(cell_w: int, decimal: bool, _4_bit = False) -> tuple[Cell, ...]:
+	"""The cell for each palette code (each standard code if _4_bit), so a cube view is just a lookup per cell"""
 	fmt_spec = 'd' if decimal else 'X'
-	return f'{p_code(p):{fmt_spec}}'
-
-def display_standard(p_code: Callable, cell_w: int, decimal: bool) -> None:
-	def discriminant(p: Point) -> bool:
-		delta = p_code(p) - _8_BIT_STANDARD_OFFSET
-		return bool((delta // (_8_BIT_STANDARD_N / 2)) % 2)
-
-	dimensions = Point(_8_BIT_STANDARD_N, 1, 1)
-	print('8-bit', end = ' ')
-	display_cuboid(dimensions,
-								partial(p_disc_fgattr, discriminant = discriminant),
-								partial(p_code_bgattr, p_code       = p_code),
-								partial(p_code_text,   p_code       = p_code, decimal = decimal),
-								cell_w)
-	print('4-bit', end = ' ')
-	display_cuboid(dimensions,
-								partial(p_disc_fgattr, discriminant = discriminant, _4_bit = True),
-								partial(p_code_bgattr, p_code       = p_code,       _4_bit = True),
-								partial(p_code_text,   p_code       = p_code, decimal = decimal),
-								cell_w)
-
-def display_rgb_palette(p_code: Callable, cell_w: int, decimal: bool) -> None:
-	def discriminant(p: Point) -> bool:
-		delta = p_code(p) - _8_BIT_PALETTE_OFFSET
-		return bool((delta // (_8_BIT_PALETTE_CUBE_SIDE * _8_BIT_PALETTE_CUBE_SIDE / 2)) % 2)
+	codes    = STANDARD_CODES if _4_bit else range(_8_BIT_COLORS_N)
+	return tuple(colored_cell(f'{code_fgattr(code, _4_bit)};{code_bgattr(code, _4_bit)}', cell_text(text = f'{code:{fmt_spec}}', cell_w = cell_w))
+							 for code in codes)
+
+def cuboid_codes(dimensions: Point, codes: bytes) -> Iterator[list[bytes]]:
+	"""The slices of codes on each row of a table laid out dimensions.y rows by dimensions.z slices of dimensions.x"""
+	(slice_w, row_w) = (dimensions.x, dimensions.x * dimensions.z)
+	for start in range(0, dimensions.y * row_w, row_w):
+		yield [codes[i:i + slice_w] for i in range(start, start + row_w, slice_w)]
+
+def display_cuboid(dimensions: Point, codes: bytes, cells: Sequence[Cell]) -> Iterator[Row]:
+	"""Rows of the cells for a table of codes laid out dimensions.y rows by dimensions.z slices of dimensions.x"""
+	for slices in cuboid_codes(dimensions, codes):
+		row: Row = []
+		for slice in slices:
+			row.extend([cells[code] for code in slice])
+			row.append(' ')
+		yield row
+
+@lru_cache(maxsize = 4096)
+def half_block_cell(upper: int, lower: int, cell_w: int, lower_4_bit: bool = False) -> Cell:
+	return colored_cell(f'{_8_BIT_FG_REPR_ATTR[str(upper)]};{code_bgattr(lower, lower_4_bit)}', HALF_BLOCK * cell_w)
+
+def half_block_row(upper: list[bytes], lower: list[bytes], cell_w: int, lower_4_bit: bool = False) -> Row:
+	"""A row of half-block cells showing two rows of slices of codes: the upper row in FG, the lower in BG"""
+	row: Row = []
+	for upper_slice, lower_slice in zip(upper, lower):
+		row.extend([half_block_cell(a, b, cell_w, lower_4_bit) for a, b in zip(upper_slice, lower_slice)])
+		row.append(' ')
+	return row
+
+def display_compact_cuboid(dimensions: Point, codes: bytes, cell_w: int) -> Iterator[Row]:
+	"""Rows of half-block cells for a table of codes laid out as display_cuboid does, each showing two of its rows (dimensions.y is even)"""
+	rows = list(cuboid_codes(dimensions, codes))
+	for upper, lower in zip(rows[0::2], rows[1::2]):
+		yield half_block_row(upper, lower, cell_w)
+
+def compact_palette_blocks(std_col_w: int, rgb_col_w: int, gray_col_w: int, faces: Iterable[str] = DEFAULT_FACES) -> Iterator[Block]:
+	"""The sections of the palette in half blocks: two colors to a character cell, so in half the lines"""
+	std_codes = list(cuboid_codes(Point(len(STANDARD_CODES), 1, 1), STANDARD_CODES))
+	yield Block([half_block_row(std_codes[0], std_codes[0], std_col_w, lower_4_bit = True)], title = 'Standard and bright colors, 8-bit over 4-bit:')
 
 	dimensions = Point(_8_BIT_PALETTE_CUBE_SIDE, _8_BIT_PALETTE_CUBE_SIDE, _8_BIT_PALETTE_CUBE_SIDE)
-	display_cuboid(dimensions,
-								partial(p_disc_fgattr, discriminant = discriminant),
-								partial(p_code_bgattr, p_code       = p_code),
-								partial(p_code_text,   p_code       = p_code, decimal = decimal),
-								cell_w)
-
-def display_grayscale(p_code: Callable, cell_w: int, decimal: bool) -> None:
-	def discriminant(p: Point) -> bool:
-		delta = p_code(p) - _8_BIT_GRAYSCALE_OFFSET
-		return bool((delta // (_8_BIT_GRAYSCALE_N / 2)) % 2)
-
-	dimensions = Point(_8_BIT_GRAYSCALE_N, 1, 1)
-	display_cuboid(dimensions,
-								partial(p_disc_fgattr, discriminant = discriminant),
-								partial(p_code_bgattr, p_code       = p_code),
-								partial(p_code_text,   p_code       = p_code, decimal = decimal),
-								cell_w)
-
-def display_cuboid(dimensions: Point, p_fgattr: Callable, p_bgattr: Callable, f_text: Callable, cell_w: int) -> None:
-	for y in range(dimensions.y):
-		for z in range(dimensions.z):
-			for x in range(dimensions.x):
-				p = Point(x, y, z)
-				text = cell_text(text = f_text(p), cell_w = cell_w)
-				print(colored_cell(f'{p_fgattr(p)};{p_bgattr(p)}', text), end  = '')
-			print(' ', end = '')
-		print()
+	for i, face in enumerate(faces):
+		title = f'RGB cube, {FACE_NAME[face]}:' if i == 0 else f'{FACE_NAME[face].capitalize()}:'
+		yield Block(list(display_compact_cuboid(dimensions, view_codes(CUBE_VIEWS[face]), rgb_col_w)), unit = _8_BIT_PALETTE_CUBE_SIDE + 1, title = title, tile = True)
+
+	yield Block(list(display_compact_cuboid(Point(len(GRAYSCALE_CODES) // 2, 2, 1), GRAYSCALE_CODES, gray_col_w)), title = 'Grayscale:')
+
+def palette_blocks(std_col_w: int, rgb_col_w: int, gray_col_w: int, decimal: bool, faces: Iterable[str] = DEFAULT_FACES, compact: bool = False) -> Iterator[Block]:
+	"""The sections of the palette: each cube face tiles, wrapping between its slices (a slice's cells and the space after them)"""
+	faces = list(dict.fromkeys(faces))                          ## A face given twice is shown once, where it was first given
+	if compact:
+		yield from compact_palette_blocks(std_col_w, rgb_col_w, gray_col_w, faces)
+		return
+	dimensions = Point(len(STANDARD_CODES), 1, 1)
+	rows  = [['8-bit ', *row] for row in display_cuboid(dimensions, STANDARD_CODES, code_cells(std_col_w, decimal))]
+	rows += [['4-bit ', *row] for row in display_cuboid(dimensions, STANDARD_CODES, code_cells(std_col_w, decimal, _4_bit = True))]
+	yield Block(rows, key = 1, title = 'Standard and bright colors:')
+
+	dimensions = Point(_8_BIT_PALETTE_CUBE_SIDE, _8_BIT_PALETTE_CUBE_SIDE, _8_BIT_PALETTE_CUBE_SIDE)
+	for i, face in enumerate(faces):
+		title = f'RGB palette cube, {FACE_NAME[face]}:' if i == 0 else f'{FACE_NAME[face].capitalize()}:'
+		yield Block(list(display_cuboid(dimensions, view_codes(CUBE_VIEWS[face]), code_cells(rgb_col_w, decimal))), unit = _8_BIT_PALETTE_CUBE_SIDE + 1, title = title, tile = True)
+
+	yield Block(list(display_cuboid(Point(len(GRAYSCALE_CODES), 1, 1), GRAYSCALE_CODES, code_cells(gray_col_w, decimal))), title = 'Grayscale:')
+
+def col_widths(std_col_w: Optional[int], rgb_col_w: Optional[int], gray_col_w: Optional[int], compact: bool = False) -> tuple[int, int, int]:
+	"""The cell widths given, or the defaults for the layout"""
+	return tuple(w if w is not None else default for w, default in zip((std_col_w, rgb_col_w, gray_col_w), COMPACT_COL_WIDTHS if compact else COL_WIDTHS))
+
+def display_palette(std_col_w: int, rgb_col_w: int, gray_col_w: int, decimal: bool, faces: Iterable[str] = DEFAULT_FACES) -> Iterator[Row]:
+	for block in palette_blocks(std_col_w, rgb_col_w, gray_col_w, decimal, faces):
+		yield from block_rows(block)
 
 @click.command('8-bit')
-@click.option('--std-col-width', '_std_col_w', type = int, help = "Standard color cell width", default = 7, show_default = True)
-@click.option('--rgb-col-width', '_rgb_col_w', type = int, help = "RGB color cell width", default = 3, show_default = True)
-@click.option('--gray-col-width', '_gray_col_w', type = int, help = "Grayscale cell width", default = 5, show_default = True)
+@click.option('--std-col-width', '_std_col_w', type = int, help = f"Standard color cell width  [default: {COL_WIDTHS[0]}, {COMPACT_COL_WIDTHS[0]} with --compact]")
+@click.option('--rgb-col-width', '_rgb_col_w', type = int, help = f"RGB color cell width  [default: {COL_WIDTHS[1]}, {COMPACT_COL_WIDTHS[1]} with --compact]")
+@click.option('--gray-col-width', '_gray_col_w', type = int, help = f"Grayscale cell width  [default: {COL_WIDTHS[2]}, {COMPACT_COL_WIDTHS[2]} with --compact]")
+@cache_option
+@click.option('--compact',        '_compact', is_flag = True, help = "Draw two colors to a character cell, with half blocks and no codes", default = False, show_default = True)
 @click.option('--decimal',        '_decimal', is_flag = True, help = "Display color codes in decimal  [default: hex]", default = False, show_default = True)
-def display_8_bit(_std_col_w: int, _rgb_col_w: int, _gray_col_w: int, _decimal: bool) -> None:
-	"""The 16 standard colors, the RGB 6x6x6 palette, and 24 grays (BG)"""
-	for title, p_code in (
-		('Standard and bright colors:', lambda p: p.x - _8_BIT_STANDARD_OFFSET),
-	):
-		print(title)
-		display_standard(p_code, _std_col_w, _decimal)
-
-	for title, p_code in (
-		('RGB palette cube, front:', lambda p: base_n_10(_8_BIT_PALETTE_CUBE_SIDE, p.x, p.y, p.z) + _8_BIT_PALETTE_OFFSET),
-		('Top:',                     lambda p: base_n_10(_8_BIT_PALETTE_CUBE_SIDE, p.x, p.z, p.y) + _8_BIT_PALETTE_OFFSET),
-		('Left side:',               lambda p: base_n_10(_8_BIT_PALETTE_CUBE_SIDE, p.z, p.y, p.x) + _8_BIT_PALETTE_OFFSET),
-	):
-		print(title)
-		display_rgb_palette(p_code, _rgb_col_w, _decimal)
-
-	for title, p_code in (
-		('Grayscale:', lambda p: p.x + _8_BIT_GRAYSCALE_OFFSET),
-	):
-		print(title)
-		display_grayscale(p_code, _gray_col_w, _decimal)
+@click.option('--face',           '_faces',   type = click.Choice(list(FACE_NAME)), multiple = True, help = "RGB cube face to display (repeatable)", default = DEFAULT_FACES, show_default = True)
+@fit_option
+@format_option
+@minimal_sgr_option
+@output_option
+@page_option
+@theme_option
+@watch_option
+def display_8_bit(_std_col_w: Optional[int], _rgb_col_w: Optional[int], _gray_col_w: Optional[int], _cache: bool, _compact: bool, _decimal: bool, _faces: tuple[str, ...], _fit: Optional[int], _format: str, _minimal_sgr: bool, _output: TextIO, _page: bool, _theme: Optional[Path], _watch: bool) -> None:
+	"""The 16 standard colors, the RGB 6x6x6 palette, and 24 grays (BG)
+
+	With --watch, key d toggles --decimal and f shows the opposite faces of the cube.
+	"""
+	check_format_options(_format, _minimal_sgr)
+	check_watch_options(_watch, _theme, _format, _minimal_sgr)
+	check_layout_options(_fit, _page, _format, _output, _watch)
+	check_cache_options(_cache, _page, _watch)
+	(_std_col_w, _rgb_col_w, _gray_col_w) = col_widths(_std_col_w, _rgb_col_w, _gray_col_w, _compact)
+	if _watch:
+		options = {'decimal': _decimal, 'faces': _faces}
+		keys    = {'d': toggle(options, 'decimal'), 'f': cycle(options, 'faces', [_faces, tuple(OPPOSITE_FACE[face] for face in _faces)])}
+		watch(lambda: layout_rows(palette_blocks(_std_col_w, _rgb_col_w, _gray_col_w, options['decimal'], options['faces'], _compact), _fit), _output, keys, _theme)
+		return
+	rows   = layout_rows(palette_blocks(_std_col_w, _rgb_col_w, _gray_col_w, _decimal, _faces, _compact), _fit)
+	chunks = format_rows(rows, _format, _minimal_sgr)
+	if _page:
+		page_frame(chunks)
+	elif _cache:
+		cached_frame(chunks, _output)
+	else:
+		write_frame(chunks, _output)
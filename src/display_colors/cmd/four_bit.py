@@ -1,7 +1,12 @@
 import click
 from collections.abc import Iterable, Iterator
+from functools       import lru_cache
+from pathlib         import Path
+from typing          import Optional, TextIO
 
 from display_colors.cell import (
+	Cell,
+	Row,
 	cell_text,
 	colored_cell,
 	create_attrs,
@@ -15,6 +20,11 @@ from display_colors.const import (
 	WEIGHT_ATTR,
 	WEIGHT_REPR,
 )
+from display_colors.formats import (
+	check_format_options,
+	format_option,
+	format_rows,
+)
 from display_colors.gen import (
 	cat_gens,
 )
@@ -22,16 +32,43 @@ from display_colors.init import (
 	_4_BIT_BG_REPR_ATTR,
 	_4_BIT_FG_REPR_ATTR,
 )
+from display_colors.layout import (
+	Block,
+	check_layout_options,
+	fit_option,
+	layout_rows,
+)
+from display_colors.output import (
+	cache_option,
+	cached_frame,
+	check_cache_options,
+	output_option,
+	page_frame,
+	page_option,
+	write_frame,
+)
+from display_colors.sgr import (
+	minimal_sgr_option,
+)
+from display_colors.watch import (
+	check_watch_options,
+	theme_option,
+	toggle,
+	watch,
+	watch_option,
+)
 
-def blank_cell(cell_w: int) -> str:
+@lru_cache(maxsize = None)
+def blank_cell(cell_w: int) -> Cell:
 	return colored_cell(create_attrs('Default', 'df', 'df'), f'{"":{cell_w}}')
 
+@lru_cache(maxsize = None)
 def fg_attr_repr(weight: str, fg_repr: str, rev_video: bool, cell_w: int) -> str:
 	rv_attr = f';{REV_VIDEO}' if rev_video else ''
 	str     = f'{WEIGHT_ATTR[weight]};{_4_BIT_FG_REPR_ATTR[fg_repr]}{rv_attr}m'
 	return f'{str:>{cell_w}}'
 
-def fg_col_gen(weights: Iterable[str], reverse_video: bool, stanzas: bool) -> Iterator[str]:
+def fg_col_gen(weights: Iterable[str], reverse_video: bool, stanzas: bool) -> Iterator[Cell]:
 	col_w = len(COLOR_REPR['default'])
 	yield blank_cell(col_w)
 	prefix = f''
@@ -49,7 +86,7 @@ def fg_col_gen(weights: Iterable[str], reverse_video: bool, stanzas: bool) -> It
 				new_stanza = False
 		prefix = f'\n' if stanzas else f''
 
-def weight_col_gen(weights: Iterable[str], reverse_video: bool, header: bool = False) -> Iterator[str]:
+def weight_col_gen(weights: Iterable[str], reverse_video: bool, header: bool = False) -> Iterator[Cell]:
 	if header:
 		yield blank_cell(len(WEIGHT_REPR['Default']))
 	for _ in cat_gens(map(lambda color: COLOR_REPR[color].lower(), ('default',)),
@@ -62,7 +99,7 @@ def weight_col_gen(weights: Iterable[str], reverse_video: bool, header: bool = F
 				text  = f'{WEIGHT_REPR[weight]}'
 				yield colored_cell(attrs, text)
 
-def code_col_gen(weights: Iterable[str], reverse_video: bool, col_w: int) -> Iterator[str]:
+def code_col_gen(weights: Iterable[str], reverse_video: bool, col_w: int) -> Iterator[Cell]:
 	yield blank_cell(col_w)
 	for fg_repr in cat_gens(map(lambda color: COLOR_REPR[color].lower(), ('default',)),
 												  map(lambda color: COLOR_REPR[color].lower(), COLORS),
@@ -74,7 +111,7 @@ def code_col_gen(weights: Iterable[str], reverse_video: bool, col_w: int) -> Ite
 				text  = fg_attr_repr(weight, fg_repr, rev_video, col_w)
 				yield colored_cell(attrs, text)
 
-def column_gen(bg_repr: str, weights: Iterable[str], reverse_video: bool, cell_txt: str, col_w: int, transpose: bool) -> Iterator[str]:
+def column_gen(bg_repr: str, weights: Iterable[str], reverse_video: bool, cell_txt: str, col_w: int, transpose: bool) -> Iterator[Cell]:
 	if not transpose:
 		attrs = create_attrs('Default', 'df', 'df')
 		text  = cell_text(text = f'{_4_BIT_BG_REPR_ATTR[bg_repr]}m', cell_w = col_w)
@@ -90,7 +127,7 @@ def column_gen(bg_repr: str, weights: Iterable[str], reverse_video: bool, cell_t
 				text  = cell_text(fg_repr = fg, bg_repr = bg, text = cell_txt, transpose = transpose, cell_w = col_w)
 				yield colored_cell(attrs, text)
 
-def display_theme(weights: Iterable[str], reverse_video: bool, cell_txt: str, col_w: int, gutter: str, stanzas: bool, transpose: bool) -> None:
+def display_theme(weights: Iterable[str], reverse_video: bool, cell_txt: str, col_w: int, gutter: str, stanzas: bool, transpose: bool) -> Iterator[Row]:
 	headers = [
 		weight_col_gen(weights, reverse_video),
 	] if transpose else [
@@ -105,23 +142,61 @@ def display_theme(weights: Iterable[str], reverse_video: bool, cell_txt: str, co
 				 )]
 	while True:
 		try:
-			for col in headers:
-				print(next(col), end = ' ')
-			for col in cols:
-				print(next(col), end = gutter)
-			print()
+			row = [item for col in headers for item in (next(col), ' ')] + [item for col in cols for item in (next(col), gutter)]
 		except StopIteration:
 			break
+		yield row
+
+def weight_names(weights: Iterable[str]) -> list[str]:
+	"""The weights to display, from their names as options: 'dim', 'default', 'medium', 'bold' or 'all'"""
+	weights = [w.lower() for w in weights]
+	return list(ALL_WEIGHTS) if 'all' in weights else [w.capitalize() for w in weights]
+
+def theme_blocks(weights: Iterable[str], reverse_video: bool, cell_txt: str, col_w: int, gutter: str, stanzas: bool, transpose: bool) -> list[Block]:
+	"""The rows of display_theme as a block: its header columns label each row, and each BG color column (and gutter) is a unit"""
+	rows = list(display_theme(weights, reverse_video, cell_txt, col_w, gutter, stanzas, transpose))
+	return [Block(rows, key = 2 if transpose else 6, unit = 2)]
 
 @click.command('4-bit')
+@cache_option
 @click.option('--col-width',     '_col_w',        type = int,  help = "Column width",                                                  default = 7,     show_default = True)
+@fit_option
 @click.option('--gutter',        '_gutter',       type = str,  help = "String delimiting output columns  [default: empty string]",     default = '',    show_default = True)
+@format_option
+@minimal_sgr_option
+@output_option
+@page_option
 @click.option('--reverse-video', '_rev_video', is_flag = True, help = "Add 'background-color on foreground-color' in reverse video",   default = False, show_default = True)
 @click.option('--stanzas',       '_stanzas',   is_flag = True, help = "Group output rows by color (non-transposed only)",              default = False, show_default = True)
 @click.option('--text',          '_text',         type = str,  help = "Sample text in each cell (non-transposed only)",                default = 'gYw', show_default = True)
+@theme_option
 @click.option('--transpose',     '_transpose', is_flag = True, help = "Display foreground colors in column-major order  [default: row-major order]", default = False, show_default = True)
+@watch_option
 @click.option('--weight', '-w',  '_weights',      type = click.Choice(['dim', 'default', 'medium', 'bold', 'all'], case_sensitive = False), multiple = True, help = "Which weight font to display (use multiple times)", default = ['default', 'bold'], show_default = True)
-def display_4_bit(_weights: list[str], _rev_video: bool, _col_w: int, _gutter: str, _stanzas: bool, _text: str, _transpose: bool):
-	"""All combinations (FG on BG) of the 16 standard 4-bit colors"""
-	weights = ALL_WEIGHTS if 'all' in _weights else [w.capitalize() for w in _weights]
-	display_theme(weights, _rev_video, _text, col_w = _col_w, gutter = _gutter, stanzas = _stanzas, transpose = _transpose)
+def display_4_bit(_weights: list[str], _rev_video: bool, _col_w: int, _fit: Optional[int], _gutter: str, _stanzas: bool, _text: str, _theme: Optional[Path], _transpose: bool, _watch: bool, _format: str, _minimal_sgr: bool, _output: TextIO, _page: bool, _cache: bool):
+	"""All combinations (FG on BG) of the 16 standard 4-bit colors
+
+	With --watch, keys r, s and t toggle --reverse-video, --stanzas and --transpose.
+	"""
+	check_format_options(_format, _minimal_sgr)
+	check_watch_options(_watch, _theme, _format, _minimal_sgr)
+	check_layout_options(_fit, _page, _format, _output, _watch)
+	check_cache_options(_cache, _page, _watch)
+	weights = weight_names(_weights)
+	if _watch:
+		options = {'reverse_video': _rev_video, 'stanzas': _stanzas, 'transpose': _transpose}
+		keys    = {'r': toggle(options, 'reverse_video'), 's': toggle(options, 'stanzas'), 't': toggle(options, 'transpose')}
+		watch(lambda: layout_rows(theme_blocks(weights, options['reverse_video'], _text, col_w = _col_w, gutter = _gutter, stanzas = options['stanzas'], transpose = options['transpose']), _fit),
+					_output, keys, _theme)
+		return
+	if _fit is None:
+		rows  = display_theme(weights, _rev_video, _text, col_w = _col_w, gutter = _gutter, stanzas = _stanzas, transpose = _transpose)
+	else:
+		rows  = layout_rows(theme_blocks(weights, _rev_video, _text, col_w = _col_w, gutter = _gutter, stanzas = _stanzas, transpose = _transpose), _fit)
+	chunks  = format_rows(rows, _format, _minimal_sgr)
+	if _page:
+		page_frame(chunks)
+	elif _cache:
+		cached_frame(chunks, _output)
+	else:
+		write_frame(chunks, _output)
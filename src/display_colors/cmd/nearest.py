@@ -0,0 +1,66 @@
+import click
+import re
+from collections.abc import Iterable, Iterator
+from functools       import lru_cache
+from typing          import TextIO
+
+from display_colors.cell    import (
+	colored_cell,
+)
+from display_colors.colors  import (
+	hex_rgb,
+)
+from display_colors.const   import (
+	_24_BIT_BG_PREFIX,
+)
+from display_colors.init    import (
+	_4_BIT_BG_REPR_ATTR,
+	_8_BIT_BG_REPR_ATTR,
+)
+from display_colors.nearest import (
+	nearest_codes,
+)
+from display_colors.output  import (
+	output_option,
+	write_frame,
+)
+
+HEX_COLOR = re.compile(r'#[0-9a-fA-F]{6}\b')
+
+@lru_cache(maxsize = 2 ** 16)
+def color_record(color: str, swatch: bool) -> str:
+	"""One line of output for a '#rrggbb' color: the color, its nearest 8-bit code and nearest 4-bit color"""
+	rgb = hex_rgb(color)
+	(code, repr) = nearest_codes(rgb)
+	if not swatch:
+		return f'{color}\t{code}\t{repr}\n'
+	(r, g, b) = rgb
+	swatches = [colored_cell(attrs, '    ') for attrs in (f'{_24_BIT_BG_PREFIX}{r};{g};{b}', _8_BIT_BG_REPR_ATTR[str(code)], _4_BIT_BG_REPR_ATTR[repr])]
+	return f'{color}\t{code}\t{repr}\t{"".join(map(str, swatches))}\n'
+
+def nearest_lines(colors: Iterable[str], swatch: bool) -> Iterator[str]:
+	for color in colors:
+		yield color_record(color.lower(), swatch)
+
+def stream_colors(lines: Iterable[str]) -> Iterator[str]:
+	"""Every '#rrggbb' color in lines of text, such as a design-token file"""
+	for line in lines:
+		yield from HEX_COLOR.findall(line)
+
+def hex_color(ctx: click.Context, param: click.Parameter, values: tuple[str, ...]) -> list[str]:
+	try:
+		return ['#' + value.lstrip('#') for value in values if hex_rgb(value)]
+	except ValueError as e:
+		raise click.BadParameter(str(e))
+
+@click.command('nearest')
+@click.argument('colors', nargs = -1, callback = hex_color)
+@click.option('--input', '-i',   '_input',        type = click.File('r'), help = "Read colors from FILE when none are given  [default: stdin]", default = '-')
+@output_option
+@click.option('--swatch',        '_swatch',    is_flag = True, help = "Follow each line with the color and its two matches",              default = False, show_default = True)
+def nearest_colors(colors: list[str], _input: TextIO, _output: TextIO, _swatch: bool) -> None:
+	"""The 8-bit palette code and 4-bit color perceptually nearest to each '#rrggbb' color
+
+	With no COLORS, every '#rrggbb' in the input is matched, one line per color.
+	"""
+	write_frame(nearest_lines(colors or stream_colors(_input), _swatch), _output)
@@ -0,0 +1,79 @@
+import click
+import json
+import os
+from collections.abc import Iterator
+from typing          import Any, Optional, TextIO
+
+from display_colors.cache  import (
+	TERMINAL_ENV,
+	read_json,
+	replace_json,
+	terminal_cache_path,
+)
+from display_colors.output import (
+	output_option,
+	write_frame,
+)
+from display_colors.probe  import (
+	known_capabilities,
+	probe_terminal,
+	valid_capabilities,
+)
+from display_colors.tty    import (
+	TTY_PATH,
+	raw_tty,
+)
+
+ANSWER = {
+	True:  'yes',
+	False: 'no',
+	None:  'unknown',
+}
+
+def answer(value: Optional[bool]) -> str:
+	return ANSWER[value]
+
+def display_capabilities(capabilities: dict[str, Any]) -> Iterator[str]:
+	l_col_w = max(len(name) for name in [*capabilities['effects'], *capabilities['terminfo'], 'Device attributes']) + 2
+	yield f'{"Version:":<{l_col_w}}{capabilities["version"] or "unknown"}\n'
+	yield f'{"Device attributes:":<{l_col_w}}{";".join(capabilities["da1"]) or "unknown"}\n'
+	yield 'Color depths:\n'
+	for depth, value in capabilities['color_depths'].items():
+		yield f'  {depth:<{l_col_w - 2}}{answer(value)}\n'
+	yield 'Effects:\n'
+	for name, value in capabilities['effects'].items():
+		yield f'  {name:<{l_col_w - 2}}{answer(value)}\n'
+	if capabilities['terminfo']:
+		yield 'Terminfo:\n'
+		for name, value in capabilities['terminfo'].items():
+			yield f'  {name:<{l_col_w - 2}}{value}\n'
+
+@click.command('probe')
+@click.option('--cache/--no-cache', '_cache',     help = f"Use and update the capabilities cached for this terminal emulator (only with --tty {TTY_PATH})", default = True,  show_default = True)
+@click.option('--format',        '_format',       type = click.Choice(['text', 'json']), help = "Output format",                         default = 'text', show_default = True)
+@output_option
+@click.option('--refresh',       '_refresh',   is_flag = True, help = "Probe the terminal even if its capabilities are cached",             default = False, show_default = True)
+@click.option('--timeout',       '_timeout',      type = float, help = "Seconds to wait for the replies",                                  default = 1.0,   show_default = True)
+@click.option('--tty',           '_tty',          type = str,  help = "Terminal device to probe",                                      default = TTY_PATH, show_default = True)
+def probe_capabilities(_cache: bool, _format: str, _output: TextIO, _refresh: bool, _timeout: float, _tty: str) -> None:
+	"""The effects and color depths the terminal emulator reports supporting
+
+	The cache is that of the terminal emulator running this process, so another --tty neither reads nor
+	updates it.  Capabilities with fewer answers than the cached ones do not replace them.
+	"""
+	_cache       = _cache and _tty == TTY_PATH
+	path         = terminal_cache_path('capabilities')
+	capabilities = read_json(path, valid_capabilities) if _cache and not _refresh else None
+	if capabilities is None:
+		try:
+			with raw_tty(_tty) as fd:
+				capabilities = probe_terminal(fd, _timeout)
+		except OSError as e:
+			raise click.ClickException(f'Cannot probe {_tty}: {e.strerror}')
+		capabilities['environment'] = {name: os.environ.get(name, '') for name in TERMINAL_ENV}
+		if _cache and capabilities['da1']:                       ## No DA1 reply: nothing answered, so nothing is known
+			replace_json(path, capabilities, known_capabilities)
+	if _format == 'json':
+		write_frame([json.dumps(capabilities, indent = 1), '\n'], _output)
+	else:
+		write_frame(display_capabilities(capabilities), _output)
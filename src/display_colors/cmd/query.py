@@ -0,0 +1,131 @@
+import click
+import json
+import re
+from collections.abc import Iterable, Iterator
+from typing          import Any, TextIO
+
+from display_colors.cache  import (
+	read_json,
+	replace_json,
+	terminal_cache_path,
+)
+from display_colors.cell   import (
+	colored_cell,
+)
+from display_colors.const  import (
+	_8_BIT_COLORS_N,
+	_8_BIT_GRAYSCALE_OFFSET,
+	_8_BIT_PALETTE_OFFSET,
+	_8_BIT_STANDARD_OFFSET,
+	DA1_QUERY,
+	OSC_BEG,
+	OSC_END,
+)
+from display_colors.init   import (
+	_8_BIT_BG_REPR_ATTR,
+)
+from display_colors.output import (
+	output_option,
+	write_frame,
+)
+from display_colors.tty    import (
+	TTY_PATH,
+	raw_tty,
+	read_until,
+	write_all,
+)
+
+COLOR_REPLY = re.compile(rb'\033\](?:4;(\d+)|(1[01]));rgb:([0-9a-fA-F]{1,4})/([0-9a-fA-F]{1,4})/([0-9a-fA-F]{1,4})(?:\a|\033\\)')
+DA1_REPLY   = re.compile(rb'\033\[\?[0-9;]*c')
+COLOR_VALUE = re.compile(r'#[0-9a-f]{6}')
+
+DEFAULT_COLOR_NAME = {
+	'10': 'foreground',
+	'11': 'background',
+}
+
+SLOTS_PER_ROW = 8
+
+def channel_8_bit(digits: bytes) -> int:
+	"""Scale a 1- to 4-digit hex channel value, as terminals report them, to 8 bits"""
+	return round(int(digits, 16) * 255 / (16 ** len(digits) - 1))
+
+def parse_color_replies(data: bytes) -> dict[str, str]:
+	"""The '#rrggbb' colors in OSC 4/10/11 replies, by palette slot ('0' to '255') or 'foreground'/'background'"""
+	colors = dict()
+	for m in COLOR_REPLY.finditer(data):
+		(slot, ps, r, g, b) = m.groups()
+		name = slot.decode() if slot else DEFAULT_COLOR_NAME[ps.decode()]
+		colors[name] = '#' + ''.join(f'{channel_8_bit(c):02x}' for c in (r, g, b))
+	return colors
+
+def color_queries(slots: Iterable[int]) -> str:
+	return ''.join(f'{OSC_BEG}4;{slot};?{OSC_END}' for slot in slots)
+
+def query_palette(fd: int, batch: int, timeout: float) -> dict[str, str]:
+	"""Ask the terminal on fd for its default colors and every palette slot, batch slots per write
+
+	Each batch ends with a DA1 query.  Terminals answer in order, so its reply means every earlier
+	reply has arrived and a batch costs one round trip, however many slots the terminal ignores.
+	"""
+	defaults = ''.join(f'{OSC_BEG}{ps};?{OSC_END}' for ps in DEFAULT_COLOR_NAME)
+	colors   = dict()
+	for start in range(0, _8_BIT_COLORS_N, batch):
+		queries = color_queries(range(start, min(start + batch, _8_BIT_COLORS_N)))
+		write_all(fd, f'{defaults if start == 0 else ""}{queries}{DA1_QUERY}'.encode())
+		colors.update(parse_color_replies(read_until(fd, DA1_REPLY.search, timeout)))
+	return colors
+
+def valid_palette(colors: Any) -> bool:
+	"""Whether a cached palette has the shape query_palette() returns: '#rrggbb' strings by slot or default color name"""
+	return isinstance(colors, dict) and all(isinstance(name, str) and isinstance(color, str) and COLOR_VALUE.fullmatch(color)
+																				 for name, color in colors.items())
+
+def known_colors(colors: Any) -> int:
+	return len(colors) if valid_palette(colors) else 0
+
+def display_queried_palette(colors: dict[str, str], decimal: bool) -> Iterator[str]:
+	for name in DEFAULT_COLOR_NAME.values():
+		yield f'{name.capitalize() + ":":<12}{colors.get(name, "unknown")}\n'
+	fmt_spec = 'd' if decimal else 'X'
+	for title, start, stop in (
+		('Standard and bright colors:', _8_BIT_STANDARD_OFFSET,  _8_BIT_PALETTE_OFFSET),
+		('RGB palette cube:',           _8_BIT_PALETTE_OFFSET,   _8_BIT_GRAYSCALE_OFFSET),
+		('Grayscale:',                  _8_BIT_GRAYSCALE_OFFSET, _8_BIT_COLORS_N),
+	):
+		yield f'{title}\n'
+		for row in range(start, stop, SLOTS_PER_ROW):
+			cells = [f'{slot:>3{fmt_spec}} {colored_cell(_8_BIT_BG_REPR_ATTR[str(slot)], "  ")} {colors.get(str(slot), "-" * 7)}'
+							 for slot in range(row, min(row + SLOTS_PER_ROW, stop))]
+			yield ' '.join(cells) + '\n'
+
+@click.command('query')
+@click.option('--batch',         '_batch',        type = click.IntRange(min = 1), help = "Palette slots queried per round trip",                  default = 64,    show_default = True)
+@click.option('--cache/--no-cache', '_cache',     help = f"Use and update the palette cached for this terminal emulator (only with --tty {TTY_PATH})", default = True,  show_default = True)
+@click.option('--decimal',       '_decimal',   is_flag = True, help = "Display color codes in decimal  [default: hex]",                     default = False, show_default = True)
+@click.option('--format',        '_format',       type = click.Choice(['text', 'json']), help = "Output format",                         default = 'text', show_default = True)
+@output_option
+@click.option('--refresh',       '_refresh',   is_flag = True, help = "Query the terminal even if its palette is cached",                   default = False, show_default = True)
+@click.option('--timeout',       '_timeout',      type = float, help = "Seconds to wait for the replies to each batch",                    default = 1.0,   show_default = True)
+@click.option('--tty',           '_tty',          type = str,  help = "Terminal device to query",                                      default = TTY_PATH, show_default = True)
+def query_colors(_batch: int, _cache: bool, _decimal: bool, _format: str, _output: TextIO, _refresh: bool, _timeout: float, _tty: str) -> None:
+	"""The RGB values of the 256 palette colors and default FG and BG, as reported by the terminal emulator
+
+	The cache is that of the terminal emulator running this process, so another --tty neither reads nor
+	updates it.  A palette with fewer colors than the cached one does not replace it.
+	"""
+	_cache = _cache and _tty == TTY_PATH
+	path   = terminal_cache_path('palette')
+	colors = read_json(path, valid_palette) if _cache and not _refresh else None
+	if colors is None:
+		try:
+			with raw_tty(_tty) as fd:
+				colors = query_palette(fd, _batch, _timeout)
+		except OSError as e:
+			raise click.ClickException(f'Cannot query {_tty}: {e.strerror}')
+		if _cache and colors:
+			replace_json(path, colors, known_colors)
+	if _format == 'json':
+		write_frame([json.dumps(colors, indent = 1), '\n'], _output)
+	else:
+		write_frame(display_queried_palette(colors, _decimal), _output)
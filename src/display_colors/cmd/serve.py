@@ -0,0 +1,31 @@
+import asyncio
+import click
+from pathlib import Path
+from typing  import Optional
+
+from display_colors.server import (
+	HOST,
+	serve,
+)
+from display_colors.themes import (
+	XTERM_THEME,
+	Theme_Error,
+	load_theme,
+)
+
+@click.command('serve')
+@click.option('--cache-mb',      '_cache_mb',     type = click.IntRange(min = 0), help = "Megabytes of rendered responses kept in memory",       default = 64,    show_default = True)
+@click.option('--port', '-p',    '_port',         type = click.IntRange(0, 65535), help = "Port to listen on (0 for any free port)",             default = 8256,  show_default = True)
+@click.option('--theme',         '_theme',        type = click.Path(exists = True, dir_okay = False, path_type = Path), help = "Theme file giving the colors of the HTML pages  [default: xterm's]")
+def serve_patterns(_cache_mb: int, _port: int, _theme: Optional[Path]) -> None:
+	"""Serve the 4-bit, 8-bit and effects patterns to a browser on this machine, as HTML or ANSI text"""
+	try:
+		theme = load_theme(_theme) if _theme is not None else XTERM_THEME
+	except Theme_Error as e:
+		raise click.BadParameter(str(e), param_hint = '--theme')
+	try:
+		asyncio.run(serve(_port, theme, _cache_mb * 2 ** 20, lambda port: click.echo(f'Serving on http://{HOST}:{port}/ (press Ctrl-C to stop)')))
+	except OSError as e:
+		raise click.ClickException(f'Cannot listen on port {_port}: {e.strerror}')
+	except KeyboardInterrupt:
+		pass
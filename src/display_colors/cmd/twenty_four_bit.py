@@ -0,0 +1,128 @@
+import click
+import colorsys
+from collections.abc import Iterable, Iterator
+from typing          import Callable, Optional, TextIO
+
+from display_colors.cell   import (
+	Cell,
+	Row,
+	Segment,
+)
+from display_colors.colors import (
+	RGB,
+)
+from display_colors.const  import (
+	_24_BIT_BG_PREFIX,
+	_24_BIT_CHANNEL_MAX,
+	Point,
+)
+from display_colors.formats import (
+	check_format_options,
+	format_option,
+	format_rows,
+)
+from display_colors.layout import (
+	terminal_columns,
+)
+from display_colors.output import (
+	cache_option,
+	cached_frame,
+	output_option,
+	write_frame,
+)
+from display_colors.sgr    import (
+	minimal_sgr_option,
+)
+
+VIEWS = (
+	'ramps',
+	'hue',
+	'cube',
+)
+
+SEGMENT_CELLS = 1024      ## Cells built at a time, however wide a line is
+
+def level(i: int, n: int) -> int:
+	"""Channel level of step i of n, spread evenly from 0 to the maximum"""
+	return (i * _24_BIT_CHANNEL_MAX + (n - 1) // 2) // (n - 1) if n > 1 else _24_BIT_CHANNEL_MAX
+
+def rgb_bgattr(rgb: RGB) -> str:
+	(r, g, b) = rgb
+	return f'{_24_BIT_BG_PREFIX}{r};{g};{b}'
+
+def display_rgb_cuboid(dimensions: Point, p_rgb: Callable[[Point], RGB]) -> Iterator[Row]:
+	"""Same traversal as the 8-bit cube: slices side by side, one output line per y
+
+	Each line is yielded in Segments of SEGMENT_CELLS cells, so memory does not grow with the width.
+	"""
+	for y in range(dimensions.y):
+		row: Row = []
+		for z in range(dimensions.z):
+			for x in range(dimensions.x):
+				row.append(Cell(rgb_bgattr(p_rgb(Point(x, y, z))), ' '))       ## Too many distinct cells for colored_cell's cache
+				if len(row) == SEGMENT_CELLS:
+					yield Segment(row)
+					row = []
+			row.append(' ')
+		yield row
+
+def display_ramps(width: int) -> Iterator[Row]:
+	masks  = (
+		(1, 0, 0),
+		(0, 1, 0),
+		(0, 0, 1),
+		(1, 1, 1),
+	)
+
+	def p_rgb(p: Point) -> RGB:
+		(r, g, b) = masks[p.y]
+		v = level(p.x, width)
+		return (r * v, g * v, b * v)
+
+	yield from display_rgb_cuboid(Point(width, len(masks), 1), p_rgb)
+
+def display_hue_sweep(width: int, height: int) -> Iterator[Row]:
+	def to_rgb(h: float, s: float) -> RGB:
+		(r, g, b) = colorsys.hsv_to_rgb(h, s, 1.0)
+		return (round(r * _24_BIT_CHANNEL_MAX), round(g * _24_BIT_CHANNEL_MAX), round(b * _24_BIT_CHANNEL_MAX))
+
+	saturations  = [1.0 - level(y, height) / _24_BIT_CHANNEL_MAX if height > 1 else 1.0 for y in range(height)]
+	yield from display_rgb_cuboid(Point(width, height, 1), lambda p: to_rgb(p.x / width, saturations[p.y]))
+
+def display_cube_slices(width: int, height: int, slices: int) -> Iterator[Row]:
+	greens = [level(y, height) for y in range(height)]
+	blues  = [level(z, slices) for z in range(slices)]
+	yield from display_rgb_cuboid(Point(width, height, slices), lambda p: (level(p.x, width), greens[p.y], blues[p.z]))
+
+def display_truecolor(views: Iterable[str], width: int, height: int, slices: int) -> Iterator[Row]:
+	for view in views:
+		if view == 'ramps':
+			yield ['Red, green, blue and gray ramps:']
+			yield from display_ramps(width - 1)
+		elif view == 'hue':
+			yield ['Hue (left to right) and saturation (top to bottom):']
+			yield from display_hue_sweep(width - 1, height)
+		elif view == 'cube':
+			yield ['RGB cube, red (left to right), green (top to bottom), blue (one slice each):']
+			slices = min(slices, width // 2)                  ## Each slice at least one cell and a gap wide
+			yield from display_cube_slices(width // slices - 1, height, slices)
+
+@click.command('24-bit')
+@cache_option
+@click.option('--height',        '_height',       type = click.IntRange(min = 1), help = "Rows in the hue sweep and in each cube slice",                 default = 8,     show_default = True)
+@format_option
+@minimal_sgr_option
+@output_option
+@click.option('--slices',        '_slices',       type = click.IntRange(min = 1), help = "Number of slices of the RGB cube (blue levels)",               default = 4,     show_default = True)
+@click.option('--view',          '_views',        type = click.Choice(VIEWS, case_sensitive = False), multiple = True, help = "Which view to display (use multiple times)", default = VIEWS, show_default = True)
+@click.option('--width',         '_width',        type = click.IntRange(min = 2), help = "Output width  [default: terminal width]")
+def display_24_bit(_cache: bool, _height: int, _slices: int, _views: list[str], _width: Optional[int], _format: str, _minimal_sgr: bool, _output: TextIO) -> None:
+	"""RGB ramps, hue sweep and slices of the RGB cube in truecolor (BG)"""
+	check_format_options(_format, _minimal_sgr)
+	width  = _width or terminal_columns()
+	rows   = display_truecolor([v.lower() for v in _views], width, _height, _slices)
+	chunks = format_rows(rows, _format, _minimal_sgr)
+	if _cache:
+		cached_frame(chunks, _output)
+	else:
+		write_frame(chunks, _output)
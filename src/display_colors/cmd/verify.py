@@ -0,0 +1,51 @@
+import click
+from collections.abc import Iterator
+from typing          import TextIO
+
+from display_colors.decode import (
+	Difference,
+	Grid,
+	compare,
+	decode,
+	read_chunks,
+)
+from display_colors.output import (
+	output_option,
+	write_frame,
+)
+
+def describe(grid: Grid, difference: Difference) -> str:
+	"""The text of a run of cells and, if it is drawn in one rendition, the rendition"""
+	(y, start, end) = difference
+	(chars, renditions) = (grid.chars[y][start:end], grid.renditions[y][start:end]) if y < len(grid.chars) else ([], [])
+	if not chars:
+		return 'nothing'
+	rendition = str(renditions[0]) if len(set(renditions)) == 1 else 'mixed renditions'
+	return f"{''.join(chars)!r} ({rendition})"
+
+def report(expected: Grid, actual: Grid, differences: list[Difference], n: int, max_diffs: int) -> Iterator[str]:
+	for difference in differences[:max_diffs]:
+		(y, start, end) = difference
+		columns = f'column {start + 1}' if end == start + 1 else f'columns {start + 1}-{end}'
+		yield f'line {y + 1}, {columns}: expected {describe(expected, difference)}, got {describe(actual, difference)}\n'
+	if n > max_diffs:
+		yield f'... and {n - max_diffs} more\n'
+	yield f'{n} difference{"" if n == 1 else "s"}\n' if n else f'Same rendering: {len(expected.chars)} lines\n'
+
+@click.command('verify')
+@click.argument('expected', type = click.File('r', encoding = 'utf-8', errors = 'replace'))
+@click.argument('actual',   type = click.File('r', encoding = 'utf-8', errors = 'replace'))
+@click.option('--max-diffs',     '_max_diffs',    type = click.IntRange(min = 0), help = "Differences to list",                          default = 20,    show_default = True)
+@output_option
+@click.option('--strict',        '_strict',    is_flag = True, help = "Also compare the renditions of blank cells",                      default = False, show_default = True)
+def verify_captures(expected: TextIO, actual: TextIO, _max_diffs: int, _output: TextIO, _strict: bool) -> None:
+	"""Compare what two captured ANSI streams show, cell by cell, rather than their bytes
+
+	Each capture is decoded into lines of cells, each with its character, FG and BG colors, weight,
+	reverse video and effects.  Exits with status 1 if they differ.
+	"""
+	(expected_grid, actual_grid) = (decode(read_chunks(expected)), decode(read_chunks(actual)))
+	differences = list(compare(expected_grid, actual_grid, _strict))
+	write_frame(report(expected_grid, actual_grid, differences, len(differences), _max_diffs), _output)
+	if differences:
+		raise SystemExit(1)
@@ -0,0 +1,46 @@
+from collections.abc import Sequence
+
+from display_colors.const import (
+	_24_BIT_CHANNEL_MAX,
+	_8_BIT_GRAYSCALE_OFFSET,
+	_8_BIT_PALETTE_CUBE_SIDE,
+	_8_BIT_PALETTE_OFFSET,
+	_8_BIT_STANDARD_N,
+)
+
+RGB = tuple[int, int, int]
+
+_8_BIT_CUBE_LEVELS   = (0, 95, 135, 175, 215, 255)    ## xterm's channel levels for the 6x6x6 cube
+_8_BIT_GRAY_BASE     = 8
+_8_BIT_GRAY_STEP     = 10
+
+XTERM_STANDARD = (
+	'#000000', '#cd0000', '#00cd00', '#cdcd00', '#0000ee', '#cd00cd', '#00cdcd', '#e5e5e5',
+	'#7f7f7f', '#ff0000', '#00ff00', '#ffff00', '#5c5cff', '#ff00ff', '#00ffff', '#ffffff',
+)
+
+def hex_rgb(color: str) -> RGB:
+	"""'#rrggbb' (or 'rrggbb') as an RGB triple"""
+	color = color.lstrip('#')
+	if len(color) != 6:
+		raise ValueError(f'Not a #rrggbb color: {color!r}')
+	return (int(color[0:2], 16), int(color[2:4], 16), int(color[4:6], 16))
+
+def rgb_hex(rgb: RGB) -> str:
+	(r, g, b) = rgb
+	return f'#{r:02x}{g:02x}{b:02x}'
+
+def blend(a: RGB, b: RGB, weight: float) -> RGB:
+	"""weight of a mixed with (1 - weight) of b"""
+	return tuple(round(x * weight + y * (1 - weight)) for x, y in zip(a, b))
+
+def xterm_rgb(code: int, standard: Sequence[RGB]) -> RGB:
+	"""The RGB value of an 8-bit color code: standard gives the 16 standard colors, the rest are fixed"""
+	if code < _8_BIT_STANDARD_N:
+		return standard[code]
+	if code < _8_BIT_GRAYSCALE_OFFSET:
+		n = code - _8_BIT_PALETTE_OFFSET
+		(r, g, b) = (n // _8_BIT_PALETTE_CUBE_SIDE ** 2, n // _8_BIT_PALETTE_CUBE_SIDE % _8_BIT_PALETTE_CUBE_SIDE, n % _8_BIT_PALETTE_CUBE_SIDE)
+		return (_8_BIT_CUBE_LEVELS[r], _8_BIT_CUBE_LEVELS[g], _8_BIT_CUBE_LEVELS[b])
+	gray = min(_8_BIT_GRAY_BASE + _8_BIT_GRAY_STEP * (code - _8_BIT_GRAYSCALE_OFFSET), _24_BIT_CHANNEL_MAX)
+	return (gray, gray, gray)
@@ -10,11 +10,22 @@ BOLD      = '1'
 REV_VIDEO = '7'
 UNDERLINE = '4'
 
+REV_VIDEO_OFF = '27'
+
+OSC_BEG   = '\033]'
+OSC_END   = '\033\\'
+DA1_QUERY = '\033[c'    ## Every terminal answers this, so its reply marks the end of earlier replies
+
 _8_BIT_FG_PREFIX = '38;5;'
 _8_BIT_BG_PREFIX = '48;5;'
 
+_24_BIT_FG_PREFIX = '38;2;'
+_24_BIT_BG_PREFIX = '48;2;'
+
 CODE_COL_WIDTH = 8       ## Widest attr code is '22;97;7m'
 
+OUTPUT_CHUNK_SIZE = 2 ** 16  ## Most test patterns fit in a single write
+
 COLORS = (
 	'black',
 	'red',
@@ -46,6 +57,8 @@ _8_BIT_STANDARD_N        = 2 * len(COLORS)
 _8_BIT_PALETTE_N         = _8_BIT_PALETTE_CUBE_SIDE ** 3
 _8_BIT_GRAYSCALE_N       = _8_BIT_COLORS_N - _8_BIT_STANDARD_N - _8_BIT_PALETTE_N
 
+_24_BIT_CHANNEL_MAX      = 2 ** 8 - 1
+
 _8_BIT_STANDARD_OFFSET   = 0
 _8_BIT_PALETTE_OFFSET    = _8_BIT_STANDARD_OFFSET + _8_BIT_STANDARD_N
 _8_BIT_GRAYSCALE_OFFSET  = _8_BIT_PALETTE_OFFSET  + _8_BIT_PALETTE_N
@@ -83,6 +96,12 @@ WEIGHT_REPR = {
 	'Bold':    'Bld',
 }
 
+class Point(NamedTuple):
+	"""Store a point in a three-dimensional cuboid"""
+	x: int
+	y: int
+	z: int
+
 class Switch_Attr(NamedTuple):
 	"""Store attributes that switch a property on and off"""
 	on:  str
@@ -0,0 +1,301 @@
+import re
+import unicodedata
+from collections.abc import Callable, Iterable, Iterator
+from functools       import lru_cache
+from typing          import NamedTuple, TextIO
+
+from display_colors.const import (
+	BOLD,
+	DIM,
+	MEDIUM,
+	RESET,
+	REV_VIDEO,
+	REV_VIDEO_OFF,
+)
+from display_colors.sgr   import (
+	BG_CODES,
+	DEFAULT_BG,
+	DEFAULT_FG,
+	EFFECT_OFF,
+	EFFECT_ON,
+	FG_CODES,
+)
+
+TAB_WIDTH  = 8
+READ_CHUNK = 2 ** 20
+
+## The stream is scanned once: each match is a control sequence or a control character, and the text
+## between matches is written to the grid as it is.  CSI params, final byte; other escape sequences
+## (OSC, DCS, charset selection, ...) are recognised so they can be skipped.
+
+TOKEN = re.compile(r'\x1b\[([0-?]*)[ -/]*([@-~])|\x1b\][^\x07\x1b]*(?:\x07|\x1b\\)|\x1b[PX^_][^\x1b]*\x1b\\|\x1b[ -/]*[0-OQ-WYZ\\`-~]|([\x00-\x1a\x1c-\x1f])')
+
+DECORATIONS = frozenset(('underline', '2xunderline', 'strikethru', 'overlined', 'framed', 'encircled'))
+
+class Rendition(NamedTuple):
+	"""Store how a cell is drawn: weight, FG and BG codes in canonical form ('31', '38;5;n', '48;2;r;g;b'), reverse video and effects"""
+	weight:  str            = 'Default'
+	fg:      str            = DEFAULT_FG
+	bg:      str            = DEFAULT_BG
+	reverse: bool           = False
+	effects: frozenset[str] = frozenset()
+
+	def __str__(self) -> str:
+		return ' '.join([self.weight.lower(), self.fg, 'on', self.bg] + (['reverse'] if self.reverse else []) + sorted(self.effects))
+
+DEFAULT_RENDITION = Rendition()
+
+WEIGHT_CODE = {
+	BOLD:   'Bold',
+	DIM:    'Dim',
+	MEDIUM: 'Default',
+}
+
+def extended_color(prefix: str, codes: list[str]) -> tuple[str, int]:
+	"""The canonical form of a 38 or 48 color (codes follow the prefix) and how many codes it takes, or ('', n) if invalid"""
+	if codes[:1] == ['5'] and len(codes) >= 2 and codes[1].isdigit():
+		return (f'{prefix};5;{int(codes[1])}', 2)
+	if codes[:1] == ['2'] and len(codes) >= 4 and all(code.isdigit() for code in codes[1:4]):
+		return (f'{prefix};2;{int(codes[1])};{int(codes[2])};{int(codes[3])}', 4)
+	return ('', len(codes))
+
+@lru_cache(maxsize = 2 ** 14)
+def sgr_rendition(rendition: Rendition, params: str) -> Rendition:
+	"""The rendition after an SGR sequence with these params; memoized, this is the decoder's transition table"""
+	(weight, fg, bg, reverse) = rendition[:4]
+	effects = set(rendition.effects)
+	codes   = params.split(';')
+	i = 0
+	while i < len(codes):
+		code = codes[i]
+		if ':' in code:                                      ## Sub-parameters: 38:2::r:g:b, 38:5:n, 4:n
+			sub = code.split(':')
+			if sub[0] in ('38', '48'):
+				rgb = [s for s in sub[2:] if s][-3:] if sub[1:2] == ['2'] else sub[2:3]
+				(color, _) = extended_color(sub[0], sub[1:2] + rgb)
+				(fg, bg) = (color or fg, bg) if sub[0] == '38' else (fg, color or bg)
+			elif sub[0] == '4':
+				effects.difference_update(EFFECT_OFF['24'])
+				if sub[1:2] != ['0']:
+					effects.add('2xunderline' if sub[1:2] == ['2'] else 'underline')
+		elif code in ('', RESET):
+			(weight, fg, bg, reverse) = DEFAULT_RENDITION[:4]
+			effects.clear()
+		elif code in WEIGHT_CODE:
+			weight = WEIGHT_CODE[code]
+		elif code == REV_VIDEO or code == REV_VIDEO_OFF:
+			reverse = code == REV_VIDEO
+		elif code in FG_CODES or code == DEFAULT_FG:
+			fg = code
+		elif code in BG_CODES or code == DEFAULT_BG:
+			bg = code
+		elif code in ('38', '48'):
+			(color, n) = extended_color(code, codes[i + 1:i + 5])
+			(fg, bg) = (color or fg, bg) if code == '38' else (fg, color or bg)
+			i += n
+		elif code in EFFECT_ON:
+			effects.add(EFFECT_ON[code])
+		elif code in EFFECT_OFF:
+			effects.difference_update(EFFECT_OFF[code])
+		i += 1                                               ## Codes not modelled (fonts, colored underlines, ...) are ignored
+	return Rendition(weight, fg, bg, reverse, frozenset(effects))
+
+def joins(text: str) -> bool:
+	"""Whether text starts with a combining mark, which joins the character before it"""
+	return unicodedata.category(text[0]) in ('Mn', 'Me')
+
+@lru_cache(maxsize = 4096)
+def text_cells(text: str) -> tuple[str, ...]:
+	"""The cells text takes: two for a wide character, the second empty, and none for a combining mark, added to the cell before"""
+	cells: list[str] = []
+	for char in text:
+		if joins(char) and cells:
+			cells[-1 if cells[-1] or len(cells) == 1 else -2] += char
+		elif unicodedata.east_asian_width(char) in ('W', 'F'):
+			cells += [char, '']
+		else:
+			cells.append(char)
+	return tuple(cells)
+
+def csi_int(params: str, i: int = 0, default: int = 1) -> int:
+	values = params.split(';')
+	value  = values[i] if i < len(values) else ''
+	return int(value) if value.isdigit() and int(value) else default
+
+class Grid:
+	"""The lines of cells an ANSI stream draws: each cell's character and the rendition it was written in
+
+	Lines are as long as what was written on them; the screen width is not modelled, so long lines do
+	not wrap.  A wide character takes two cells, the second empty, and a combining mark joins the
+	character before it.  A newline also returns the cursor to the first column, as a terminal's output
+	processing does.  Cursor positioning and erasing in lines and on the screen are followed; modes
+	and other control sequences are skipped.
+	"""
+	def __init__(self) -> None:
+		self.chars:      list[list[str]]       = [[]]
+		self.renditions: list[list[Rendition]] = [[]]
+		(self.x, self.y) = (0, 0)
+		self.rendition   = DEFAULT_RENDITION
+		self.pending     = ''                                ## The start of an escape sequence split across chunks
+		self.csi: dict[str, Callable[[str], None]] = {
+			'm': self.sgr,
+			'H': self.cup,
+			'f': self.cup,
+			'A': lambda params: self.move(self.y - csi_int(params), self.x),
+			'B': lambda params: self.move(self.y + csi_int(params), self.x),
+			'C': lambda params: self.move(self.y, self.x + csi_int(params)),
+			'D': lambda params: self.move(self.y, self.x - csi_int(params)),
+			'G': lambda params: self.move(self.y, csi_int(params) - 1),
+			'd': lambda params: self.move(csi_int(params) - 1, self.x),
+			'K': self.erase_line,
+			'J': self.erase_screen,
+		}
+		self.controls: dict[str, Callable[[], None]] = {
+			'\n': lambda: self.move(self.y + 1, 0),
+			'\r': lambda: self.move(self.y, 0),
+			'\b': lambda: self.move(self.y, self.x - 1),
+			'\t': lambda: self.move(self.y, (self.x // TAB_WIDTH + 1) * TAB_WIDTH),
+		}
+
+	def sgr(self, params: str) -> None:
+		self.rendition = sgr_rendition(self.rendition, params)
+
+	def cup(self, params: str) -> None:
+		self.move(csi_int(params, 0) - 1, csi_int(params, 1) - 1)
+
+	def move(self, y: int, x: int) -> None:
+		(self.y, self.x) = (max(0, y), max(0, x))
+		while len(self.chars) <= self.y:
+			self.chars.append([])
+			self.renditions.append([])
+
+	def write(self, text: str) -> None:
+		(chars, renditions) = (self.chars[self.y], self.renditions[self.y])
+		ascii = text.isascii()
+		cells = text if ascii else text_cells(text)
+		if not ascii and cells and joins(cells[0]) and 0 < self.x <= len(chars):
+			x = self.x - 1 if chars[self.x - 1] or self.x == 1 else self.x - 2    ## Marks the character written before
+			(chars[x], cells) = (chars[x] + cells[0], cells[1:])
+		if self.x > len(chars):                              ## The cursor was moved past the end of the line
+			renditions.extend([DEFAULT_RENDITION] * (self.x - len(chars)))
+			chars.extend(' ' * (self.x - len(chars)))
+		end = self.x + len(cells)
+		if cells and 0 < self.x < len(chars) and chars[self.x] == '':
+			chars[self.x - 1] = ' '                              ## Half a wide character overwritten: the other half is blank
+		if cells and end < len(chars) and chars[end] == '':
+			chars[end] = ' '
+		chars[self.x:end]      = cells
+		renditions[self.x:end] = [self.rendition] * len(cells)
+		self.x = end
+
+	def erase_line(self, params: str) -> None:
+		(chars, renditions) = (self.chars[self.y], self.renditions[self.y])
+		mode = csi_int(params, default = 0)
+		if mode in (0, 2):
+			del chars[self.x:], renditions[self.x:]
+		if mode in (1, 2):
+			n = min(self.x + 1, len(chars))
+			chars[:n]      = ' ' * n
+			renditions[:n] = [DEFAULT_RENDITION] * n
+
+	def erase_screen(self, params: str) -> None:
+		mode = csi_int(params, default = 0)
+		if mode in (2, 3):
+			for y in range(len(self.chars)):
+				self.chars[y], self.renditions[y] = [], []
+		elif mode == 0:
+			self.erase_line('0')
+			del self.chars[self.y + 1:], self.renditions[self.y + 1:]
+
+	def feed(self, data: str) -> None:
+		"""Decode the next part of the stream
+
+		Text written at the end of a line, the usual case, is appended in place and SGR sequences are
+		looked up in the transition table; anything else goes through the handlers.
+		"""
+		pieces = TOKEN.split(self.pending + data)        ## text, params, final, control, text, ..., text
+		tail   = pieces[-1].find('\x1b')
+		(self.pending, pieces[-1]) = (pieces[-1][tail:], pieces[-1][:tail]) if tail >= 0 else ('', pieces[-1])
+		(csi, controls, rendition) = (self.csi, self.controls, self.rendition)
+		(chars, renditions, x) = (self.chars[self.y], self.renditions[self.y], self.x)
+		for text, params, final, control in zip(pieces[0::4], pieces[1::4], pieces[2::4], pieces[3::4]):
+			if text:
+				if x == len(chars) and '\x1b' not in text and (text.isascii() or not joins(text)):
+					cells = text if text.isascii() else text_cells(text)
+					chars += cells
+					renditions += [rendition] * len(cells)
+					x += len(cells)
+				else:
+					(self.x, self.rendition) = (x, rendition)
+					self.write(text.replace('\x1b', ''))
+					x = self.x
+			if final == 'm':
+				rendition = sgr_rendition(rendition, params)
+				continue
+			if final is not None:
+				if final not in csi or params.startswith(('?', '>', '<', '=')):
+					continue
+				(self.x, self.rendition) = (x, rendition)
+				csi[final](params)
+			elif control in controls:
+				self.x = x
+				controls[control]()
+			else:
+				continue
+			(chars, renditions, x) = (self.chars[self.y], self.renditions[self.y], self.x)
+		(self.x, self.rendition) = (x, rendition)
+		if pieces[-1]:
+			self.write(pieces[-1].replace('\x1b', ''))
+
+	def cells(self, y: int) -> list[tuple[str, Rendition]]:
+		return list(zip(self.chars[y], self.renditions[y]))
+
+def decode(chunks: Iterable[str]) -> Grid:
+	grid = Grid()
+	for chunk in chunks:
+		grid.feed(chunk)
+	return grid
+
+def read_chunks(f: TextIO, size: int = READ_CHUNK) -> Iterator[str]:
+	while chunk := f.read(size):
+		yield chunk
+
+## Comparing what two streams show, rather than their bytes: a space shows only its background
+## (the FG code, under reverse video) and any line drawn through it, and blank cells at the end
+## of a line show nothing
+
+def appearance(char: str, rendition: Rendition, strict: bool = False) -> tuple:
+	if char != ' ' or strict:
+		return (char, rendition)
+	decorations = rendition.effects & DECORATIONS
+	(fg, bg) = (rendition.bg, rendition.fg) if rendition.reverse else (rendition.fg, rendition.bg)
+	return (' ', bg, fg if decorations else '', decorations)
+
+BLANK = appearance(' ', DEFAULT_RENDITION)
+
+def line_appearance(grid: Grid, y: int, strict: bool = False) -> list[tuple]:
+	cells = [appearance(char, rendition, strict) for char, rendition in zip(grid.chars[y], grid.renditions[y])] if y < len(grid.chars) else []
+	while cells and cells[-1] == BLANK:
+		cells.pop()
+	return cells
+
+class Difference(NamedTuple):
+	"""Store a run of cells on one line that two grids draw differently: line and columns counted from 0, the end excluded"""
+	line:  int
+	start: int
+	end:   int
+
+def compare(expected: Grid, actual: Grid, strict: bool = False) -> Iterator[Difference]:
+	"""The runs of cells that two grids draw differently, line by line"""
+	for y in range(max(len(expected.chars), len(actual.chars))):
+		if y < len(expected.chars) and y < len(actual.chars) and expected.chars[y] == actual.chars[y] and expected.renditions[y] == actual.renditions[y]:
+			continue
+		(old, new) = (line_appearance(expected, y, strict), line_appearance(actual, y, strict))
+		start = None
+		for x in range(max(len(old), len(new)) + 1):
+			same = x >= len(old) and x >= len(new) or x < len(old) and x < len(new) and old[x] == new[x]
+			if not same and start is None:
+				start = x
+			elif same and start is not None:
+				yield Difference(y, start, x)
+				start = None
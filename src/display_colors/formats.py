@@ -0,0 +1,139 @@
+import io
+from collections.abc import Iterable, Iterator
+from functools       import lru_cache
+
+import click
+
+from display_colors.cell    import (
+	Cell,
+	Row,
+	Segment,
+	sgr_seq,
+)
+from display_colors.const   import (
+	REV_VIDEO,
+	REV_VIDEO_OFF,
+	RESET,
+	WEIGHT_ATTR,
+)
+from display_colors.profile import (
+	Profile,
+	current_profile,
+)
+from display_colors.sgr     import (
+	BG_CODES,
+	DEFAULT_BG,
+	DEFAULT_FG,
+	EXTENDED_COLOR_LEN,
+	FG_CODES,
+	minimize_sgr,
+)
+
+FORMATS = (
+	'ansi',
+	'ndjson',
+	'csv',
+)
+
+CELL_FIELDS = ('row', 'column', 'weight', 'fg', 'bg', 'reverse_video', 'text', 'sgr')
+
+WEIGHT_NAME = {code: name for name, code in WEIGHT_ATTR.items()}
+
+format_option = click.option('--format', '_format', type = click.Choice(FORMATS, case_sensitive = False), help = "Output the test pattern, or one record per cell", default = 'ansi', show_default = True)
+
+@lru_cache(maxsize = 4096)
+def attr_fields(attrs: str) -> tuple[str, str, str, bool]:
+	"""The weight, FG and BG codes and reverse video state an SGR attribute string sets, starting from the defaults"""
+	(weight, fg, bg, rev_video) = ('Default', DEFAULT_FG, DEFAULT_BG, False)
+	codes = attrs.split(';')
+	i = 0
+	while i < len(codes):
+		code = codes[i]
+		if code == RESET:
+			(weight, fg, bg, rev_video) = ('Default', DEFAULT_FG, DEFAULT_BG, False)
+		elif code in WEIGHT_NAME:
+			weight = WEIGHT_NAME[code]
+		elif code == REV_VIDEO or code == REV_VIDEO_OFF:
+			rev_video = code == REV_VIDEO
+		elif code in FG_CODES or code == DEFAULT_FG:
+			fg = code
+		elif code in BG_CODES or code == DEFAULT_BG:
+			bg = code
+		elif code in ('38', '48') and i + 1 < len(codes) and codes[i + 1] in EXTENDED_COLOR_LEN:
+			n = EXTENDED_COLOR_LEN[codes[i + 1]]
+			(fg, bg) = (';'.join(codes[i:i + n]), bg) if code == '38' else (fg, ';'.join(codes[i:i + n]))
+			i += n - 1
+		i += 1                                                     ## Effects are only recorded in the SGR string
+	return (weight, fg, bg, rev_video)
+
+def row_cells(row: Row) -> list[Cell]:
+	return [item for item in row if isinstance(item, Cell)]
+
+def numbered_cells(rows: Iterable[Row]) -> Iterator[list[tuple[int, int, Cell]]]:
+	"""The cells of each row with their row and column in the test pattern
+
+	Only lines with cells are numbered, so titles and blank lines are not counted.  A Segment's line
+	goes on in the next row.
+	"""
+	(r, c) = (0, 0)
+	for row in rows:
+		cells = row_cells(row)
+		yield [(r, c + i, cell) for i, cell in enumerate(cells)]
+		c += len(cells)
+		if not isinstance(row, Segment):
+			(r, c) = (r + 1, 0) if c else (r, 0)
+
+def ansi_lines(rows: Iterable[Row]) -> Iterator[str]:
+	for row in rows:
+		yield ''.join(map(str, row)) + ('' if isinstance(row, Segment) else '\n')
+
+## The JSON for the fields of a cell that depend only on its attributes or text is built once per distinct value
+
+@lru_cache(maxsize = 4096)
+def json_attrs(attrs: str) -> str:
+	(weight, fg, bg, rev_video) = attr_fields(attrs)
+	return f'"weight":"{weight}","fg":"{fg}","bg":"{bg}","reverse_video":{"true" if rev_video else "false"}'
+
+@lru_cache(maxsize = 4096)
+def json_str(s: str) -> str:
+	import json
+	return json.dumps(s)
+
+def ndjson_lines(rows: Iterable[Row]) -> Iterator[str]:
+	for cells in numbered_cells(rows):
+		yield ''.join([f'{{"row":{r},"column":{c},{json_attrs(cell.attrs)},"text":{json_str(cell.text)},"sgr":{json_str(sgr_seq(cell.attrs))}}}\n'
+									 for (r, c, cell) in cells])
+
+def csv_lines(rows: Iterable[Row]) -> Iterator[str]:
+	import csv
+	buf    = io.StringIO()
+	writer = csv.writer(buf, lineterminator = '\n')
+	writer.writerow(CELL_FIELDS)
+	for cells in numbered_cells(rows):
+		for (r, c, cell) in cells:
+			(weight, fg, bg, rev_video) = attr_fields(cell.attrs)
+			writer.writerow((r, c, weight, fg, bg, 'true' if rev_video else 'false', cell.text, sgr_seq(cell.attrs)))
+		yield buf.getvalue()
+		buf.seek(0)
+		buf.truncate()
+
+def counted_rows(rows: Iterable[Row], profile: Profile) -> Iterator[Row]:
+	for row in rows:
+		profile.counts['cells'] += sum(isinstance(item, Cell) for item in row)
+		yield row
+
+def check_format_options(fmt: str, minimal_sgr: bool) -> None:
+	if minimal_sgr and fmt.lower() != 'ansi':
+		raise click.UsageError('--minimal-sgr rewrites the ANSI test pattern: it cannot be combined with --format ndjson or csv')
+
+def format_rows(rows: Iterable[Row], fmt: str, minimal_sgr: bool = False) -> Iterator[str]:
+	"""The rows of a test pattern as ANSI text, or as one NDJSON or CSV record per cell"""
+	fmt = fmt.lower()
+	profile = current_profile()
+	if profile is not None:
+		rows = counted_rows(rows, profile)
+	if fmt == 'ndjson':
+		return ndjson_lines(rows)
+	if fmt == 'csv':
+		return csv_lines(rows)
+	return minimize_sgr(ansi_lines(rows)) if minimal_sgr else ansi_lines(rows)
@@ -1,6 +1,8 @@
-from typing import Callable
+from collections.abc import Mapping
+from types           import MappingProxyType
+from typing          import Callable
 
-from display_colors.const import (
+from display_colors.const   import (
 	_4_BIT_BG_COLOR_OFFSET,
 	_4_BIT_BRIGHT_BG_COLOR_OFFSET,
 	_4_BIT_BRIGHT_FG_COLOR_OFFSET,
@@ -25,13 +27,14 @@ from display_colors.const import (
 	COLOR_REPR,
 	Switch_Attr,
 )
+from display_colors.profile import (
+	phase,
+)
 
-_4_BIT_BG_REPR_ATTR: dict[str, str] = dict()
-_4_BIT_FG_REPR_ATTR: dict[str, str] = dict()
-_8_BIT_BG_REPR_ATTR: dict[str, str] = dict()
-_8_BIT_FG_REPR_ATTR: dict[str, str] = dict()
+def init_display_attributes() -> Mapping[str, Switch_Attr]:
+	"""Build the SGR effect switches; they are built once, at import, and are read-only"""
+	d: dict[str, Switch_Attr] = dict()
 
-def init_display_attributes(d: dict[str, Switch_Attr]) -> None:
 	def init_attribute(name: str, on: str, off: str) -> None:
 		d[name] = Switch_Attr(on = on, off = off)
 
@@ -56,7 +59,10 @@ def init_display_attributes(d: dict[str, Switch_Attr]) -> None:
 		):
 		init_attribute(name, on, off)
 
-def init_mappings() -> None:
+	return MappingProxyType(d)
+
+def init_mappings() -> tuple[Mapping[str, str], ...]:
+	"""Build the color code mappings; they are built once, at import, and are read-only"""
 	def init_mapping(target: dict[str, str], colors: tuple[str, ...], offset: int, modifier: Callable, prefix: str) -> None:
 		for code, color in enumerate(colors, start = offset):
 			target[modifier(COLOR_REPR[color])] = f'{prefix}{code}'
@@ -65,28 +71,41 @@ def init_mappings() -> None:
 		for code in range(offset, offset + n):
 			target[str(code)] = f'{prefix}{code}'
 
+	(_4_bit_bg, _4_bit_fg, _8_bit_bg, _8_bit_fg) = (dict(), dict(), dict(), dict())
+
 	for target, colors, offset, modifier, prefix in (
-		(_4_BIT_FG_REPR_ATTR, COLORS,               _4_BIT_FG_COLOR_OFFSET, str.lower, ''),
-		(_4_BIT_FG_REPR_ATTR, ('default',), _4_BIT_DEFAULT_FG_COLOR_OFFSET, str.lower, ''),
-		(_4_BIT_FG_REPR_ATTR, COLORS,        _4_BIT_BRIGHT_FG_COLOR_OFFSET, str.upper, ''),
-		(_4_BIT_BG_REPR_ATTR, COLORS,               _4_BIT_BG_COLOR_OFFSET, str.lower, ''),
-		(_4_BIT_BG_REPR_ATTR, ('default',), _4_BIT_DEFAULT_BG_COLOR_OFFSET, str.lower, ''),
-		(_4_BIT_BG_REPR_ATTR, COLORS,        _4_BIT_BRIGHT_BG_COLOR_OFFSET, str.upper, ''),
-
-		(_8_BIT_FG_REPR_ATTR, COLORS,               _8_BIT_FG_COLOR_OFFSET, str.lower, _8_BIT_FG_PREFIX),
-		(_8_BIT_FG_REPR_ATTR, COLORS,        _8_BIT_BRIGHT_FG_COLOR_OFFSET, str.upper, _8_BIT_FG_PREFIX),
-		(_8_BIT_BG_REPR_ATTR, COLORS,               _8_BIT_BG_COLOR_OFFSET, str.lower, _8_BIT_BG_PREFIX),
-		(_8_BIT_BG_REPR_ATTR, COLORS,        _8_BIT_BRIGHT_BG_COLOR_OFFSET, str.upper, _8_BIT_BG_PREFIX),
+		(_4_bit_fg,  COLORS,               _4_BIT_FG_COLOR_OFFSET, str.lower, ''),
+		(_4_bit_fg,  ('default',), _4_BIT_DEFAULT_FG_COLOR_OFFSET, str.lower, ''),
+		(_4_bit_fg,  COLORS,        _4_BIT_BRIGHT_FG_COLOR_OFFSET, str.upper, ''),
+		(_4_bit_bg,  COLORS,               _4_BIT_BG_COLOR_OFFSET, str.lower, ''),
+		(_4_bit_bg,  ('default',), _4_BIT_DEFAULT_BG_COLOR_OFFSET, str.lower, ''),
+		(_4_bit_bg,  COLORS,        _4_BIT_BRIGHT_BG_COLOR_OFFSET, str.upper, ''),
+
+		(_8_bit_fg,  COLORS,               _8_BIT_FG_COLOR_OFFSET, str.lower, _8_BIT_FG_PREFIX),
+		(_8_bit_fg,  COLORS,        _8_BIT_BRIGHT_FG_COLOR_OFFSET, str.upper, _8_BIT_FG_PREFIX),
+		(_8_bit_bg,  COLORS,               _8_BIT_BG_COLOR_OFFSET, str.lower, _8_BIT_BG_PREFIX),
+		(_8_bit_bg,  COLORS,        _8_BIT_BRIGHT_BG_COLOR_OFFSET, str.upper, _8_BIT_BG_PREFIX),
 	):
 		init_mapping(target, colors, offset, modifier, prefix)
 
 	for target, n, offset, prefix in (
-		(_8_BIT_BG_REPR_ATTR, _8_BIT_STANDARD_N,  _8_BIT_STANDARD_OFFSET,  _8_BIT_BG_PREFIX),
-		(_8_BIT_BG_REPR_ATTR, _8_BIT_PALETTE_N,   _8_BIT_PALETTE_OFFSET,   _8_BIT_BG_PREFIX),
-		(_8_BIT_BG_REPR_ATTR, _8_BIT_GRAYSCALE_N, _8_BIT_GRAYSCALE_OFFSET, _8_BIT_BG_PREFIX),
-		(_8_BIT_FG_REPR_ATTR, _8_BIT_STANDARD_N,  _8_BIT_STANDARD_OFFSET,  _8_BIT_FG_PREFIX),
-		(_8_BIT_FG_REPR_ATTR, _8_BIT_PALETTE_N,   _8_BIT_PALETTE_OFFSET,   _8_BIT_FG_PREFIX),
-		(_8_BIT_FG_REPR_ATTR, _8_BIT_GRAYSCALE_N, _8_BIT_GRAYSCALE_OFFSET, _8_BIT_FG_PREFIX),
+		(_8_bit_bg,  _8_BIT_STANDARD_N,  _8_BIT_STANDARD_OFFSET,  _8_BIT_BG_PREFIX),
+		(_8_bit_bg,  _8_BIT_PALETTE_N,   _8_BIT_PALETTE_OFFSET,   _8_BIT_BG_PREFIX),
+		(_8_bit_bg,  _8_BIT_GRAYSCALE_N, _8_BIT_GRAYSCALE_OFFSET, _8_BIT_BG_PREFIX),
+		(_8_bit_fg,  _8_BIT_STANDARD_N,  _8_BIT_STANDARD_OFFSET,  _8_BIT_FG_PREFIX),
+		(_8_bit_fg,  _8_BIT_PALETTE_N,   _8_BIT_PALETTE_OFFSET,   _8_BIT_FG_PREFIX),
+		(_8_bit_fg,  _8_BIT_GRAYSCALE_N, _8_BIT_GRAYSCALE_OFFSET, _8_BIT_FG_PREFIX),
 	):
 		init_palette(target, n, offset, prefix)
 
+	return tuple(MappingProxyType(target) for target in (_4_bit_bg, _4_bit_fg, _8_bit_bg, _8_bit_fg))
+
+with phase('init'):
+	(
+		_4_BIT_BG_REPR_ATTR,
+		_4_BIT_FG_REPR_ATTR,
+		_8_BIT_BG_REPR_ATTR,
+		_8_BIT_FG_REPR_ATTR,
+	) = init_mappings()
+
+	EFFECT_SWITCH = init_display_attributes()
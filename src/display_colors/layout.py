@@ -0,0 +1,147 @@
+import os
+import sys
+from collections.abc import Iterable, Iterator
+from functools       import lru_cache
+from typing          import NamedTuple, Optional, TextIO, Union
+
+import click
+
+from display_colors.cell import (
+	Cell,
+	Row,
+)
+from display_colors.sgr  import (
+	SGR_PATTERN,
+)
+
+TILE_GAP = ' '
+
+fit_option = click.option('--fit', '_fit', type = click.IntRange(min = 0), is_flag = False, flag_value = 0, help = "Wrap the test pattern to fit WIDTH columns  [default: the terminal's width]")
+
+def terminal_columns() -> int:
+	"""The terminal's width as shutil.get_terminal_size() gives it ($COLUMNS, stdout's terminal, or 80), without importing shutil"""
+	try:
+		columns = int(os.environ.get('COLUMNS', ''))
+	except ValueError:
+		columns = 0
+	if columns <= 0:
+		try:
+			columns = os.get_terminal_size(sys.__stdout__.fileno()).columns
+		except (AttributeError, ValueError, OSError):
+			columns = 0
+	return columns or 80
+
+class Block(NamedTuple):
+	"""Store rows that are laid out together
+
+	The first key items of each row label it and are repeated when the rest, in units of unit items,
+	is wrapped to fit.  Blocks that tile, with the same number of rows, may be placed side by side.
+	"""
+	rows:  list[Row]
+	key:   int           = 0
+	unit:  int           = 1
+	title: Optional[str] = None
+	tile:  bool          = False
+
+## Layout only measures the items of the rows it is given and regroups them, so each layout pass
+## (one per resize in --watch) reuses the cells already built
+
+@lru_cache(maxsize = 4096)
+def text_width(text: str) -> int:
+	"""Columns taken by the last line of text, escape sequences excluded"""
+	return len(SGR_PATTERN.sub('', text.rpartition('\n')[2]))
+
+def item_width(item: Union[Cell, str]) -> int:
+	return text_width(item.text if isinstance(item, Cell) else item)
+
+def row_width(row: Row) -> int:
+	return sum(map(item_width, row))
+
+def block_width(block: Block) -> int:
+	return max([len(block.title or '')] + [row_width(row) for row in block.rows])
+
+def block_rows(block: Block) -> Iterator[Row]:
+	if block.title is not None:
+		yield [block.title]
+	yield from block.rows
+
+def title_lines(title: str, width: int) -> Iterator[Row]:
+	"""A title in lines of at most width columns, broken between words, or within a word wider than that"""
+	line = ''
+	for word in title.split(' '):
+		if line and len(line) + 1 + len(word) > width:
+			yield [line]
+			line = ''
+		line = f'{line} {word}' if line else word
+		while len(line) > width:
+			yield [line[:width]]
+			line = line[width:]
+	yield [line]
+
+def unit_bands(block: Block, width: int) -> list[tuple[int, int]]:
+	"""Split the units of a block's rows into bands of at most width columns, key included: (first, last + 1) unit"""
+	key_w   = max(row_width(row[:block.key]) for row in block.rows)
+	n_units = max(-(-(len(row) - block.key) // block.unit) for row in block.rows)
+	unit_w  = [max(row_width(row[block.key + u * block.unit:block.key + (u + 1) * block.unit]) for row in block.rows) for u in range(n_units)]
+	(bands, start, band_w) = ([], 0, key_w)
+	for u, w in enumerate(unit_w):
+		if band_w + w > width and u > start:                      ## A unit too wide for any band gets one to itself
+			bands.append((start, u))
+			(start, band_w) = (u, key_w)
+		band_w += w
+	bands.append((start, n_units))
+	return bands
+
+def wrap_block(block: Block, width: int) -> Iterator[Row]:
+	if block.title is not None:
+		yield from title_lines(block.title, width)
+	for i, (start, stop) in enumerate(unit_bands(block, width)):
+		if i:
+			yield ['']
+		for row in block.rows:
+			yield row[:block.key] + row[block.key + start * block.unit:block.key + stop * block.unit]
+
+def tile_blocks(blocks: list[Block]) -> Iterator[Row]:
+	widths = [block_width(block) for block in blocks]
+	if any(block.title is not None for block in blocks):
+		yield [''.join(f'{block.title or "":<{w}}{TILE_GAP}' for block, w in zip(blocks, widths)).rstrip()]
+	for rows in zip(*(block.rows for block in blocks)):
+		tiled: Row = []
+		for row, w in zip(rows, widths):
+			tiled.extend(row)
+			tiled.append(' ' * (w - row_width(row)) + TILE_GAP)
+		tiled[-1] = tiled[-1][:-len(TILE_GAP)]                      ## No gap after the last block: the row is group_w wide
+		yield tiled
+
+def fit_blocks(blocks: Iterable[Block], width: int) -> Iterator[Row]:
+	"""The rows of blocks laid out in width columns: tiling blocks side by side where they fit, and wrapping wide blocks"""
+	group: list[Block] = []
+	group_w = 0
+	for block in [*blocks, None]:
+		w = block_width(block) if block is not None else 0
+		if group and (block is None or not block.tile or len(block.rows) != len(group[0].rows) or group_w + len(TILE_GAP) + w > width):
+			yield from tile_blocks(group) if len(group) > 1 else wrap_block(group[0], width)
+			(group, group_w) = ([], 0)
+		if block is None:
+			break
+		if block.tile and w <= width:
+			group.append(block)
+			group_w += w + (len(TILE_GAP) if len(group) > 1 else 0)
+		elif block_width(block) > width and block.unit:
+			yield from wrap_block(block, width)
+		else:
+			yield from block_rows(block)
+
+def check_layout_options(fit: Optional[int], page: bool, fmt: str, output: TextIO, watch: bool = False) -> None:
+	if (fit is not None or page) and fmt.lower() != 'ansi':
+		raise click.UsageError('--fit and --page lay out the ANSI test pattern: they cannot be combined with --format')
+	if page and (watch or getattr(output, 'name', '') != '<stdout>'):
+		raise click.UsageError('--page cannot be combined with --output or --watch')
+
+def layout_rows(blocks: Iterable[Block], fit: Optional[int]) -> Iterator[Row]:
+	"""The rows of blocks as they are, or fitted to fit columns (0 for the terminal's width)"""
+	if fit is None:
+		for block in blocks:
+			yield from block_rows(block)
+	else:
+		yield from fit_blocks(blocks, fit or terminal_columns())
@@ -0,0 +1,180 @@
+import html
+from collections.abc import Iterable, Iterator
+from functools       import lru_cache
+from typing          import NamedTuple
+
+from display_colors.cell    import (
+	Cell,
+	Row,
+)
+from display_colors.colors  import (
+	RGB,
+	blend,
+	rgb_hex,
+	xterm_rgb,
+)
+from display_colors.const   import (
+	RESET,
+	REV_VIDEO,
+	WEIGHT_ATTR,
+)
+from display_colors.formats import (
+	attr_fields,
+)
+from display_colors.sgr     import (
+	DEFAULT_BG,
+	DEFAULT_FG,
+	EFFECT_OFF,
+	EFFECT_ON,
+	EXTENDED_COLOR_LEN,
+	SGR_PATTERN,
+)
+from display_colors.themes  import (
+	Theme,
+)
+
+DIM_WEIGHT = 0.5       ## Share of the FG color in a dim cell, the rest being the BG color
+
+SVG_FONT_SIZE = 14
+SVG_CHAR_W    = 8.4    ## Advance of a monospace character at SVG_FONT_SIZE
+SVG_LINE_H    = 17
+SVG_BASELINE  = 13
+
+## The CSS that shows each effect
+
+EFFECT_DECORATION = {
+	'underline':   'underline',
+	'2xunderline': 'underline',
+	'blink':       'blink',
+	'strikethru':  'line-through',
+	'overlined':   'overline',
+}
+
+EFFECT_CSS = {
+	'italic':      'font-style:italic',
+	'2xunderline': 'text-decoration-style:double',
+	'conceal':     'color:transparent',
+	'framed':      'outline:1px solid',
+	'encircled':   'outline:1px solid;border-radius:0.5em',
+	'superscript': 'vertical-align:super;font-size:smaller',
+	'subscript':   'vertical-align:sub;font-size:smaller',
+}
+
+class Style(NamedTuple):
+	"""Store the graphic rendition text is shown in: weight and color codes, as attr_fields reads them, and effects"""
+	attrs:   str
+	effects: frozenset[str] = frozenset()
+
+DEFAULT_STYLE = Style(f'{RESET};{DEFAULT_FG};{DEFAULT_BG}')
+
+def code_rgb(code: str, theme: Theme, default: RGB) -> RGB:
+	"""The RGB value of an FG or BG code ('31', '101', '38;5;n', '48;2;r;g;b', ...) in a theme"""
+	if code in (DEFAULT_FG, DEFAULT_BG):
+		return default
+	codes = code.split(';')
+	if codes[0] in ('38', '48'):
+		return xterm_rgb(int(codes[2]), theme.standard) if codes[1] == '5' else (int(codes[2]), int(codes[3]), int(codes[4]))
+	n = int(code)
+	return theme.standard[n % 10 + (len(theme.standard) // 2 if n >= 90 else 0)]
+
+@lru_cache(maxsize = 4096)
+def cell_colors(attrs: str, theme: Theme) -> tuple[RGB, RGB, bool]:
+	"""The colors a cell with these attributes is drawn in, FG and BG, and whether it is bold"""
+	(weight, fg, bg, rev_video) = attr_fields(attrs)
+	(fg_rgb, bg_rgb) = (code_rgb(fg, theme, theme.foreground), code_rgb(bg, theme, theme.background))
+	if rev_video:
+		(fg_rgb, bg_rgb) = (bg_rgb, fg_rgb)
+	if weight == 'Dim':
+		fg_rgb = blend(fg_rgb, bg_rgb, DIM_WEIGHT)
+	return (fg_rgb, bg_rgb, weight == 'Bold')
+
+@lru_cache(maxsize = 4096)
+def cell_style(attrs: str, theme: Theme) -> str:
+	(fg, bg, bold) = cell_colors(attrs, theme)
+	return f'color:{rgb_hex(fg)};background:{rgb_hex(bg)}{";font-weight:bold" if bold else ""}'
+
+@lru_cache(maxsize = 4096)
+def sgr_style(style: Style, params: str) -> Style:
+	"""The style after an SGR sequence with these params"""
+	codes = params.split(';')
+	if codes[0] in ('', RESET):
+		style = DEFAULT_STYLE
+	(weight, fg, bg, rev_video) = attr_fields(f'{style.attrs};{params}')
+	effects = set(style.effects)
+	i = 0
+	while i < len(codes):
+		code = codes[i]
+		if code in ('', RESET):
+			effects.clear()
+		elif code in ('38', '48') and i + 1 < len(codes) and codes[i + 1] in EXTENDED_COLOR_LEN:
+			i += EXTENDED_COLOR_LEN[codes[i + 1]] - 1
+		elif code in EFFECT_ON:
+			effects.add(EFFECT_ON[code])
+		elif code in EFFECT_OFF:
+			effects.difference_update(EFFECT_OFF[code])
+		i += 1
+	weight = 'Default' if weight == 'Medium' else weight        ## Both are normal intensity
+	return Style(';'.join([WEIGHT_ATTR[weight], fg, bg] + ([REV_VIDEO] if rev_video else [])), frozenset(effects))
+
+@lru_cache(maxsize = 4096)
+def style_css(style: Style, theme: Theme) -> str:
+	css          = [cell_style(style.attrs, theme)]
+	decorations  = sorted({EFFECT_DECORATION[effect] for effect in style.effects if effect in EFFECT_DECORATION})
+	if decorations:
+		css.append(f'text-decoration-line:{" ".join(decorations)}')
+	css.extend(EFFECT_CSS[effect] for effect in sorted(style.effects) if effect in EFFECT_CSS)
+	return ';'.join(css)
+
+def ansi_html(chunks: Iterable[str], theme: Theme) -> Iterator[str]:
+	"""ANSI text as HTML, for use inside a <pre> element: each run of text in a span styled as its SGR sequences show it
+
+	A sequence must not be split across chunks.
+	"""
+	style = DEFAULT_STYLE
+	for chunk in chunks:
+		out = []
+		for i, piece in enumerate(SGR_PATTERN.split(chunk)):
+			if i % 2:
+				style = sgr_style(style, piece)
+			elif piece:
+				out.append(html.escape(piece) if style == DEFAULT_STYLE else f'<span style="{style_css(style, theme)}">{html.escape(piece)}</span>')
+		yield ''.join(out)
+
+def html_lines(rows: Iterable[Row], theme: Theme) -> Iterator[str]:
+	"""The rows of a test pattern as HTML, for use inside a <pre> element"""
+	for row in rows:
+		yield ''.join([f'<span style="{cell_style(item.attrs, theme)}">{html.escape(item.text)}</span>' if isinstance(item, Cell) else html.escape(item)
+									 for item in row]) + '\n'
+
+def html_pre(rows: Iterable[Row], theme: Theme) -> Iterator[str]:
+	yield f'<pre style="color:{rgb_hex(theme.foreground)};background:{rgb_hex(theme.background)};padding:1em">'
+	yield from html_lines(rows, theme)
+	yield '</pre>\n'
+
+def svg_document(rows: Iterable[Row], theme: Theme) -> Iterator[str]:
+	"""The rows of a test pattern as an SVG image, one character per grid cell"""
+	elements = []
+	(col, line, width) = (0, 0, 0)
+	for row in rows:
+		for item in row:
+			(fg, bg, bold) = cell_colors(item.attrs, theme) if isinstance(item, Cell) else (theme.foreground, theme.background, False)
+			for i, part in enumerate((item.text if isinstance(item, Cell) else item).split('\n')):
+				if i:
+					(col, line) = (0, line + 1)
+				if not part:
+					continue
+				(x, y, w) = (col * SVG_CHAR_W, line * SVG_LINE_H, len(part) * SVG_CHAR_W)
+				if bg != theme.background:
+					elements.append(f'<rect x="{x:g}" y="{y}" width="{w:g}" height="{SVG_LINE_H}" fill="{rgb_hex(bg)}"/>')
+				if part.strip():
+					weight = ' font-weight="bold"' if bold else ''
+					elements.append(f'<text x="{x:g}" y="{y + SVG_BASELINE}" textLength="{w:g}" fill="{rgb_hex(fg)}"{weight}>{html.escape(part)}</text>')
+				col += len(part)
+			width = max(width, col)
+		(col, line) = (0, line + 1)
+	yield (f'<svg xmlns="http://www.w3.org/2000/svg" width="{width * SVG_CHAR_W:g}" height="{line * SVG_LINE_H}" '
+				 f'font-family="monospace" font-size="{SVG_FONT_SIZE}" xml:space="preserve">\n')
+	yield f'<rect width="100%" height="100%" fill="{rgb_hex(theme.background)}"/>\n'
+	for element in elements:
+		yield f'{element}\n'
+	yield '</svg>\n'
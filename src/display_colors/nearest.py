@@ -0,0 +1,91 @@
+from collections.abc import Iterable
+
+from display_colors.colors import (
+	RGB,
+	XTERM_STANDARD,
+	hex_rgb,
+	xterm_rgb,
+)
+from display_colors.const  import (
+	_24_BIT_CHANNEL_MAX,
+	_8_BIT_COLORS_N,
+	_8_BIT_PALETTE_OFFSET,
+	COLOR_REPR,
+	COLORS,
+)
+
+Lab = tuple[float, float, float]
+
+## sRGB (D65) to CIE L*a*b*: distances between Lab colors approximate perceived differences (CIE76 delta E)
+
+SRGB_LINEAR = tuple(c / 12.92 if c <= 0.04045 else ((c + 0.055) / 1.055) ** 2.4 for c in (i / _24_BIT_CHANNEL_MAX for i in range(_24_BIT_CHANNEL_MAX + 1)))
+D65_WHITE   = (0.95047, 1.0, 1.08883)
+LAB_EPSILON = 216 / 24389
+LAB_KAPPA   = 24389 / 27
+
+BUCKET_SIZE = 8.0    ## Edge of the cubes the index divides Lab space into
+
+def lab_f(t: float) -> float:
+	return t ** (1 / 3) if t > LAB_EPSILON else (LAB_KAPPA * t + 16) / 116
+
+def rgb_lab(rgb: RGB) -> Lab:
+	(r, g, b) = (SRGB_LINEAR[rgb[0]], SRGB_LINEAR[rgb[1]], SRGB_LINEAR[rgb[2]])
+	fx = lab_f((0.4124564 * r + 0.3575761 * g + 0.1804375 * b) / D65_WHITE[0])
+	fy = lab_f((0.2126729 * r + 0.7151522 * g + 0.0721750 * b) / D65_WHITE[1])
+	fz = lab_f((0.0193339 * r + 0.1191920 * g + 0.9503041 * b) / D65_WHITE[2])
+	return (116 * fy - 16, 500 * (fx - fy), 200 * (fy - fz))
+
+class Palette_Index:
+	"""Find the palette color perceptually nearest to an RGB color without comparing it to every palette color
+
+	Lab space is divided into cubes of BUCKET_SIZE.  The first lookup in a cube finds the palette colors
+	that can be nearest to some point in it: those no farther from the cube than the farthest point of
+	the cube is from the palette color that is nearest at worst.  Later lookups compare only those.
+	"""
+	def __init__(self, colors: Iterable[tuple[object, RGB]]) -> None:
+		self.colors  = [(key, rgb_lab(rgb)) for key, rgb in colors]
+		self.buckets = dict()
+
+	def candidates(self, bucket: tuple[int, int, int]) -> list[tuple[object, Lab]]:
+		(lo_l, lo_a, lo_b) = (i * BUCKET_SIZE for i in bucket)
+		(hi_l, hi_a, hi_b) = (lo_l + BUCKET_SIZE, lo_a + BUCKET_SIZE, lo_b + BUCKET_SIZE)
+		(min_d2, max_d2) = ([], [])
+		for _, (l, a, b) in self.colors:
+			min_d2.append(max(lo_l - l, 0.0, l - hi_l) ** 2 + max(lo_a - a, 0.0, a - hi_a) ** 2 + max(lo_b - b, 0.0, b - hi_b) ** 2)
+			max_d2.append(max(l - lo_l, hi_l - l) ** 2 + max(a - lo_a, hi_a - a) ** 2 + max(b - lo_b, hi_b - b) ** 2)
+		worst = min(max_d2)
+		return [color for color, d2 in zip(self.colors, min_d2) if d2 <= worst]
+
+	def nearest(self, lab: Lab) -> object:
+		(l, a, b) = lab
+		bucket    = (int(l // BUCKET_SIZE), int(a // BUCKET_SIZE), int(b // BUCKET_SIZE))
+		colors    = self.buckets.get(bucket)
+		if colors is None:
+			colors = self.buckets[bucket] = self.candidates(bucket)
+		(best, best_d2) = (None, float('inf'))
+		for key, (cl, ca, cb) in colors:
+			d2 = (l - cl) ** 2 + (a - ca) ** 2 + (b - cb) ** 2
+			if d2 < best_d2:
+				(best, best_d2) = (key, d2)
+		return best
+
+## The 8-bit candidates are the fixed cube and grayscale colors; the standard 16 vary with the theme,
+## so they are matched by 4-bit code, against xterm's defaults
+
+STANDARD_REPR = tuple([COLOR_REPR[c].lower() for c in COLORS] + [COLOR_REPR[c].upper() for c in COLORS])
+
+_8_BIT_INDEX = Palette_Index((code, xterm_rgb(code, ())) for code in range(_8_BIT_PALETTE_OFFSET, _8_BIT_COLORS_N))
+_4_BIT_INDEX = Palette_Index(zip(STANDARD_REPR, (hex_rgb(c) for c in XTERM_STANDARD)))
+
+def nearest_8_bit(rgb: RGB) -> int:
+	"""The xterm-256 cube or grayscale code nearest to an RGB color"""
+	return _8_BIT_INDEX.nearest(rgb_lab(rgb))
+
+def nearest_4_bit(rgb: RGB) -> str:
+	"""The COLOR_REPR code ('re', 'RE' for bright red, ...) of the standard color nearest to an RGB color"""
+	return _4_BIT_INDEX.nearest(rgb_lab(rgb))
+
+def nearest_codes(rgb: RGB) -> tuple[int, str]:
+	"""Both of the above, converting the color to Lab once"""
+	lab = rgb_lab(rgb)
+	return (_8_BIT_INDEX.nearest(lab), _4_BIT_INDEX.nearest(lab))
@@ -0,0 +1,207 @@
+import errno
+import io
+import os
+from collections.abc import Callable, Iterable
+from typing          import BinaryIO, Optional, TextIO, Union
+
+import click
+
+from display_colors.const   import (
+	OUTPUT_CHUNK_SIZE,
+)
+from display_colors.profile import (
+	current_profile,
+	phase,
+)
+
+output_option = click.option('--output', '-o', '_output', type = click.File('w'), help = "Write the test pattern to FILE  [default: stdout]", default = '-')
+page_option   = click.option('--page', '_page', is_flag = True, help = "Show the test pattern in a pager", default = False, show_default = True)
+cache_option  = click.option('--cache', '_cache', is_flag = True, help = "Keep the rendered test pattern on disk and write it from there next time", default = False, show_default = True)
+
+## Options that do not change what is rendered, left out of the key of a cached pattern
+UNCACHED_OPTIONS = ('_cache', '_output', '_page', '_theme', '_watch')
+
+## sendfile() errors meaning it cannot copy to this fd (before Linux 2.6.33 or on macOS, one that is not a socket)
+SENDFILE_UNSUPPORTED = (errno.EINVAL, errno.ENOSYS, errno.ENOTSOCK, errno.EOPNOTSUPP)
+
+def page_frame(chunks: Iterable[str]) -> None:
+	"""Show rendered text in the user's pager, which must display colors (less is run with -R unless $LESS is set)"""
+	with phase('write'):
+		click.echo_via_pager(chunks, color = True)
+
+## Text is written to the file descriptor under the stream where there is one, so that a pipe or
+## terminal that is full is waited for whether or not its fd was left non-blocking (by a parent process,
+## say); text file objects raise BlockingIOError and may lose what they were writing.  Only on POSIX:
+## elsewhere the stream is written, so that a Windows console still gets its text by the console API
+
+Writer = Callable[[str], object]
+Copier = Callable[[bytes], object]
+
+def stream_fd(stream: TextIO) -> Optional[int]:
+	if os.name != 'posix':
+		return None
+	try:
+		return stream.fileno()
+	except (AttributeError, OSError, ValueError):              ## In memory, or closed
+		return None
+
+def wait_writable(fd: int) -> None:
+	"""Wait until there is room to write to fd, by poll() where there is one: select() takes no fd from 1024 up"""
+	import select
+	if hasattr(select, 'poll'):
+		poller = select.poll()
+		poller.register(fd, select.POLLOUT)
+		poller.poll()
+	else:
+		select.select([], [fd], [])
+
+def write_fd(fd: int, data: Union[bytes, memoryview]) -> tuple[int, int]:
+	"""Write all of data to fd, waiting for room whenever it is full (EAGAIN)
+
+	Returns how many times it was full and how many writes were partial.  If the reader has gone
+	away, BrokenPipeError is raised; the cli exits quietly on it.
+	"""
+	view = memoryview(data)
+	(stalls, partial) = (0, 0)
+	while view:
+		try:
+			n = os.write(fd, view)
+		except BlockingIOError:
+			stalls += 1
+			wait_writable(fd)
+			continue
+		partial += n < len(view)
+		view = view[n:]
+	return (stalls, partial)
+
+def stream_encoding(stream: TextIO) -> tuple[str, str]:
+	return (getattr(stream, 'encoding', None) or 'utf-8', getattr(stream, 'errors', None) or 'strict')
+
+def stream_writer(stream: TextIO) -> Writer:
+	"""A function writing text to stream: encoded and written to its fd, after what the stream holds, if it has one"""
+	fd = stream_fd(stream)
+	if fd is None:
+		return stream.write
+	stream.flush()
+	(encoding, errors) = stream_encoding(stream)
+	return lambda text: write_fd(fd, text.encode(encoding, errors))
+
+def copying_writer(write: Writer, copy: Copier, encoding: str, errors: str) -> Writer:
+	"""A function writing text with write and passing the same text, encoded, to copy"""
+	def write_copy(text: str) -> None:
+		write(text)
+		copy(text.encode(encoding, errors))
+	return write_copy
+
+def write_frame(chunks: Iterable[str], stream: TextIO, chunk_size: int = OUTPUT_CHUNK_SIZE, copy: Optional[Copier] = None) -> None:
+	"""Collect rendered text in memory and write it to stream in chunks of at least chunk_size characters
+
+	Only one chunk is held at a time, however much text the chunks add up to.  If copy is given, it
+	is called with the bytes written too.
+	"""
+	write   = stream_writer(stream)
+	if copy is not None:
+		write = copying_writer(write, copy, *stream_encoding(stream))
+	profile = current_profile()
+	if profile is None:
+		write_chunks(chunks, write, chunk_size)
+	else:
+		with profile.phase('generate'):                      ## Less the time in writes, which the writer counts
+			write_chunks(chunks, profile.writer(write, stream_encoding(stream)[0]), chunk_size)
+	with phase('write'):
+		stream.flush()
+
+def write_chunks(chunks: Iterable[str], write: Writer, chunk_size: int) -> None:
+	buf = io.StringIO()
+	for chunk in chunks:
+		buf.write(chunk)
+		if buf.tell() >= chunk_size:
+			write(buf.getvalue())
+			buf.seek(0)
+			buf.truncate()
+	write(buf.getvalue())
+
+def send_file(f: BinaryIO, stream: TextIO) -> int:
+	"""Write the contents of a binary file to stream and return their size
+
+	The kernel copies them from the file to the stream's fd (sendfile) where it can; otherwise the file
+	is mapped into memory and written from there.
+	"""
+	size = os.fstat(f.fileno()).st_size
+	fd   = stream_fd(stream)
+	if fd is None:
+		stream.write(f.read().decode(*stream_encoding(stream)))
+		return size
+	stream.flush()
+	offset = 0
+	while offset < size and hasattr(os, 'sendfile'):
+		try:
+			n = os.sendfile(fd, f.fileno(), offset, size - offset)
+		except BlockingIOError:
+			wait_writable(fd)
+			continue
+		except OSError as e:
+			if e.errno not in SENDFILE_UNSUPPORTED or offset:
+				raise
+			break
+		if not n:                                                ## Truncated since fstat()
+			return offset
+		offset += n
+	if offset < size:
+		import mmap
+		with mmap.mmap(f.fileno(), 0, access = mmap.ACCESS_READ) as m:
+			write_fd(fd, memoryview(m)[offset:size])
+	return size
+
+def check_cache_options(cache: bool, page: bool = False, watch: bool = False) -> None:
+	if cache and (page or watch):
+		raise click.UsageError('--cache cannot be combined with --page or --watch')
+
+def cached_frame(chunks: Iterable[str], stream: TextIO) -> None:
+	"""Write rendered text to stream from the pattern cache, or render it, write it and add it to the cache
+
+	The entry is that of the current command and its options, with the version, the terminal's width
+	and the stream's encoding; the text is rendered only if there is none.  If the cache cannot be
+	written, even partway through, the text is written as without --cache.
+	"""
+	from display_colors.cache  import (
+		Stored_Pattern,
+		count_pattern_use,
+		evict_patterns,
+		pattern_cache_limit,
+		pattern_cache_path,
+		touch_pattern,
+	)
+	from display_colors.layout import (
+		terminal_columns,
+	)
+	try:
+		limit = pattern_cache_limit()
+	except ValueError as e:
+		raise click.UsageError(str(e))
+	ctx  = click.get_current_context()
+	path = pattern_cache_path(ctx.command.name or '', {name: value for name, value in ctx.params.items() if name not in UNCACHED_OPTIONS},
+							  terminal_columns(), stream_encoding(stream)[0])
+	try:
+		f = open(path, 'rb')
+	except OSError:
+		pass
+	else:
+		with f, phase('write'):
+			touch_pattern(path)
+			size    = send_file(f, stream)
+			profile = current_profile()
+			if profile is not None:
+				profile.counts['bytes']  += size
+				profile.counts['writes'] += 1
+		count_pattern_use('hits')
+		return
+	try:
+		stored = Stored_Pattern(path)
+	except OSError:
+		write_frame(chunks, stream)
+		return
+	with stored:
+		write_frame(chunks, stream, copy = stored.write)
+	count_pattern_use('misses')
+	evict_patterns(limit)
@@ -0,0 +1,68 @@
+from functools import lru_cache
+from typing    import NamedTuple, Optional
+
+from display_colors.const import (
+	_8_BIT_GRAYSCALE_N,
+	_8_BIT_GRAYSCALE_OFFSET,
+	_8_BIT_PALETTE_CUBE_SIDE,
+	_8_BIT_PALETTE_OFFSET,
+	_8_BIT_STANDARD_N,
+	_8_BIT_STANDARD_OFFSET,
+)
+
+## Palette codes are laid out in flat tables of bytes, in the order the cells are displayed
+
+STANDARD_CODES  = bytes(range(_8_BIT_STANDARD_OFFSET, _8_BIT_STANDARD_OFFSET + _8_BIT_STANDARD_N))
+GRAYSCALE_CODES = bytes(range(_8_BIT_GRAYSCALE_OFFSET, _8_BIT_GRAYSCALE_OFFSET + _8_BIT_GRAYSCALE_N))
+
+AXIS_WEIGHT = {
+	'r': _8_BIT_PALETTE_CUBE_SIDE ** 2,
+	'g': _8_BIT_PALETTE_CUBE_SIDE,
+	'b': 1,
+}
+
+class Cube_View(NamedTuple):
+	"""Store the RGB cube axes shown across columns (x), down rows (y) and from slice to slice (z)
+
+	Each is 'r', 'g' or 'b', prefixed with '-' for levels that descend.
+	"""
+	x: str
+	y: str
+	z: str
+
+CUBE_VIEWS = {
+	'front':  Cube_View('b',  'g',  'r'),
+	'top':    Cube_View('b',  'r',  'g'),
+	'left':   Cube_View('r',  'g',  'b'),
+	'back':   Cube_View('-b', 'g',  '-r'),
+	'bottom': Cube_View('b',  '-r', '-g'),
+	'right':  Cube_View('-r', 'g',  '-b'),
+}
+
+def axis_levels(axis: str) -> tuple[int, range]:
+	"""The weight of an axis in a palette code, and its levels in display order"""
+	levels = range(_8_BIT_PALETTE_CUBE_SIDE)
+	return (AXIS_WEIGHT[axis.lstrip('-')], levels[::-1] if axis.startswith('-') else levels)
+
+@lru_cache(maxsize = 64)
+def view_codes(view: Cube_View, slices: Optional[tuple[int, ...]] = None) -> bytes:
+	"""The palette codes of a view of the RGB cube, row by row, each row slice by slice
+
+	slices selects levels along the view's z axis, by position (all of them by default), so
+	view_codes(Cube_View('b', 'g', 'r'), (2,)) is the plane of the cube where red is at level 2.
+	"""
+	if sorted(axis.lstrip('-') for axis in view) != sorted(AXIS_WEIGHT):
+		raise ValueError(f'{view} does not name each of r, g and b once')
+	((x_w, xs), (y_w, ys), (z_w, zs)) = (axis_levels(axis) for axis in view)
+	if slices is not None and not all(isinstance(i, int) and 0 <= i < len(zs) for i in slices):
+		raise ValueError(f'{slices} are not slice positions from 0 to {len(zs) - 1}')
+	zs = zs if slices is None else [zs[i] for i in slices]
+	return bytes(_8_BIT_PALETTE_OFFSET + y_w * y + z_w * z + x_w * x for y in ys for z in zs for x in xs)
+
+def dark_text(code: int) -> bool:
+	"""Whether the text on a palette color is black, as it is on the lighter half of each of the three groups of codes"""
+	if code < _8_BIT_PALETTE_OFFSET:
+		return bool((code - _8_BIT_STANDARD_OFFSET) // (_8_BIT_STANDARD_N // 2) % 2)
+	if code < _8_BIT_GRAYSCALE_OFFSET:
+		return bool((code - _8_BIT_PALETTE_OFFSET) // (_8_BIT_PALETTE_CUBE_SIDE ** 2 // 2) % 2)
+	return bool((code - _8_BIT_GRAYSCALE_OFFSET) // (_8_BIT_GRAYSCALE_N // 2) % 2)
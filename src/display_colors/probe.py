@@ -0,0 +1,123 @@
+import re
+from collections.abc import Mapping
+from typing          import Any, Optional
+
+from display_colors.cache import (
+	read_json,
+	terminal_cache_path,
+)
+from display_colors.const import (
+	DA1_QUERY,
+	RESET,
+	SGR_BEG,
+	SGR_END,
+	Switch_Attr,
+)
+from display_colors.init  import (
+	EFFECT_SWITCH,
+)
+from display_colors.tty   import (
+	read_until,
+	write_all,
+)
+
+DCS_BEG = '\033P'
+ST      = '\033\\'
+
+XTVERSION_QUERY = '\033[>0q'
+DECRQSS_SGR     = f'{DCS_BEG}$qm{ST}'       ## Request the current SGR attributes
+
+XTVERSION_REPLY = re.compile(rb'\033P>\|([^\033]*)\033\\')
+DECRQSS_REPLY   = re.compile(rb'\033P([01])\$r([0-9;:]*)m?\033\\')
+XTGETTCAP_REPLY = re.compile(rb'\033P([01])\+r([0-9a-fA-F]*)(?:=([0-9a-fA-F]*))?\033\\')
+DA1_REPLY       = re.compile(rb'\033\[\?([0-9;]*)c')
+
+DA1_ANSI_COLOR = '22'
+
+## Each color depth is tested by setting a color only that depth can express and reading the attributes back
+
+COLOR_DEPTH_SGR = {
+	'4-bit':  '91',
+	'8-bit':  '38;5;123',
+	'24-bit': '38;2;10;20;30',
+}
+
+COLOR_DEPTH_REPORTED = {
+	'4-bit':  re.compile(r'(?:^|;)91(?:;|$)'),
+	'8-bit':  re.compile(r'38[:;]5[:;]123'),
+	'24-bit': re.compile(r'38[:;]2[:;](?:\d*[:;])?10[:;]20[:;]30'),
+}
+
+TCAP_NAMES = ('TN', 'colors', 'RGB', 'Tc', 'Smulx')    ## terminfo capabilities (XTGETTCAP) about color and effects
+
+def sgr(params: str) -> str:
+	return f'{SGR_BEG}{params}{SGR_END}'
+
+def probe_queries(switches: Mapping[str, Switch_Attr]) -> tuple[str, list[str]]:
+	"""Every query of a probe, in one string, and the names of the SGR tests in the order of their DECRQSS replies
+
+	Each test sets its attributes from a clean state and asks for them back; the attributes are reset
+	afterwards.  DA1 goes last: every terminal answers it, and in order, so its reply ends the probe.
+	"""
+	tests = [(name, sw.on) for name, sw in switches.items()] + list(COLOR_DEPTH_SGR.items())
+	sgr_queries = ''.join(f'{sgr(f"{RESET};{params}")}{DECRQSS_SGR}' for _, params in tests)
+	tcap_queries = ''.join(f'{DCS_BEG}+q{name.encode().hex()}{ST}' for name in TCAP_NAMES)
+	return (f'{XTVERSION_QUERY}{sgr_queries}{sgr(RESET)}{tcap_queries}{DA1_QUERY}', [name for name, _ in tests])
+
+def reported(attrs: Optional[str], code: str) -> Optional[bool]:
+	"""Whether a DECRQSS reply lists an SGR code, or None if there was no valid reply"""
+	return None if attrs is None else code in attrs.replace(':', ';').split(';')
+
+def parse_probe_replies(data: bytes, switches: Mapping[str, Switch_Attr], tests: list[str]) -> dict[str, Any]:
+	"""What the replies to probe_queries say about the terminal; None means it did not say"""
+	version = XTVERSION_REPLY.search(data)
+	da1     = DA1_REPLY.search(data)
+	attrs   = [params.decode() if valid == b'1' else None for valid, params in DECRQSS_REPLY.findall(data)]
+	sgr     = dict(zip(tests, attrs)) if len(attrs) == len(tests) else dict()    ## Unpaired replies cannot be trusted
+	tcap    = {bytes.fromhex(name.decode()).decode(): bytes.fromhex(value.decode()).decode()
+						 for valid, name, value in XTGETTCAP_REPLY.findall(data) if valid == b'1'}
+	da1_params = da1.group(1).decode().split(';') if da1 else []
+
+	effects = {name: reported(sgr.get(name), sw.on) if sw.on != sw.off else None    ## An attribute that is its own off switch leaves no trace
+						 for name, sw in switches.items()}
+	depths  = {depth: None if sgr.get(depth) is None else bool(pattern.search(sgr[depth])) for depth, pattern in COLOR_DEPTH_REPORTED.items()}
+	if DA1_ANSI_COLOR in da1_params:
+		depths['4-bit'] = True
+	if tcap.get('colors', '').isdigit() and int(tcap['colors']) >= 256:
+		depths['8-bit'] = True
+	if 'RGB' in tcap or 'Tc' in tcap:
+		depths['24-bit'] = True
+	return {
+		'version':      version.group(1).decode(errors = 'replace') if version else None,
+		'da1':          da1_params,
+		'effects':      effects,
+		'color_depths': depths,
+		'terminfo':     tcap,
+	}
+
+def probe_terminal(fd: int, timeout: float) -> dict[str, Any]:
+	"""Send every query in one write and read the replies until DA1's, or until timeout seconds have passed"""
+	(queries, tests) = probe_queries(EFFECT_SWITCH)
+	write_all(fd, queries.encode())
+	return parse_probe_replies(read_until(fd, DA1_REPLY.search, timeout), EFFECT_SWITCH, tests)
+
+def valid_capabilities(capabilities: Any) -> bool:
+	"""Whether cached capabilities have the shape parse_probe_replies() returns"""
+	def answers(value: Any) -> bool:
+		return isinstance(value, dict) and all(isinstance(answer, bool) or answer is None for answer in value.values())
+	return (isinstance(capabilities, dict)
+					and (capabilities.get('version') is None or isinstance(capabilities['version'], str))
+					and isinstance(capabilities.get('da1'), list) and all(isinstance(param, str) for param in capabilities['da1'])
+					and answers(capabilities.get('effects')) and answers(capabilities.get('color_depths'))
+					and isinstance(capabilities.get('terminfo'), dict) and all(isinstance(value, str) for value in capabilities['terminfo'].values()))
+
+def known_capabilities(capabilities: Any) -> int:
+	"""How many of the probe's questions the terminal answered"""
+	if not valid_capabilities(capabilities):
+		return 0
+	answers = [*capabilities.get('effects', {}).values(), *capabilities.get('color_depths', {}).values(), capabilities.get('version')]
+	return sum(answer is not None for answer in answers) + len(capabilities.get('terminfo', {})) + bool(capabilities.get('da1'))
+
+def cached_capabilities() -> Optional[dict[str, Any]]:
+	"""The capabilities last probed for the terminal emulator running this process, without asking it"""
+	return read_json(terminal_cache_path('capabilities'), valid_capabilities)
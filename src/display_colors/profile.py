@@ -0,0 +1,182 @@
+import click
+import contextlib
+import os
+import sys
+import time
+from collections.abc import Callable, Iterator
+from contextvars     import ContextVar
+from typing          import TYPE_CHECKING, Any, ContextManager, Optional
+
+if TYPE_CHECKING:
+	import cProfile
+
+## The cli group imports this module on every run: what only a report needs is imported when reporting
+
+TRACE_ENV = 'DISPLAY_COLORS_TRACE'
+STATS_TOP = 15                         ## Functions listed in the text report when cProfile is on
+
+PHASES = ('import', 'init', 'generate', 'write')
+
+class Profile:
+	"""Collect where one invocation's time goes: the time in each phase, excluding phases nested in it, and counts
+
+	Phases: 'import' of the subcommand's modules, 'init' of the color tables, 'generate' of the test
+	pattern (rows, cells and their text) and 'write' to the output stream, flushes included.
+	"""
+	def __init__(self) -> None:
+		self.start   = time.perf_counter()
+		self.seconds = dict.fromkeys(PHASES, 0.0)
+		self.counts  = {'cells': 0, 'bytes': 0, 'writes': 0}
+		self.nested: list[float] = []                      ## Time in phases nested in each open phase
+		self.text       = False
+		self.json_path:  Optional[str]                = None
+		self.stats_path: Optional[str]                = None
+		self.profiler:   Optional['cProfile.Profile'] = None
+
+	def add(self, name: str, seconds: float, inner: float = 0.0) -> None:
+		"""Count time in a phase, less the time in phases nested in it; the enclosing phase excludes it all"""
+		self.seconds[name] = self.seconds.get(name, 0.0) + seconds - inner
+		if self.nested:
+			self.nested[-1] += seconds
+
+	@contextlib.contextmanager
+	def phase(self, name: str) -> Iterator[None]:
+		start = time.perf_counter()
+		self.nested.append(0.0)
+		try:
+			yield
+		finally:
+			self.add(name, time.perf_counter() - start, self.nested.pop())
+
+	def writer(self, write: Callable[[str], object], encoding: str) -> Callable[[str], None]:
+		"""Time and count the calls to a function writing text, and the bytes it writes"""
+		def timed_write(text: str) -> None:
+			start = time.perf_counter()
+			write(text)
+			self.add('write', time.perf_counter() - start)
+			self.counts['writes'] += 1
+			self.counts['bytes']  += len(text.encode(encoding, errors = 'replace'))
+		return timed_write
+
+	def summary(self, command: Optional[str], total: float) -> dict[str, Any]:
+		import platform
+		from display_colors       import __version__
+		from display_colors.cache import TERMINAL_ENV
+		return {
+			'command':  command,
+			'argv':     sys.argv[1:],
+			'version':  __version__,
+			'python':   platform.python_version(),
+			'platform': platform.platform(),
+			'terminal': {name: os.environ.get(name, '') for name in TERMINAL_ENV},
+			'seconds':  {'total': total, **self.seconds, 'other': max(0.0, total - sum(self.seconds.values()))},
+			'counts':   self.counts,
+		}
+
+	def text_report(self, summary: dict[str, Any]) -> Iterator[str]:
+		seconds = summary['seconds']
+		yield f'display-colors {summary["command"] or ""}: {seconds["total"] * 1e3:.1f} ms\n'
+		for name, value in seconds.items():
+			if name != 'total':
+				yield f'  {name:<10}{value * 1e3:9.1f} ms\n'
+		counts = summary['counts']
+		yield f'  {counts["cells"]:,} cells, {counts["bytes"]:,} bytes in {counts["writes"]:,} write{"" if counts["writes"] == 1 else "s"}\n'
+		if self.profiler is not None:
+			import io
+			import pstats
+			out = io.StringIO()
+			pstats.Stats(self.profiler, stream = out).sort_stats('cumulative').print_stats(STATS_TOP)
+			yield out.getvalue()
+
+	def report(self, command: Optional[str]) -> None:
+		total = time.perf_counter() - self.start
+		if self.profiler is not None:
+			self.profiler.disable()
+			if self.stats_path is not None:
+				self.profiler.dump_stats(self.stats_path)
+		summary = self.summary(command, total)
+		if self.text:
+			click.echo(''.join(self.text_report(summary)), err = True, nl = False)
+		if self.json_path is not None:
+			import json
+			line = json.dumps(summary) + '\n'
+			if self.json_path == '-':
+				click.echo(line, err = True, nl = False)
+			else:
+				with open(self.json_path, 'a', encoding = 'utf-8') as f:        ## One line per invocation, for collection
+					f.write(line)
+
+## The profile of this invocation, when profiling is on.  A context variable rather than a global, so the
+## render functions called from other threads (each starting with an empty context) are not counted in it
+
+PROFILE: ContextVar[Optional[Profile]] = ContextVar('PROFILE', default = None)
+
+def current_profile() -> Optional[Profile]:
+	return PROFILE.get()
+
+def phase(name: str) -> ContextManager[None]:
+	profile = PROFILE.get()
+	return profile.phase(name) if profile is not None else contextlib.nullcontext()
+
+def start_profile(ctx: click.Context) -> Profile:
+	"""The invocation's profile, started if need be; it is reported when the command's context closes"""
+	profile = PROFILE.get()
+	if profile is None:
+		profile = Profile()
+		token   = PROFILE.set(profile)
+
+		def report() -> None:
+			PROFILE.reset(token)
+			profile.report(ctx.invoked_subcommand)
+		ctx.call_on_close(report)
+	return profile
+
+def start_stats(profile: Profile, path: str) -> None:
+	profile.stats_path = path
+	if profile.profiler is None:
+		import cProfile
+		profile.profiler = cProfile.Profile()
+		profile.profiler.enable()
+
+def trace_settings(value: str) -> dict[str, Optional[str]]:
+	"""The settings of DISPLAY_COLORS_TRACE: comma-separated 'text' (or '1'), 'json' (to stderr) or 'json=FILE', and 'stats=FILE'"""
+	settings: dict[str, Optional[str]] = dict()
+	for item in filter(None, (item.strip() for item in value.split(','))):
+		(name, _, arg) = item.partition('=')
+		if name in ('1', 'text') and not arg:
+			settings['text'] = None
+		elif name == 'json':
+			settings['json'] = arg or '-'
+		elif name == 'stats' and arg:
+			settings['stats'] = arg
+		else:
+			raise click.UsageError(f"{TRACE_ENV}: invalid setting {item!r}: expected 'text', 'json', 'json=FILE' or 'stats=FILE'")
+	return settings
+
+def profile_callback(ctx: click.Context, param: click.Parameter, value: Any) -> Any:
+	"""Start profiling as the options are parsed, before the subcommand's modules are imported"""
+	if param.name == '_profile':
+		settings = trace_settings(os.environ.get(TRACE_ENV, ''))
+		if settings:
+			profile = start_profile(ctx)
+			profile.text      = profile.text or 'text' in settings
+			profile.json_path = profile.json_path or settings.get('json')
+			if 'stats' in settings:
+				start_stats(profile, settings['stats'])
+	if not value:
+		return value
+	profile = start_profile(ctx)
+	if param.name == '_profile':
+		profile.text = True
+	elif param.name == '_profile_json':
+		profile.json_path = value
+	elif param.name == '_profile_stats':
+		start_stats(profile, value)
+	return value
+
+profile_option       = click.option('--profile',       '_profile',       is_flag = True, expose_value = False, is_eager = True, callback = profile_callback,
+																			help = f"Report where the time goes, to stderr  [env var: {TRACE_ENV}]")
+profile_json_option  = click.option('--profile-json',  '_profile_json',  type = click.Path(dir_okay = False, allow_dash = True), expose_value = False, is_eager = True, callback = profile_callback,
+																			help = "Append a JSON summary of the profile to FILE ('-' for stderr)")
+profile_stats_option = click.option('--profile-stats', '_profile_stats', type = click.Path(dir_okay = False), expose_value = False, is_eager = True, callback = profile_callback,
+																			help = "Run under cProfile and save its statistics to FILE, for pstats")
@@ -0,0 +1,109 @@
+from collections.abc import Iterable, Iterator
+from typing          import Optional
+
+from display_colors.cmd.effects         import (
+	attribute_blocks,
+	test_attributes,
+)
+from display_colors.cmd.eight_bit       import (
+	DEFAULT_FACES,
+	FACE_NAME,
+	col_widths,
+	palette_blocks,
+)
+from display_colors.cmd.four_bit        import (
+	display_theme,
+	theme_blocks,
+	weight_names,
+)
+from display_colors.cmd.twenty_four_bit import (
+	VIEWS,
+	display_truecolor,
+)
+from display_colors.const               import (
+	ALL_WEIGHTS,
+)
+from display_colors.formats             import (
+	FORMATS,
+	format_rows,
+)
+from display_colors.layout              import (
+	layout_rows,
+)
+
+## The test patterns as a library: each function takes the options of the command of the same name
+## as keyword arguments and returns the chunks of text that command writes.  Rendering reads only
+## read-only tables and caches of immutable values, and each call builds its own rows, so the
+## functions are reentrant and can be called from any number of threads at once.  The options are all
+## checked when a function is called, so a ValueError is raised then rather than from the first chunk
+
+WEIGHTS = (*(w.lower() for w in ALL_WEIGHTS), 'all')
+
+def check_choices(name: str, values: Iterable[str], choices: Iterable[str]) -> None:
+	for value in values:
+		if not isinstance(value, str) or value.lower() not in choices:
+			raise ValueError(f'Invalid {name} {value!r}: expected one of {", ".join(choices)}')
+
+def check_int(name: str, value: int, minimum: int) -> None:
+	if isinstance(value, bool) or not isinstance(value, int) or value < minimum:
+		raise ValueError(f'Invalid {name} {value!r}: expected an integer of at least {minimum}')
+
+def check_str(name: str, value: str) -> None:
+	if not isinstance(value, str):
+		raise ValueError(f'Invalid {name} {value!r}: expected a string')
+
+def check_options(fmt: str, fit: Optional[int] = None, minimal_sgr: bool = False) -> None:
+	check_choices('format', [fmt], FORMATS)
+	if fit is not None:
+		check_int('fit width', fit, 0)
+	if minimal_sgr and fmt.lower() != 'ansi':
+		raise ValueError('minimal_sgr rewrites the ANSI test pattern: it cannot be combined with another format')
+	if fit is not None and fit < 1:
+		raise ValueError(f'Invalid fit width {fit}: a library call has no terminal to take it from')
+	if fit is not None and fmt.lower() != 'ansi':
+		raise ValueError('fit lays out the ANSI test pattern: it cannot be combined with another format')
+
+def four_bit(*, weights: Iterable[str] = ('default', 'bold'), reverse_video: bool = False, text: str = 'gYw', col_width: int = 7, gutter: str = '',
+						 stanzas: bool = False, transpose: bool = False, fit: Optional[int] = None, fmt: str = 'ansi', minimal_sgr: bool = False) -> Iterator[str]:
+	"""All combinations (FG on BG) of the 16 standard 4-bit colors, as `display-colors 4-bit`"""
+	weights = list(weights)
+	check_choices('weight', weights, WEIGHTS)
+	check_str('text', text)
+	check_int('col_width', col_width, 0)
+	check_str('gutter', gutter)
+	check_options(fmt, fit, minimal_sgr)
+	if fit is None:
+		rows = display_theme(weight_names(weights), reverse_video, text, col_width, gutter, stanzas, transpose)
+	else:
+		rows = layout_rows(theme_blocks(weight_names(weights), reverse_video, text, col_width, gutter, stanzas, transpose), fit)
+	return format_rows(rows, fmt, minimal_sgr)
+
+def eight_bit(*, std_col_width: Optional[int] = None, rgb_col_width: Optional[int] = None, gray_col_width: Optional[int] = None, compact: bool = False, decimal: bool = False,
+							faces: Iterable[str] = DEFAULT_FACES, fit: Optional[int] = None, fmt: str = 'ansi', minimal_sgr: bool = False) -> Iterator[str]:
+	"""The 16 standard colors, the RGB 6x6x6 palette, and 24 grays, as `display-colors 8-bit` (cell widths default as for the command)"""
+	faces = tuple(face.lower() for face in faces)
+	check_choices('face', faces, FACE_NAME)
+	for (name, width) in (('std_col_width', std_col_width), ('rgb_col_width', rgb_col_width), ('gray_col_width', gray_col_width)):
+		if width is not None:
+			check_int(name, width, 0)
+	check_options(fmt, fit, minimal_sgr)
+	(std_col_w, rgb_col_w, gray_col_w) = col_widths(std_col_width, rgb_col_width, gray_col_width, compact)
+	return format_rows(layout_rows(palette_blocks(std_col_w, rgb_col_w, gray_col_w, decimal, faces, compact), fit), fmt, minimal_sgr)
+
+def twenty_four_bit(*, views: Iterable[str] = VIEWS, width: int = 80, height: int = 8, slices: int = 4, fmt: str = 'ansi', minimal_sgr: bool = False) -> Iterator[str]:
+	"""RGB ramps, hue sweep and slices of the RGB cube in truecolor, as `display-colors 24-bit` (width is not taken from a terminal)"""
+	views = [v.lower() for v in views]
+	check_choices('view', views, VIEWS)
+	check_int('width', width, 2)
+	check_int('height', height, 1)
+	check_int('slices', slices, 1)
+	check_options(fmt, minimal_sgr = minimal_sgr)
+	return format_rows(display_truecolor(views, width, height, slices), fmt, minimal_sgr)
+
+def effects(*, pattern: str = '|', gutter: str = '', fit: Optional[int] = None, fmt: str = 'ansi') -> Iterator[str]:
+	"""A sample of each SGR effect in all 4-bit colors, as `display-colors effects`"""
+	check_str('pattern', pattern)
+	check_str('gutter', gutter)
+	check_options(fmt, fit)
+	rows = test_attributes(pattern, pattern, pattern, gutter) if fit is None else layout_rows(attribute_blocks(pattern, pattern, pattern, gutter), fit)
+	return format_rows(rows, fmt)
@@ -0,0 +1,134 @@
+import os
+import pty
+import re
+import select
+import threading
+from collections.abc import Callable, Iterable, Sequence
+from typing          import Optional
+
+from display_colors.tty import (
+	READ_SIZE,
+)
+
+## Control sequences a program may send: CSI, OSC (ended by BEL or ST) and DCS (ended by ST)
+QUERY_PATTERN = re.compile(rb'\033\[[0-?]*[ -/]*[@-~]|\033\][^\a\033]*(?:\a|\033\\)|\033P.*?\033\\', re.S)
+
+DA1_REPLY = b'\033[?62;22c'      ## VT220 with ANSI color
+
+Handler = tuple[re.Pattern, Callable[[re.Match], Optional[bytes]]]
+
+class Scripted_Responder:
+	"""Stand in for a terminal emulator on a pty, answering each query written to it from a script
+
+	The script is a list of (pattern, reply) handlers: the first pattern that fully matches a query
+	is passed to its reply function, whose result (if not None) is written back.  Queries that no
+	pattern matches go unanswered, like those a real terminal does not support.  Use as a context
+	manager; path is the name of the pty to open in place of /dev/tty.
+	"""
+	def __init__(self, handlers: Iterable[Handler]) -> None:
+		self.handlers = list(handlers)
+		self.queries: list[bytes] = []
+
+	def __enter__(self) -> 'Scripted_Responder':
+		(self.master, self.slave) = pty.openpty()
+		(self.stop_r, self.stop_w) = os.pipe()
+		self.path   = os.ttyname(self.slave)
+		self.thread = threading.Thread(target = self.serve, daemon = True)
+		self.thread.start()
+		return self
+
+	def __exit__(self, *exc_info) -> None:
+		os.write(self.stop_w, b'\0')
+		self.thread.join()
+		for fd in (self.slave, self.master, self.stop_r, self.stop_w):
+			os.close(fd)
+
+	def answer(self, query: bytes) -> Optional[bytes]:
+		self.queries.append(query)
+		for pattern, reply in self.handlers:
+			m = pattern.fullmatch(query)
+			if m:
+				return reply(m)
+		return None
+
+	def serve(self) -> None:
+		buf = b''
+		while True:
+			(ready, _, _) = select.select([self.master, self.stop_r], [], [])
+			if self.stop_r in ready:
+				return
+			try:
+				buf += os.read(self.master, READ_SIZE)
+			except OSError:
+				return
+			end = 0
+			for m in QUERY_PATTERN.finditer(buf):
+				reply = self.answer(m.group(0))
+				if reply:
+					os.write(self.master, reply)
+				end = m.end()
+			esc = buf.rfind(b'\033', end)                            ## Keep an incomplete sequence for the next read
+			buf = buf[esc:] if esc >= 0 else b''
+
+def xparse_color(color: str) -> str:
+	"""'#rrggbb' in the 16-bit-per-channel form terminals use in OSC replies"""
+	(r, g, b) = (color[1:3], color[3:5], color[5:7])
+	return f'rgb:{r}{r}/{g}{g}/{b}{b}'
+
+def palette_handlers(palette: Sequence[str], fg: str, bg: str) -> list[Handler]:
+	"""Handlers that answer OSC 4/10/11 color queries and DA1 like an xterm with this palette ('#rrggbb' colors)"""
+	def slot_reply(m: re.Match) -> Optional[bytes]:
+		slot = int(m.group(1))
+		return f'\033]4;{slot};{xparse_color(palette[slot])}\033\\'.encode() if slot < len(palette) else None
+
+	def default_reply(m: re.Match) -> bytes:
+		ps = m.group(1).decode()
+		return f'\033]{ps};{xparse_color(fg if ps == "10" else bg)}\033\\'.encode()
+
+	return [
+		(re.compile(rb'\033\]4;(\d+);\?(?:\a|\033\\)'),  slot_reply),
+		(re.compile(rb'\033\](1[01]);\?(?:\a|\033\\)'),  default_reply),
+		(re.compile(rb'\033\[0?c'),                    lambda m: DA1_REPLY),
+	]
+
+def capability_handlers(supported: Iterable[str], version: Optional[str] = None, terminfo: Optional[dict[str, str]] = None) -> list[Handler]:
+	"""Handlers that answer like a terminal supporting these SGR codes ('3', '91', '38;5', '38;2', ...)
+
+	SGR attributes set are remembered and reported to DECRQSS, less the unsupported ones.  version is the
+	XTVERSION reply and terminfo the capabilities XTGETTCAP reports; None means the query is ignored.
+	"""
+	supported = set(supported)
+	attrs: list[str] = []
+
+	def set_sgr(m: re.Match) -> None:
+		params = m.group(1).decode().split(';') if m.group(1) else ['0']
+		i = 0
+		while i < len(params):
+			n = {'5': 3, '2': 5}.get(params[i + 1], 1) if params[i] in ('38', '48') and i + 1 < len(params) else 1
+			(code, key) = (';'.join(params[i:i + n]), ';'.join(params[i:i + 2]) if n > 1 else params[i])
+			if code in ('', '0'):
+				attrs.clear()
+			elif key in supported:
+				attrs.append(code)
+			i += n
+		return None
+
+	def decrqss(m: re.Match) -> bytes:
+		return f'\033P1$r{";".join(["0", *attrs])}m\033\\'.encode()
+
+	def xtgettcap(m: re.Match) -> bytes:
+		name = bytes.fromhex(m.group(1).decode()).decode()
+		if terminfo is not None and name in terminfo:
+			return f'\033P1+r{m.group(1).decode()}={terminfo[name].encode().hex()}\033\\'.encode()
+		return f'\033P0+r{m.group(1).decode()}\033\\'.encode()
+
+	handlers = [
+		(re.compile(rb'\033\[([0-9;]*)m'),               set_sgr),
+		(re.compile(rb'\033P\$qm\033\\'),                decrqss),
+		(re.compile(rb'\033\[0?c'),                    lambda m: DA1_REPLY),
+	]
+	if version is not None:
+		handlers.append((re.compile(rb'\033\[>0?q'), lambda m: f'\033P>|{version}\033\\'.encode()))
+	if terminfo is not None:
+		handlers.append((re.compile(rb'\033P\+q([0-9a-fA-F]+)\033\\'), xtgettcap))
+	return handlers
@@ -0,0 +1,318 @@
+import asyncio
+import html
+import inspect
+from collections     import OrderedDict
+from collections.abc import Callable, Iterable, Iterator
+from http            import HTTPStatus
+from typing          import Any, NamedTuple, Optional
+from urllib.parse    import parse_qsl, urlsplit
+
+from display_colors        import (
+	__version__,
+	render,
+)
+from display_colors.cache  import (
+	cache_key,
+)
+from display_colors.colors import (
+	rgb_hex,
+)
+from display_colors.markup import (
+	ansi_html,
+)
+from display_colors.themes import (
+	Theme,
+)
+
+HOST = '127.0.0.1'                     ## Patterns are served to this machine only
+
+STREAM_CHUNK_SIZE = 2 ** 14            ## Rendered text is sent as it is generated, in chunks of about this size
+MAX_HEAD_SIZE     = 2 ** 14
+KEEPALIVE_SECONDS = 15
+
+## Bounds on query values, so a request cannot make a pattern of any size: the commands' defaults are far below them
+
+MAX_INT_VALUE   = 1024                 ## Column widths and --fit
+MAX_TEXT_LENGTH = 64                   ## Cell text, gutters and effect patterns
+
+PATTERNS: dict[str, Callable[..., Iterator[str]]] = {
+	'4-bit':   render.four_bit,
+	'8-bit':   render.eight_bit,
+	'effects': render.effects,
+}
+
+## The query parameters of each pattern, named as the command's options, and the render argument each sets
+
+PARAMETERS: dict[str, dict[str, tuple[str, type]]] = {
+	'4-bit': {
+		'col-width':     ('col_width',     int),
+		'fit':           ('fit',           int),
+		'gutter':        ('gutter',        str),
+		'minimal-sgr':   ('minimal_sgr',   bool),
+		'reverse-video': ('reverse_video', bool),
+		'stanzas':       ('stanzas',       bool),
+		'text':          ('text',          str),
+		'transpose':     ('transpose',     bool),
+		'weight':        ('weights',       list),
+	},
+	'8-bit': {
+		'compact':        ('compact',        bool),
+		'decimal':        ('decimal',        bool),
+		'face':           ('faces',          list),
+		'fit':            ('fit',            int),
+		'gray-col-width': ('gray_col_width', int),
+		'minimal-sgr':    ('minimal_sgr',    bool),
+		'rgb-col-width':  ('rgb_col_width',  int),
+		'std-col-width':  ('std_col_width',  int),
+	},
+	'effects': {
+		'fit':     ('fit',     int),
+		'gutter':  ('gutter',  str),
+		'pattern': ('pattern', str),
+	},
+}
+
+OUTPUTS = {
+	'html': 'text/html; charset=utf-8',
+	'ansi': 'text/plain; charset=utf-8',
+}
+
+TRUE_VALUES  = ('', '1', 'on', 'true', 'yes')
+FALSE_VALUES = ('0', 'off', 'false', 'no')
+
+class Request_Error(Exception):
+	"""An error response: its status and the message in its body"""
+	def __init__(self, status: HTTPStatus, message: str) -> None:
+		super().__init__(message)
+		self.status = status
+
+class Pattern_Request(NamedTuple):
+	"""Store what a request asks for; every render argument is included, defaults too, so equal requests are equal"""
+	pattern: str
+	output:  str
+	options: tuple[tuple[str, Any], ...]
+
+def query_value(name: str, kind: type, values: list[str]) -> Any:
+	if kind is list:
+		return tuple(value.lower() for value in values)
+	value = values[-1]
+	if kind is str and len(value) > MAX_TEXT_LENGTH:
+		raise Request_Error(HTTPStatus.BAD_REQUEST, f'Invalid value for {name}: longer than {MAX_TEXT_LENGTH} characters')
+	if kind is bool:
+		if value.lower() not in TRUE_VALUES + FALSE_VALUES:
+			raise Request_Error(HTTPStatus.BAD_REQUEST, f'Invalid value for {name}: {value!r} is not a boolean')
+		return value.lower() in TRUE_VALUES
+	if kind is int:
+		try:
+			number = int(value)
+		except ValueError:
+			raise Request_Error(HTTPStatus.BAD_REQUEST, f'Invalid value for {name}: {value!r} is not an integer')
+		if number > MAX_INT_VALUE:
+			raise Request_Error(HTTPStatus.BAD_REQUEST, f'Invalid value for {name}: {number} is above {MAX_INT_VALUE}')
+		return number
+	return value
+
+def render_defaults(fn: Callable[..., Iterator[str]]) -> dict[str, Any]:
+	return {name: tuple(p.default) if isinstance(p.default, list) else p.default for name, p in inspect.signature(fn).parameters.items() if name != 'fmt'}
+
+RENDER_DEFAULTS = {pattern: render_defaults(fn) for pattern, fn in PATTERNS.items()}
+
+def parse_target(target: str) -> Optional[Pattern_Request]:
+	"""The pattern a request target ('/8-bit?decimal&face=back') asks for, or None for the index"""
+	url     = urlsplit(target)
+	pattern = url.path.strip('/')
+	if not pattern:
+		return None
+	if pattern not in PATTERNS:
+		raise Request_Error(HTTPStatus.NOT_FOUND, f'No pattern {pattern!r}: expected one of {", ".join(PATTERNS)}')
+	(output, values) = ('html', dict())
+	for name, value in parse_qsl(url.query, keep_blank_values = True):
+		if name == 'output':
+			output = value.lower()
+		elif name in PARAMETERS[pattern]:
+			values.setdefault(name, []).append(value)
+		else:
+			raise Request_Error(HTTPStatus.BAD_REQUEST, f'No such option for {pattern}: {name!r}')
+	if output not in OUTPUTS:
+		raise Request_Error(HTTPStatus.BAD_REQUEST, f'Invalid output {output!r}: expected one of {", ".join(OUTPUTS)}')
+	options = dict(RENDER_DEFAULTS[pattern])
+	for name, vals in values.items():
+		(arg, kind) = PARAMETERS[pattern][name]
+		options[arg] = query_value(name, kind, vals)
+	return Pattern_Request(pattern, output, tuple(sorted(options.items())))
+
+class Response_Cache:
+	"""Keep the bodies of the most recently used responses, up to max_bytes of them in all"""
+	def __init__(self, max_bytes: int) -> None:
+		self.max_bytes = max_bytes
+		self.bodies: OrderedDict[Pattern_Request, bytes] = OrderedDict()
+		self.n_bytes   = 0
+		self.hits      = 0
+		self.misses    = 0
+
+	def get(self, request: Pattern_Request) -> Optional[bytes]:
+		body = self.bodies.get(request)
+		if body is None:
+			self.misses += 1
+			return None
+		self.hits += 1
+		self.bodies.move_to_end(request)
+		return body
+
+	def put(self, request: Pattern_Request, body: bytes) -> None:
+		if len(body) > self.max_bytes:
+			return
+		self.n_bytes += len(body) - len(self.bodies.get(request, b''))
+		self.bodies[request] = body
+		self.bodies.move_to_end(request)
+		while self.n_bytes > self.max_bytes:
+			self.n_bytes -= len(self.bodies.popitem(last = False)[1])
+
+def html_page(title: str, chunks: Iterable[str], theme: Theme) -> Iterator[str]:
+	title = html.escape(title)
+	yield f'<!DOCTYPE html>\n<html><head><meta charset="utf-8"><title>{title}</title></head>\n'
+	yield f'<body style="background:{rgb_hex(theme.background)};color:{rgb_hex(theme.foreground)};font-family:sans-serif">\n<h1>{title}</h1>\n'
+	yield f'<pre style="color:{rgb_hex(theme.foreground)};background:{rgb_hex(theme.background)};padding:1em">'
+	yield from ansi_html(chunks, theme)
+	yield '</pre>\n</body></html>\n'
+
+def index_page(theme: Theme) -> Iterator[str]:
+	yield f'<!DOCTYPE html>\n<html><head><meta charset="utf-8"><title>display-colors</title></head>\n<body style="font-family:sans-serif">\n<h1>display-colors ({html.escape(theme.name)})</h1>\n'
+	for pattern, parameters in PARAMETERS.items():
+		yield f'<p><a href="/{pattern}">{pattern}</a> (<a href="/{pattern}?output=ansi">ANSI</a>): {", ".join(parameters)}</p>\n'
+	yield '</body></html>\n'
+
+def response_head(status: HTTPStatus, headers: dict[str, str]) -> bytes:
+	lines = [f'HTTP/1.1 {status.value} {status.phrase}', *(f'{name}: {value}' for name, value in headers.items())]
+	return ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1')
+
+def batched(chunks: Iterable[str], size: int = STREAM_CHUNK_SIZE) -> Iterator[bytes]:
+	"""The text of chunks, encoded, in pieces of at least size bytes but the last"""
+	(batch, n) = ([], 0)
+	for chunk in chunks:
+		data = chunk.encode()
+		batch.append(data)
+		n += len(data)
+		if n >= size:
+			yield b''.join(batch)
+			(batch, n) = ([], 0)
+	if batch:
+		yield b''.join(batch)
+
+class Preview_Server:
+	"""Serve the test patterns over HTTP, as HTML or ANSI text, from a response cache
+
+	A response not in the cache is streamed as it is rendered and cached once complete.  Its ETag
+	is derived from the request and the version rendering it, so it can be checked without rendering.
+	Patterns are rendered in worker threads, so a large one does not hold up the other connections.
+	"""
+	def __init__(self, theme: Theme, cache_bytes: int) -> None:
+		self.theme = theme
+		self.cache = Response_Cache(cache_bytes)
+		self.salt  = f'{__version__}\0{theme!r}'
+
+	def etag(self, request: Pattern_Request) -> str:
+		return f'"{cache_key(self.salt, repr(request))}"'
+
+	def chunks(self, request: Pattern_Request) -> Iterator[str]:
+		chunks = PATTERNS[request.pattern](**dict(request.options), fmt = 'ansi')
+		if request.output == 'ansi':
+			return chunks
+		options = ' '.join(f'{name}={",".join(value) if isinstance(value, tuple) else value}'
+											 for name, value in request.options if value != RENDER_DEFAULTS[request.pattern][name])
+		return html_page(f'{request.pattern} {options}'.strip(), chunks, self.theme)
+
+	async def respond(self, writer: asyncio.StreamWriter, method: str, target: str, headers: dict[str, str], keep_alive: bool, chunked: bool) -> bool:
+		"""Write the response to a request; False if it was cut short, and the connection must be closed
+
+		Rendering starts before the head is written, so options the pattern rejects get a 400 response.
+		An error once the head is written can only be told to the client by ending the response early.
+		"""
+		common = {'Server': f'display-colors/{__version__}', 'Connection': 'keep-alive' if keep_alive else 'close'}
+		try:
+			if method not in ('GET', 'HEAD'):
+				raise Request_Error(HTTPStatus.METHOD_NOT_ALLOWED, f'Method {method} not allowed')
+			request = parse_target(target)
+			if request is None:
+				body = ''.join(index_page(self.theme)).encode()
+				writer.write(response_head(HTTPStatus.OK, {**common, 'Content-Type': OUTPUTS['html'], 'Content-Length': str(len(body))}))
+				writer.write(body if method == 'GET' else b'')
+				return True
+			etag = self.etag(request)
+			head = {**common, 'Content-Type': OUTPUTS[request.output], 'ETag': etag, 'Cache-Control': 'no-cache'}
+			if etag in (tag.strip() for tag in headers.get('if-none-match', '').split(',')):
+				writer.write(response_head(HTTPStatus.NOT_MODIFIED, {**head, 'X-Cache': 'hit'}))
+				return True
+			body   = self.cache.get(request)
+			cached = 'hit' if body is not None else 'miss'
+			if body is None:
+				loop = asyncio.get_running_loop()
+				try:
+					batches = batched(self.chunks(request))
+					if method == 'HEAD' or not chunked:                 ## HTTP/1.0 has no chunked encoding: send the length
+						body = await loop.run_in_executor(None, b''.join, batches)
+						self.cache.put(request, body)
+					else:
+						first = await loop.run_in_executor(None, next, batches, None)
+						body  = b'' if first is None else None
+				except ValueError as e:
+					raise Request_Error(HTTPStatus.BAD_REQUEST, str(e))
+			if body is not None:
+				writer.write(response_head(HTTPStatus.OK, {**head, 'Content-Length': str(len(body)), 'X-Cache': cached}))
+				writer.write(body if method == 'GET' else b'')
+				return True
+			writer.write(response_head(HTTPStatus.OK, {**head, 'Transfer-Encoding': 'chunked', 'X-Cache': 'miss'}))
+			(parts, n_bytes, data) = ([], 0, first)
+			try:
+				while data is not None:
+					n_bytes += len(data)
+					if n_bytes <= self.cache.max_bytes:
+						parts.append(data)
+					else:
+						parts.clear()                                    ## Too large to cache
+					writer.write(b'%x\r\n%s\r\n' % (len(data), data))
+					await writer.drain()
+					data = await loop.run_in_executor(None, next, batches, None)
+			except ValueError:                                     ## Without the last chunk, the client sees the response is incomplete
+				return False
+			writer.write(b'0\r\n\r\n')
+			if n_bytes <= self.cache.max_bytes:
+				self.cache.put(request, b''.join(parts))
+		except Request_Error as e:
+			body = f'{e}\n'.encode()
+			writer.write(response_head(e.status, {**common, 'Content-Type': OUTPUTS['ansi'], 'Content-Length': str(len(body))}))
+			writer.write(body if method != 'HEAD' else b'')
+		return True
+
+	async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+		"""Answer the requests on one connection, until the client or a request closes it"""
+		try:
+			while True:
+				try:
+					head = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), KEEPALIVE_SECONDS)
+				except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, asyncio.TimeoutError):
+					return
+				(request_line, *lines) = head.decode('latin-1').split('\r\n')
+				try:
+					(method, target, version) = request_line.split(' ')
+				except ValueError:
+					return
+				headers = {name.strip().lower(): value.strip() for name, _, value in (line.partition(':') for line in lines if line)}
+				connection = headers.get('connection', '').lower()
+				keep_alive = version == 'HTTP/1.1' and connection != 'close' or connection == 'keep-alive'
+				keep_alive = keep_alive and method in ('GET', 'HEAD')       ## A request body would be left unread
+				complete = await self.respond(writer, method, target, headers, keep_alive, chunked = version == 'HTTP/1.1')
+				await writer.drain()
+				if not (complete and keep_alive):
+					return
+		except ConnectionError:
+			pass
+		finally:
+			writer.close()
+
+async def serve(port: int, theme: Theme, cache_bytes: int, ready: Callable[[int], None]) -> None:
+	"""Serve the test patterns on localhost until cancelled; ready is called with the port once it is listening"""
+	server = await asyncio.start_server(Preview_Server(theme, cache_bytes).handle, HOST, port, limit = MAX_HEAD_SIZE)
+	async with server:
+		ready(server.sockets[0].getsockname()[1])
+		await server.serve_forever()
@@ -0,0 +1,155 @@
+import re
+from collections.abc import Iterable, Iterator
+from functools       import lru_cache
+from typing          import NamedTuple, Optional
+
+import click
+
+from display_colors.const import (
+	_4_BIT_DEFAULT_BG_COLOR_OFFSET,
+	_4_BIT_DEFAULT_FG_COLOR_OFFSET,
+	BOLD,
+	DIM,
+	MEDIUM,
+	RESET,
+	REV_VIDEO,
+	REV_VIDEO_OFF,
+	SGR_BEG,
+	SGR_END,
+)
+
+SGR_PATTERN = re.compile(re.escape(SGR_BEG) + '([0-9;]*)' + SGR_END)
+
+DEFAULT_FG = str(_4_BIT_DEFAULT_FG_COLOR_OFFSET)
+DEFAULT_BG = str(_4_BIT_DEFAULT_BG_COLOR_OFFSET)
+
+FG_CODES = frozenset(str(code) for code in (*range(30, 38), *range(90, 98)))
+BG_CODES = frozenset(str(code) for code in (*range(40, 48), *range(100, 108)))
+
+EXTENDED_COLOR_LEN = {
+	'5': 3,    ## 38;5;n
+	'2': 5,    ## 38;2;r;g;b
+}
+
+## Effects: SGR codes beyond weight, color and reverse video, and the codes that turn them off
+
+EFFECT_ON = {
+	'3':  'italic',
+	'4':  'underline',
+	'5':  'blink',
+	'6':  'blink',
+	'8':  'conceal',
+	'9':  'strikethru',
+	'20': 'fraktur',
+	'21': '2xunderline',
+	'51': 'framed',
+	'52': 'encircled',
+	'53': 'overlined',
+	'73': 'superscript',
+	'74': 'subscript',
+}
+
+EFFECT_OFF = {
+	'23': ('italic', 'fraktur'),
+	'24': ('underline', '2xunderline'),
+	'25': ('blink',),
+	'28': ('conceal',),
+	'29': ('strikethru',),
+	'54': ('framed', 'encircled'),
+	'55': ('overlined',),
+	'75': ('superscript', 'subscript'),
+}
+
+minimal_sgr_option = click.option('--minimal-sgr', '_minimal_sgr', is_flag = True, help = "Send only the SGR parameters that change between cells", default = False, show_default = True)
+
+class SGR_State(NamedTuple):
+	"""Store the graphic rendition the test patterns set; '' is the default"""
+	intensity: str  = ''
+	fg:        str  = ''
+	bg:        str  = ''
+	reverse:   bool = False
+
+DEFAULT_STATE = SGR_State()
+
+@lru_cache(maxsize = 4096)
+def apply_sgr(state: Optional[SGR_State], params: str) -> Optional[SGR_State]:
+	"""The state after the SGR sequence with these params, or None if it sets something outside SGR_State"""
+	codes = params.split(';')
+	if state is None and codes[0] not in ('', RESET):
+		return None
+	i = 0
+	while i < len(codes):
+		code = codes[i]
+		if code in ('', RESET):
+			state = DEFAULT_STATE
+		elif code in (BOLD, DIM):
+			if state.intensity not in ('', code):
+				return None                                      ## Some emulators show bold and dim at once
+			state = state._replace(intensity = code)
+		elif code == MEDIUM:
+			state = state._replace(intensity = '')
+		elif code == REV_VIDEO or code == REV_VIDEO_OFF:
+			state = state._replace(reverse = code == REV_VIDEO)
+		elif code in FG_CODES or code == DEFAULT_FG:
+			state = state._replace(fg = '' if code == DEFAULT_FG else code)
+		elif code in BG_CODES or code == DEFAULT_BG:
+			state = state._replace(bg = '' if code == DEFAULT_BG else code)
+		elif code in ('38', '48') and i + 1 < len(codes) and codes[i + 1] in EXTENDED_COLOR_LEN:
+			n     = EXTENDED_COLOR_LEN[codes[i + 1]]
+			color = ';'.join(codes[i:i + n])
+			state = state._replace(fg = color) if code == '38' else state._replace(bg = color)
+			i    += n - 1
+		else:
+			return None
+		i += 1
+	return state
+
+def state_params(state: SGR_State) -> list[str]:
+	return [p for p in (state.intensity, state.fg, state.bg, REV_VIDEO if state.reverse else '') if p]
+
+@lru_cache(maxsize = 4096)
+def sgr_transition(shown: SGR_State, wanted: SGR_State) -> str:
+	"""The shortest SGR sequence that takes the terminal from shown to wanted"""
+	if wanted == DEFAULT_STATE:
+		return f'{SGR_BEG}{RESET}{SGR_END}'
+	delta = []
+	if shown.intensity != wanted.intensity:
+		if shown.intensity and wanted.intensity:
+			delta.append(MEDIUM)
+		delta.append(wanted.intensity or MEDIUM)
+	if shown.fg != wanted.fg:
+		delta.append(wanted.fg or DEFAULT_FG)
+	if shown.bg != wanted.bg:
+		delta.append(wanted.bg or DEFAULT_BG)
+	if shown.reverse != wanted.reverse:
+		delta.append(REV_VIDEO if wanted.reverse else REV_VIDEO_OFF)
+	full   = [RESET] + state_params(wanted)
+	params = delta if len(';'.join(delta)) <= len(';'.join(full)) else full
+	return f'{SGR_BEG}{";".join(params)}{SGR_END}'
+
+def minimize_sgr(chunks: Iterable[str]) -> Iterator[str]:
+	"""Rewrite the SGR sequences in chunks so that only changed parameters are sent, just before the text they apply to
+
+	A sequence must not be split across chunks.  Sequences this does not model are passed through unchanged.
+	"""
+	shown  = DEFAULT_STATE       ## What the terminal has been sent
+	wanted = DEFAULT_STATE       ## What the chunks have asked for so far
+	for chunk in chunks:
+		out = []
+		for i, piece in enumerate(SGR_PATTERN.split(chunk)):
+			if i % 2:
+				state = apply_sgr(wanted, piece)
+				if state is None or wanted is None:
+					if shown != wanted:
+						out.append(sgr_transition(shown, wanted))
+					out.append(f'{SGR_BEG}{piece}{SGR_END}')
+					shown = state
+				wanted = state
+			elif piece:
+				if shown != wanted:
+					out.append(sgr_transition(shown, wanted))
+					shown = wanted
+				out.append(piece)
+		yield ''.join(out)
+	if shown != wanted:
+		yield sgr_transition(shown, wanted)
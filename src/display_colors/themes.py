@@ -0,0 +1,95 @@
+import json
+import plistlib
+from pathlib import Path
+from typing  import Any, NamedTuple
+
+from display_colors.colors import (
+	RGB,
+	XTERM_STANDARD,
+	hex_rgb,
+)
+from display_colors.const  import (
+	_24_BIT_CHANNEL_MAX,
+	_8_BIT_STANDARD_N,
+)
+
+THEME_SUFFIXES = ('.itermcolors', '.json', '.toml')
+
+class Theme(NamedTuple):
+	"""Store a terminal color scheme: the default colors and the 16 standard colors"""
+	name:       str
+	foreground: RGB
+	background: RGB
+	standard:   tuple[RGB, ...]
+
+XTERM_THEME = Theme('xterm', hex_rgb(XTERM_STANDARD[7]), hex_rgb(XTERM_STANDARD[0]), tuple(hex_rgb(c) for c in XTERM_STANDARD))
+
+class Theme_Error(ValueError):
+	"""A theme file is missing a color or is not in a supported format"""
+
+## The loaders index into what a file parsed to: a file of the right syntax but the wrong structure
+## (a list where a table should be, a number where a color should be) raises these
+
+STRUCTURE_ERRORS = (KeyError, IndexError, TypeError, AttributeError)
+
+def structure_error(path: Path, e: Exception) -> Theme_Error:
+	return Theme_Error(f'{path}: no {e.args[0]!r}' if isinstance(e, KeyError) else f'{path}: not a theme ({e})')
+
+def iterm_color(entry: dict[str, Any]) -> RGB:
+	return tuple(round(float(entry[f'{channel} Component']) * _24_BIT_CHANNEL_MAX) for channel in ('Red', 'Green', 'Blue'))
+
+def load_itermcolors(path: Path) -> Theme:
+	with open(path, 'rb') as f:
+		plist = plistlib.load(f)
+	if not isinstance(plist, dict):
+		raise Theme_Error(f'{path}: not a theme (the property list is not a dictionary)')
+	try:
+		return Theme(
+			name       = path.stem,
+			foreground = iterm_color(plist['Foreground Color']),
+			background = iterm_color(plist['Background Color']),
+			standard   = tuple(iterm_color(plist[f'Ansi {n} Color']) for n in range(_8_BIT_STANDARD_N)),
+		)
+	except STRUCTURE_ERRORS as e:
+		raise structure_error(path, e) from None
+
+def palette_theme(path: Path, data: Any) -> Theme:
+	"""A theme from the simple palette format: name (optional), foreground, background and palette, a list of 16 '#rrggbb' colors"""
+	if not isinstance(data, dict):
+		raise Theme_Error(f'{path}: not a theme (expected an object with foreground, background and palette)')
+	try:
+		palette = data['palette']
+		if not isinstance(palette, list) or len(palette) != _8_BIT_STANDARD_N:
+			raise Theme_Error(f'{path}: palette is not a list of {_8_BIT_STANDARD_N} colors')
+		return Theme(
+			name       = str(data.get('name', path.stem)),
+			foreground = hex_rgb(data['foreground']),
+			background = hex_rgb(data['background']),
+			standard   = tuple(hex_rgb(c) for c in palette),
+		)
+	except STRUCTURE_ERRORS as e:
+		raise structure_error(path, e) from None
+
+def load_theme(path: Path) -> Theme:
+	"""Read an iTerm2 .itermcolors file, or a palette in .json or .toml format"""
+	try:
+		if path.suffix == '.itermcolors':
+			return load_itermcolors(path)
+		if path.suffix == '.json':
+			with open(path, encoding = 'utf-8') as f:
+				return palette_theme(path, json.load(f))
+		if path.suffix == '.toml':
+			try:
+				import tomllib
+			except ImportError:                                      ## Before Python 3.11
+				try:
+					import tomli as tomllib
+				except ImportError:
+					raise Theme_Error(f'{path}: reading TOML themes needs Python 3.11 or the tomli package') from None
+			with open(path, 'rb') as f:
+				return palette_theme(path, tomllib.load(f))
+	except Theme_Error:
+		raise
+	except (OSError, ValueError) as e:
+		raise Theme_Error(f'{path}: {e}') from None
+	raise Theme_Error(f'{path}: not a {", ".join(THEME_SUFFIXES)} file')
@@ -0,0 +1,117 @@
+import os
+import pty
+import subprocess
+import sys
+import termios
+import time
+from collections.abc import Callable, Iterable, Iterator
+from typing          import NamedTuple, Optional
+
+from display_colors        import render
+from display_colors.output import (
+	write_fd,
+)
+from display_colors.tty    import (
+	TTY_PATH,
+)
+
+## The patterns pushed, each rendered once at a fixed size so that every target is sent the same bytes
+PATTERNS: dict[str, Callable[..., Iterator[str]]] = {
+	'4-bit':   lambda **kwargs: render.four_bit(weights = ['all'], reverse_video = True, **kwargs),
+	'8-bit':   lambda **kwargs: render.eight_bit(**kwargs),
+	'effects': lambda **kwargs: render.effects(**kwargs),
+	'24-bit':  lambda **kwargs: render.twenty_four_bit(width = 120, **kwargs),
+}
+
+MINIMAL_SGR_PATTERNS = ('4-bit', '8-bit', '24-bit')    ## Those --minimal-sgr shortens: the effects pattern has no such option
+
+DEFAULT_PATTERNS = ('4-bit', '8-bit', 'effects')
+TARGETS          = ('pty', 'tty')
+
+## Reads the other side of the pty and discards it, as a terminal emulator that drew nothing would; it
+## reports how many bytes arrived once the pty is closed (a read then fails with EIO)
+READER = '''
+import os
+n = 0
+while True:
+	try:
+		data = os.read(0, 1 << 16)
+	except OSError:
+		break
+	if not data:
+		break
+	n += len(data)
+print(n)
+'''
+
+class Payload(NamedTuple):
+	"""Store the text of the patterns, encoded, and how many cells it draws"""
+	data:  bytes
+	cells: int
+
+def pattern_payload(patterns: Iterable[str], minimal_sgr: bool = False) -> Payload:
+	patterns = list(patterns)
+	text  = ''.join(''.join(PATTERNS[name](minimal_sgr = minimal_sgr) if name in MINIMAL_SGR_PATTERNS else PATTERNS[name]()) for name in patterns)
+	cells = sum(''.join(PATTERNS[name](fmt = 'ndjson')).count('\n') for name in patterns)      ## One record per cell
+	return Payload(text.encode(), cells)
+
+class Pty_Target:
+	"""A pty whose other side is read by a separate process, so writing to it costs what writing to a fast terminal does"""
+	def __enter__(self) -> int:
+		(master, self.fd) = pty.openpty()
+		self.reader = subprocess.Popen([sys.executable, '-c', READER], stdin = master, stdout = subprocess.PIPE, text = True)
+		os.close(master)
+		self.received: Optional[int] = None
+		return self.fd
+
+	def __exit__(self, *exc_info) -> None:
+		os.close(self.fd)
+		(out, _) = self.reader.communicate()
+		self.received = int(out) if out.strip().isdigit() else None
+
+class Tty_Target:
+	"""The terminal this runs in: what is measured is how fast the emulator (and any multiplexer) takes the output"""
+	def __enter__(self) -> int:
+		self.fd = os.open(TTY_PATH, os.O_WRONLY | os.O_NOCTTY)    ## Its own open file, so O_NONBLOCK is not shared with stdout
+		self.received: Optional[int] = None
+		return self.fd
+
+	def __exit__(self, *exc_info) -> None:
+		os.close(self.fd)
+
+class Throughput(NamedTuple):
+	"""Store what a run pushed and how long it took: flush latencies are from the start of each flush until the last byte is written"""
+	bytes:          int
+	cells:          int
+	flushes:        int
+	seconds:        float
+	latencies:      list[float]
+	stalls:         int
+	partial_writes: int
+
+def push(fd: int, payload: Payload, volume: int, flush_size: int) -> Throughput:
+	"""Write the payload over and over to a tty, flush_size bytes at a time, and wait for it to drain
+
+	At least volume bytes are written, ending with a whole copy of the payload so that the terminal is
+	not left in the middle of an escape sequence.
+	"""
+	size  = len(payload.data)
+	total = -(-volume // size) * size
+	ring  = memoryview(payload.data * (flush_size // size + 2))         ## Any flush_size bytes from any offset in one slice
+	(latencies, stalls, partial) = ([], 0, 0)
+	os.set_blocking(fd, False)
+	try:
+		start = time.perf_counter()
+		for pos in range(0, total, flush_size):
+			t = time.perf_counter()
+			(s, p) = write_fd(fd, ring[pos % size:pos % size + min(flush_size, total - pos)])
+			latencies.append(time.perf_counter() - t)
+			(stalls, partial) = (stalls + s, partial + p)
+		termios.tcdrain(fd)                                      ## Until the reader has taken it all
+		seconds = time.perf_counter() - start
+	finally:
+		os.set_blocking(fd, True)
+	return Throughput(total, payload.cells * (total // size), len(latencies), seconds, latencies, stalls, partial)
+
+def percentile(values: list[float], p: float) -> float:
+	return sorted(values)[min(len(values) - 1, int(len(values) * p))]
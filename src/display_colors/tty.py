@@ -0,0 +1,49 @@
+import os
+import select
+import termios
+import time
+import tty
+from collections.abc import Callable, Iterator
+from contextlib      import contextmanager
+
+TTY_PATH  = '/dev/tty'
+READ_SIZE = 2 ** 12
+
+@contextmanager
+def raw_tty(path: str = TTY_PATH) -> Iterator[int]:
+	"""Open a terminal in raw mode, so replies to queries are neither echoed nor line-buffered, and restore it afterwards"""
+	fd = os.open(path, os.O_RDWR | os.O_NOCTTY)
+	try:
+		saved = termios.tcgetattr(fd)
+		tty.setraw(fd, termios.TCSANOW)
+		try:
+			yield fd
+		finally:
+			termios.tcsetattr(fd, termios.TCSADRAIN, saved)
+	finally:
+		os.close(fd)
+
+def write_all(fd: int, data: bytes) -> None:
+	view = memoryview(data)
+	while view:
+		view = view[os.write(fd, view):]
+
+def read_until(fd: int, done: Callable[[bytes], bool], timeout: float) -> bytes:
+	"""Read from fd until done(everything read so far) is true, the fd reaches EOF or timeout seconds have passed"""
+	deadline = time.monotonic() + timeout
+	buf      = bytearray()
+	while not done(bytes(buf)):
+		remaining = deadline - time.monotonic()
+		if remaining <= 0:
+			break
+		(ready, _, _) = select.select([fd], [], [], remaining)
+		if not ready:
+			break
+		try:
+			chunk = os.read(fd, READ_SIZE)
+		except OSError:                                          ## EIO once the other side of a pty is closed
+			break
+		if not chunk:
+			break
+		buf += chunk
+	return bytes(buf)
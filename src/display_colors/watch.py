@@ -0,0 +1,218 @@
+import os
+from collections.abc import Callable, Iterable, Mapping
+from pathlib         import Path
+from typing          import TYPE_CHECKING, NamedTuple, Optional, TextIO
+
+import click
+
+from display_colors.cell   import (
+	SGR_RESET,
+	Cell,
+	Row,
+)
+from display_colors.const  import (
+	OSC_BEG,
+	OSC_END,
+	SGR_BEG,
+	SGR_END,
+)
+from display_colors.sgr    import (
+	SGR_PATTERN,
+)
+
+if TYPE_CHECKING:
+	from display_colors.themes import Theme
+
+## The test pattern commands import this module for its options on every run: what only --watch needs
+## (the theme loaders with plistlib, termios, signal) is imported by watch()
+
+## Sequences for a full-screen display: the alternate screen, a hidden cursor and no line wrapping,
+## so that every cell stays where it is addressed
+
+SCREEN_ON  = '\033[?1049h\033[?25l\033[?7l\033[2J'
+SCREEN_OFF = '\033[?7h\033[?25h\033[?1049l'
+ERASE_EOL  = '\033[K'
+PALETTE_RESET = f'{OSC_BEG}104{OSC_END}{OSC_BEG}110{OSC_END}{OSC_BEG}111{OSC_END}'
+
+QUIT_KEYS    = ('q', '\x03')           ## Ctrl-C arrives as a key: the terminal is in raw mode
+REPAINT_KEYS = ('\x0c',)               ## Ctrl-L
+POLL_SECONDS = 0.25                    ## How often a theme file is checked for changes
+
+watch_option = click.option('--watch', '_watch', is_flag = True, help = "Keep the test pattern on screen, redrawing what changes on resize or a key press", default = False, show_default = True)
+theme_option = click.option('--theme', '_theme', type = click.Path(exists = True, dir_okay = False, path_type = Path), help = "With --watch, set the terminal's colors from a theme file, again whenever it changes")
+
+class Span(NamedTuple):
+	"""Store the text written after an escape sequence: the unit the screen is compared in"""
+	escape: str
+	text:   str
+
+Line = list[Span]
+
+def screen_lines(rows: Iterable[Row]) -> list[Line]:
+	"""The spans on each screen line: rows with a newline in a cell take more than one"""
+	lines: list[Line] = []
+	for row in rows:
+		line: Line = []
+		for item in row:
+			if isinstance(item, Cell):
+				spans = [Span(f'{SGR_BEG}{item.attrs}{SGR_END}', item.text)] + ([Span(SGR_RESET, '')] if item.reset else [])
+			else:
+				parts = SGR_PATTERN.split(item)                      ## text, params, text, params, ..., text
+				spans = [Span('', parts[0])] + [Span(f'{SGR_BEG}{params}{SGR_END}', text) for params, text in zip(parts[1::2], parts[2::2])]
+			for span in spans:
+				(first, *rest) = span.text.split('\n')
+				line.append(Span(span.escape, first))
+				for text in rest:
+					lines.append(line)
+					line = [Span(span.escape, text)]
+		lines.append(line)
+	return lines
+
+def clip(line: Line, width: int) -> Line:
+	clipped: Line = []
+	for span in line:
+		if len(span.text) >= width:
+			clipped.append(Span(span.escape, span.text[:width]))
+			break
+		clipped.append(span)
+		width -= len(span.text)
+	return clipped
+
+def resets(span: Span) -> bool:
+	"""Whether a span starts from the default rendition, so a line can be redrawn from it"""
+	return span.escape == SGR_RESET or span.escape.startswith(f'{SGR_BEG}0;')
+
+def line_width(line: Line) -> int:
+	return sum(len(span.text) for span in line)
+
+class Screen:
+	"""Model the lines on the screen, so a new frame is drawn by sending only the spans that changed
+
+	Each changed line is redrawn from the last span before the first change that resets the rendition,
+	through the last changed span; spans after that are left alone if they have not moved.  After a
+	resize the terminal may have moved or dropped what it showed, so everything is redrawn.
+	"""
+	def __init__(self) -> None:
+		self.lines: list[Line] = []
+		self.size:  Optional[tuple[int, int]] = None
+
+	def invalidate(self) -> str:
+		self.lines = []
+		return '\033[2J'
+
+	def line_update(self, y: int, old: Line, new: Line) -> str:
+		i = 0
+		while i < len(old) and i < len(new) and old[i] == new[i]:
+			i += 1
+		while 0 < i < len(new) and not resets(new[i]):
+			i -= 1
+		(old_end, new_end) = (len(old), len(new))
+		while old_end > i and new_end > i and old[old_end - 1] == new[new_end - 1]:
+			(old_end, new_end) = (old_end - 1, new_end - 1)
+		while new_end < len(new) and not (resets(new[new_end]) and line_width(old[:old_end]) == line_width(new[:new_end])):
+			(old_end, new_end) = (old_end + 1, new_end + 1)          ## Unchanged spans after the change have moved, or depend on it
+		col   = line_width(new[:i])
+		spans = ''.join(f'{span.escape}{span.text}' for span in new[i:new_end])
+		erase = ERASE_EOL if new_end == len(new) and line_width(new) < line_width(old) else ''
+		return f'\033[{y + 1};{col + 1}H{SGR_RESET}{spans}{SGR_RESET}{erase}'
+
+	def update(self, lines: list[Line], width: int, height: int) -> str:
+		"""The output that turns the screen as modelled into these lines, clipped to the screen"""
+		lines   = [clip(line, width) for line in lines[:height]]
+		updates = [self.invalidate()] if self.size not in (None, (width, height)) else []
+		self.size = (width, height)
+		for y in range(max(len(lines), len(self.lines))):
+			(old, new) = (self.lines[y] if y < len(self.lines) else [], lines[y] if y < len(lines) else [])
+			if old != new:
+				updates.append(self.line_update(y, old, new))
+		self.lines = lines
+		return ''.join(updates)
+
+def osc_color(rgb: tuple[int, int, int]) -> str:
+	(r, g, b) = rgb
+	return f'rgb:{r:02x}/{g:02x}/{b:02x}'
+
+def theme_palette(theme: 'Theme') -> str:
+	"""Set the terminal's 16 standard colors and default FG and BG to a theme's (OSC 4, 10, 11)"""
+	slots = ''.join(f'{OSC_BEG}4;{n};{osc_color(rgb)}{OSC_END}' for n, rgb in enumerate(theme.standard))
+	return f'{slots}{OSC_BEG}10;{osc_color(theme.foreground)}{OSC_END}{OSC_BEG}11;{osc_color(theme.background)}{OSC_END}'
+
+def toggle(options: dict[str, bool], name: str) -> Callable[[], None]:
+	def flip() -> None:
+		options[name] = not options[name]
+	return flip
+
+def cycle(options: dict[str, object], name: str, values: list[object]) -> Callable[[], None]:
+	def advance() -> None:
+		options[name] = values[(values.index(options[name]) + 1) % len(values)]
+	return advance
+
+def check_watch_options(watch: bool, theme: Optional[Path], fmt: str = 'ansi', minimal_sgr: bool = False) -> None:
+	if theme is not None and not watch:
+		raise click.UsageError('--theme needs --watch')
+	if watch and (fmt.lower() != 'ansi' or minimal_sgr):
+		raise click.UsageError('--watch draws the test pattern itself: it cannot be combined with --format or --minimal-sgr')
+
+def watch(render: Callable[[], Iterable[Row]], stream: TextIO, keys: Mapping[str, Callable[[], None]] = {}, theme: Optional[Path] = None, tty_path: Optional[str] = None) -> None:
+	"""Show render()'s rows in the alternate screen until q is pressed, redrawing what changes
+
+	A key in keys calls its function (usually to change an option) and the rows are rendered again.
+	So are they when the terminal is resized.  If theme is given, its colors are set in the terminal
+	and set again whenever the file changes.  The keys are read from tty_path, by default /dev/tty.
+	"""
+	import select
+	import signal
+
+	from display_colors.themes import (
+		Theme_Error,
+		load_theme,
+	)
+	from display_colors.tty    import (
+		TTY_PATH,
+		raw_tty,
+	)
+	if not stream.isatty():
+		raise click.UsageError('--watch needs a terminal to draw on')
+	(wake_r, wake_w) = os.pipe()
+	os.set_blocking(wake_w, False)
+	previous = signal.signal(signal.SIGWINCH, lambda signum, frame: os.write(wake_w, b'\0'))
+	(screen, theme_mtime, dirty) = (Screen(), None, True)
+	stream.write(SCREEN_ON)
+	try:
+		with raw_tty(tty_path or TTY_PATH) as tty_fd:
+			out = ''
+			while True:
+				if theme is not None:
+					try:
+						mtime = theme.stat().st_mtime_ns
+						if mtime != theme_mtime:
+							out += theme_palette(load_theme(theme))
+							theme_mtime = mtime
+					except (OSError, Theme_Error):                 ## Being rewritten, or not yet valid: try again at the next poll
+						pass
+				if dirty:
+					(width, height) = os.get_terminal_size(stream.fileno())
+					out += screen.update(screen_lines(render()), width, height)
+				if out:
+					stream.write(out)
+					stream.flush()
+				(out, dirty) = ('', False)
+				(ready, _, _) = select.select([tty_fd, wake_r], [], [], POLL_SECONDS if theme is not None else None)
+				if wake_r in ready:
+					os.read(wake_r, 64)
+					dirty = True
+				if tty_fd in ready:
+					for key in os.read(tty_fd, 64).decode(errors = 'ignore'):
+						if key in QUIT_KEYS:
+							return
+						if key in REPAINT_KEYS:
+							(out, dirty) = (out + screen.invalidate(), True)
+						elif key in keys:
+							keys[key]()
+							dirty = True
+	finally:
+		signal.signal(signal.SIGWINCH, previous)
+		stream.write(f'{SGR_RESET}{PALETTE_RESET if theme is not None else ""}{SCREEN_OFF}')
+		stream.flush()
+		for fd in (wake_r, wake_w):
+			os.close(fd)
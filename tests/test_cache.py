@@ -0,0 +1,102 @@
+import errno
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from display_colors          import (
+	__version__,
+)
+from display_colors.__main__ import (
+	cli,
+)
+from display_colors          import (
+	cache,
+)
+from display_colors.cache    import (
+	PATTERNS_DIR,
+	cache_dir,
+	count_pattern_use,
+	pattern_entries,
+	pattern_stats,
+)
+
+def test_version_is_the_packages() -> None:
+	tomllib = pytest.importorskip('tomllib')
+	with open(Path(__file__).parent.parent / 'pyproject.toml', 'rb') as f:
+		assert __version__ == tomllib.load(f)['tool']['poetry']['version']
+
+def test_hit_writes_what_was_rendered(tmp_path, monkeypatch: pytest.MonkeyPatch) -> None:
+	monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path))
+	outputs = [CliRunner().invoke(cli, ['8-bit', '--cache', '--decimal']) for _ in range(3)]
+	assert [result.exit_code for result in outputs] == [0, 0, 0]
+	assert outputs[0].output == outputs[1].output == outputs[2].output == CliRunner().invoke(cli, ['8-bit', '--decimal']).output
+	assert len(pattern_entries()) == 1
+	assert pattern_stats() == {'hits': 2, 'misses': 1}
+	assert 'hits       2 of 3' in CliRunner().invoke(cli, ['cache', 'stats']).output
+	CliRunner().invoke(cli, ['cache', 'clear'])
+	assert pattern_stats() == {'hits': 0, 'misses': 0}
+
+## Run in a fresh interpreter, since other tests import the modules
+HIT_IMPORTS = '''
+import sys
+from display_colors.__main__ import cli
+try:
+	cli(['4-bit', '--cache'])
+except SystemExit:
+	pass
+print(*sorted(sys.modules), file = sys.stderr)
+'''
+
+def test_hit_does_not_look_up_the_installed_version(tmp_path) -> None:
+	env = {**os.environ, 'XDG_CACHE_HOME': str(tmp_path)}
+	for _ in range(2):
+		result = subprocess.run([sys.executable, '-c', HIT_IMPORTS], capture_output = True, text = True, env = env, check = True)
+	assert 'importlib.metadata' not in result.stderr.split()
+	assert (tmp_path / 'display-colors' / 'patterns' / 'hits.count').stat().st_size == 1
+
+## A cache that cannot be written, even partway through, costs the output nothing
+
+class Full_Disk:
+	"""A file whose writes from the fail_at'th on, and optionally its close, fail as on a full disk"""
+	def __init__(self, f, fail_at: int, fail_close: bool) -> None:
+		(self.f, self.writes, self.fail_at, self.fail_close) = (f, 0, fail_at, fail_close)
+
+	def write(self, data: bytes) -> int:
+		self.writes += 1
+		if self.writes >= self.fail_at:
+			raise OSError(errno.ENOSPC, 'No space left on device')
+		return self.f.write(data)
+
+	def close(self) -> None:
+		self.f.close()
+		if self.fail_close:
+			raise OSError(errno.ENOSPC, 'No space left on device')
+
+@pytest.mark.parametrize(('fail_at', 'fail_close'), [(1, False), (2, False), (10 ** 6, True)])
+def test_failing_copy_still_writes_the_pattern(fail_at: int, fail_close: bool, tmp_path, monkeypatch: pytest.MonkeyPatch) -> None:
+	monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path))
+	init = cache.Stored_Pattern.__init__
+	def failing_init(self, path) -> None:
+		init(self, path)
+		self.file = Full_Disk(self.file, fail_at, fail_close)
+	monkeypatch.setattr(cache.Stored_Pattern, '__init__', failing_init)
+	args   = ['24-bit', '--width', '400']                         ## Written in more than one chunk
+	result = CliRunner().invoke(cli, [*args, '--cache'])
+	assert result.exit_code == 0, result.output
+	assert result.stdout_bytes == CliRunner().invoke(cli, args).stdout_bytes
+	assert pattern_entries() == []
+	assert [path.name for path in cache_dir(PATTERNS_DIR).iterdir()] == ['misses.count']    ## No unfinished entry left
+
+def test_counts_are_halved_past_their_bound(tmp_path, monkeypatch: pytest.MonkeyPatch) -> None:
+	monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path))
+	monkeypatch.setattr(cache, 'COUNT_MAX', 16)
+	cache_dir(PATTERNS_DIR).mkdir(parents = True)
+	for i in range(1000):
+		count_pattern_use('misses' if i % 4 == 0 else 'hits')
+		stats = pattern_stats()
+		assert max(stats.values()) < 16
+	assert stats['hits'] > 2 * stats['misses'] > 0                ## Three hits to a miss, give or take the rounding
@@ -0,0 +1,64 @@
+import json
+import plistlib
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from display_colors.__main__    import (
+	cli,
+)
+from display_colors.cmd.catalog import (
+	output_names,
+	theme_paths,
+)
+from display_colors.themes      import (
+	Theme_Error,
+	load_theme,
+)
+
+PALETTE = [f'#{i:02x}{i:02x}{i:02x}' for i in range(16)]
+
+@pytest.mark.parametrize('data', [
+	[1, 2, 3],
+	'#ffffff',
+	{'foreground': 5, 'background': '#000000', 'palette': PALETTE},
+	{'foreground': '#ffffff', 'background': '#000000', 'palette': '#ffffff'},
+	{'foreground': '#ffffff', 'background': '#000000', 'palette': PALETTE[:8]},
+	{'foreground': '#ffffff', 'palette': PALETTE},
+])
+def test_malformed_json_theme(tmp_path: Path, data) -> None:
+	path = tmp_path / 'theme.json'
+	path.write_text(json.dumps(data))
+	with pytest.raises(Theme_Error):
+		load_theme(path)
+
+@pytest.mark.parametrize('data', [[1], {'Foreground Color': 'white'}, {'Foreground Color': {'Red Component': 1}}])
+def test_malformed_itermcolors_theme(tmp_path: Path, data) -> None:
+	path = tmp_path / 'theme.itermcolors'
+	path.write_bytes(plistlib.dumps(data))
+	with pytest.raises(Theme_Error):
+		load_theme(path)
+
+def test_same_stem_gets_distinct_pages(tmp_path: Path) -> None:
+	for name in ('a/Solarized.json', 'a/Solarized.toml', 'b/Solarized.json'):
+		(tmp_path / name).parent.mkdir(exist_ok = True)
+		(tmp_path / name).write_text('')
+	paths = theme_paths([tmp_path / 'a', tmp_path / 'b'], tmp_path / 'out')
+	names = output_names(paths, 'html')
+	assert len(set(names)) == 3
+	assert names[:2] == ['Solarized.json.html', 'Solarized.toml.html']
+	assert output_names(theme_paths([tmp_path], tmp_path / 'out'), 'svg') == ['a/Solarized.json.svg', 'a/Solarized.toml.svg', 'b/Solarized.json.svg']
+
+def test_unwritable_page_is_reported_and_fails(tmp_path: Path) -> None:
+	theme = {'foreground': '#ffffff', 'background': '#000000', 'palette': PALETTE}
+	for name in ('Good.json', 'Bad.json'):
+		(tmp_path / 'themes' / name).parent.mkdir(exist_ok = True)
+		(tmp_path / 'themes' / name).write_text(json.dumps(theme))
+	(tmp_path / 'out' / 'Bad.json.html').mkdir(parents = True)          ## Where its page would be written
+	result = CliRunner().invoke(cli, ['catalog', '--out-dir', str(tmp_path / 'out'), '-j', '1', str(tmp_path / 'themes')])
+	assert result.exit_code == 1
+	assert result.exception is None or isinstance(result.exception, SystemExit)
+	assert f'Skipping {tmp_path / "themes" / "Bad.json"}: {tmp_path / "out" / "Bad.json.html"}: ' in result.stderr
+	assert '1 rendered, 0 unchanged, 1 failed' in result.stderr
+	assert (tmp_path / 'out' / 'Good.json.html').is_file()
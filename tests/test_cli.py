@@ -0,0 +1,123 @@
+import importlib.util
+import json
+import random
+import subprocess
+import sys
+from pathlib import Path
+
+import click
+import pytest
+from click.testing import CliRunner
+
+from display_colors.__main__ import (
+	LAZY_SUBCOMMANDS,
+	cli,
+)
+from display_colors.nearest  import (
+	_4_BIT_INDEX,
+	_8_BIT_INDEX,
+	nearest_codes,
+	rgb_lab,
+)
+
+@pytest.mark.parametrize('name', LAZY_SUBCOMMANDS)
+def test_lazy_help_is_the_commands_own(name: str) -> None:
+	cmd = cli.get_command(click.Context(cli), name)
+	assert cmd is not None
+	assert LAZY_SUBCOMMANDS[name][1] == cmd.help.split('\n\n')[0]
+
+## Run in a fresh interpreter, since other tests import the commands
+HELP_IMPORTS = '''
+import sys
+from display_colors.__main__ import cli
+try:
+	cli(['--help'])
+except SystemExit:
+	pass
+print(*sorted(name for name in sys.modules if name.startswith('display_colors.cmd')), file = sys.stderr)
+'''
+
+def test_group_help_imports_no_command() -> None:
+	result = subprocess.run([sys.executable, '-c', HELP_IMPORTS], capture_output = True, text = True, check = True)
+	assert all(name in result.stdout for name in LAZY_SUBCOMMANDS)
+	assert result.stderr.strip() == ''
+
+## What only --watch, --theme, --format, --cache or --fit use
+OPTIONAL_MODULES = ('display_colors.themes', 'display_colors.tty', 'plistlib', 'termios', 'json', 'csv', 'mmap', 'select', 'shutil')
+
+RUN_IMPORTS = '''
+import sys
+from display_colors.__main__ import cli
+try:
+	cli(sys.argv[1:])
+except SystemExit:
+	pass
+print(*sorted(sys.modules), file = sys.stderr)
+'''
+
+@pytest.mark.parametrize('name', ['4-bit', '8-bit', 'effects'])
+def test_pattern_imports_no_optional_module(name: str) -> None:
+	result = subprocess.run([sys.executable, '-c', RUN_IMPORTS, name], capture_output = True, text = True, check = True)
+	assert set(OPTIONAL_MODULES).isdisjoint(result.stderr.split())
+
+## benchmarks/bench_suite.py: every case of its option matrix is a valid command line, and --compare fails on a regression
+
+BENCH_SUITE = Path(__file__).parent.parent / 'benchmarks' / 'bench_suite.py'
+
+def load_bench_suite():
+	spec   = importlib.util.spec_from_file_location('bench_suite', BENCH_SUITE)
+	module = importlib.util.module_from_spec(spec)
+	spec.loader.exec_module(module)
+	return module
+
+def test_bench_suite_cases_all_run() -> None:
+	bench_suite = load_bench_suite()
+	runner      = CliRunner()
+	for case in bench_suite.cases():
+		assert bench_suite.invoke(runner, case)
+
+def test_bench_suite_compare_fails_on_more_bytes(tmp_path) -> None:
+	baseline = tmp_path / 'baseline.json'
+	run      = lambda *args: subprocess.run([sys.executable, str(BENCH_SUITE), '-n', '1', '-k', '8-bit --decimal --compact --fit 80', *args], capture_output = True, text = True)
+	assert run('--save', str(baseline)).returncode == 0
+	assert run('--compare', str(baseline), '--tolerance', '100').returncode == 0
+	results = json.loads(baseline.read_text())
+	baseline.write_text(json.dumps({name: {**result, 'bytes': result['bytes'] - 1} for name, result in results.items()}))
+	result = run('--compare', str(baseline), '--tolerance', '100')
+	assert result.returncode == 1
+	assert 'REGRESSION' in result.stderr and 'bytes' in result.stderr
+
+## nearest: the index finds what comparing every palette color does, from arguments or from a stream
+
+def linear_nearest_d2(colors: list, lab: tuple) -> float:
+	return min(sum((p - q) ** 2 for p, q in zip(lab, color_lab)) for _, color_lab in colors)
+
+def test_index_finds_the_nearest_color() -> None:
+	rng     = random.Random(256)
+	samples = [(0, 0, 0), (255, 255, 255), (255, 0, 0), (0, 255, 255), (128, 128, 128)] + [tuple(rng.randrange(256) for _ in range(3)) for _ in range(3000)]
+	for rgb in samples:
+		lab  = rgb_lab(rgb)
+		keys = nearest_codes(rgb)
+		for index, key in zip((_8_BIT_INDEX, _4_BIT_INDEX), keys):
+			found = dict(index.colors)[key]
+			assert sum((p - q) ** 2 for p, q in zip(lab, found)) == linear_nearest_d2(index.colors, lab)
+
+def test_nearest_colors_from_arguments_and_from_input() -> None:
+	runner    = CliRunner()
+	arguments = runner.invoke(cli, ['nearest', '#000000', 'FFFFFF', '#ff0000'])
+	assert arguments.exit_code == 0, arguments.output
+	assert arguments.output == '#000000\t16\tbk\n#ffffff\t231\tWH\n#ff0000\t196\tRE\n'
+	streamed = runner.invoke(cli, ['nearest'], input = '--black: #000000;\n--white: #FFFFFF; --red: #ff0000\nno colors #12345\n')
+	assert streamed.exit_code == 0, streamed.output
+	assert streamed.output == arguments.output
+
+def test_nearest_rejects_a_bad_color() -> None:
+	result = CliRunner().invoke(cli, ['nearest', '#12345g'])
+	assert result.exit_code == 2
+
+## bench: --minimal-sgr is reported for the patterns it shortens, not for effects
+
+def test_bench_labels_only_the_minimal_sgr_patterns() -> None:
+	result = CliRunner().invoke(cli, ['bench', '--megabytes', '0.1', '--minimal-sgr', '--pattern', '4-bit', '--pattern', 'effects', '--pattern', '8-bit'])
+	assert result.exit_code == 0, result.output
+	assert 'patterns       4-bit --minimal-sgr, effects, 8-bit --minimal-sgr\n' in result.output
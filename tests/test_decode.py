@@ -0,0 +1,65 @@
+import pytest
+from click.testing import CliRunner
+
+from display_colors.__main__ import (
+	cli,
+)
+from display_colors.decode   import (
+	DEFAULT_RENDITION,
+	Difference,
+	Rendition,
+	compare,
+	decode,
+)
+
+def text(grid) -> list[str]:
+	return [''.join(chars) for chars in grid.chars]
+
+def test_cursor_moves_and_erasing() -> None:
+	grid = decode(['abcdef\n', 'ghijkl\r\n', 'mnop', '\033[1;3HX', '\033[2BY', '\033[2DZ', '\033[1;5H\033[K', '\033[2;2H\033[1K', '\033[3;3H\033[0J'])
+	assert text(grid) == ['abXd', '  ijkl', 'mn']
+	grid = decode(['abc\ndef', '\033[2J', '\033[2;2Hx'])
+	assert text(grid) == ['', ' x']
+	assert text(decode(['x\n', 'a\tb', '\033[10Gc\033[A\033[3Cd'])) == ['x            d', 'a       bc']
+
+def test_sgr_split_across_chunks() -> None:
+	stream = '\033[1;38;5;196;48;2;1;2;3mx\033[0m y'
+	whole  = decode([stream])
+	for i in range(1, len(stream)):
+		split = decode([stream[:i], stream[i:]])
+		assert split.chars == whole.chars and split.renditions == whole.renditions, i
+	assert whole.renditions[0][0] == Rendition('Bold', '38;5;196', '48;2;1;2;3')
+	assert whole.renditions[0][1:] == [DEFAULT_RENDITION] * 2
+
+@pytest.mark.parametrize('params', ['38:2::10:20:30;48:5:17', '38:2:10:20:30;48;5;17', '38;2;10;20;30;48:5:17'])
+def test_colon_sub_parameters(params: str) -> None:
+	assert decode([f'\033[{params}mx']).renditions[0][0] == Rendition(fg = '38;2;10;20;30', bg = '48;5;17')
+
+def test_curly_underline_and_its_end() -> None:
+	grid = decode(['\033[4:3ma\033[4:0mb\033[4:2mc'])
+	assert [rendition.effects for rendition in grid.renditions[0]] == [{'underline'}, set(), {'2xunderline'}]
+
+def test_wide_and_combining_text() -> None:
+	grid = decode(['\033[41m', '世界', '\033[0m', 'é', '̈!'])        ## A mark may arrive in the next chunk
+	assert grid.chars[0] == ['世', '', '界', '', 'é̈', '!']
+	assert grid.renditions[0][:4] == [Rendition(bg = '41')] * 4
+	assert decode(['世界\033[1;3Hx']).chars[0] == ['世', '', 'x', ' ']        ## Columns, not characters, are addressed
+	assert decode(['世界\033[1;2Hx']).chars[0] == [' ', 'x', '界', '']
+
+def test_compare_finds_the_changed_cells() -> None:
+	expected = decode(['ab\033[31mcd\033[0m\n', 'same\n'])
+	actual   = decode(['ab\033[32mcd\033[0m\n', 'same\033[44m \033[0m\n'])
+	assert list(compare(expected, actual)) == [Difference(0, 2, 4), Difference(1, 4, 5)]
+	assert list(compare(expected, decode(['ab\033[31mcd\033[0m   \n', 'same\n']))) == []    ## Trailing blanks show nothing
+
+## What a command writes draws the same as what it writes with --minimal-sgr
+
+@pytest.mark.parametrize('args', [['4-bit', '-w', 'all'], ['8-bit'], ['8-bit', '--compact'], ['24-bit', '--width', '100']])
+def test_render_decodes_as_its_minimal_sgr(args: list[str]) -> None:
+	runner = CliRunner()
+	(full, minimal) = (runner.invoke(cli, args), runner.invoke(cli, [*args, '--minimal-sgr']))
+	assert full.exit_code == minimal.exit_code == 0
+	assert len(minimal.stdout_bytes) < len(full.stdout_bytes)
+	(expected, actual) = (decode([full.output]), decode([minimal.output]))
+	assert expected.chars == actual.chars
+	assert list(compare(expected, actual, strict = True)) == []
@@ -0,0 +1,22 @@
+import csv
+import io
+import json
+
+import pytest
+
+from display_colors import render
+
+def test_ndjson_numbers_only_rows_with_cells() -> None:
+	records = [json.loads(line) for line in ''.join(render.eight_bit(fmt = 'ndjson')).splitlines()]
+	rows    = sorted({record['row'] for record in records})
+	assert rows == list(range(len(rows)))
+
+def test_csv_continues_segmented_lines() -> None:
+	records = list(csv.DictReader(io.StringIO(''.join(render.twenty_four_bit(views = ['ramps'], width = 3000, fmt = 'csv')))))
+	assert sorted({int(record['row']) for record in records}) == [0, 1, 2, 3]
+	assert [int(record['column']) for record in records if record['row'] == '0'] == list(range(2999))
+
+@pytest.mark.parametrize('fmt', ['ndjson', 'csv'])
+def test_minimal_sgr_is_ansi_only(fmt: str) -> None:
+	with pytest.raises(ValueError):
+		render.four_bit(fmt = fmt, minimal_sgr = True)
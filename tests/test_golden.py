@@ -0,0 +1,27 @@
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from display_colors.__main__ import (
+	cli,
+)
+
+## Each command's output, byte for byte, as the original print()-per-cell implementation wrote it
+
+GOLDEN_DIR = Path(__file__).parent / 'golden'
+
+GOLDENS = {
+	'4-bit.ansi':                   ['4-bit'],
+	'4-bit-all-reverse-video.ansi': ['4-bit', '-w', 'all', '--reverse-video'],
+	'4-bit-transpose.ansi':         ['4-bit', '--transpose'],
+	'4-bit-stanzas.ansi':           ['4-bit', '--stanzas'],
+	'8-bit.ansi':                   ['8-bit'],
+	'effects.ansi':                 ['effects'],
+}
+
+@pytest.mark.parametrize('name', GOLDENS)
+def test_output_is_the_golden(name: str) -> None:
+	result = CliRunner().invoke(cli, GOLDENS[name])
+	assert result.exit_code == 0, result.output
+	assert result.stdout_bytes == (GOLDEN_DIR / name).read_bytes()
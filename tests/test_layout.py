@@ -0,0 +1,46 @@
+import re
+
+import pytest
+from click.testing import CliRunner
+
+from display_colors.__main__ import (
+	cli,
+)
+from display_colors.cell     import (
+	Cell,
+)
+from display_colors.layout   import (
+	Block,
+	fit_blocks,
+	row_width,
+	wrap_block,
+)
+
+SGR = re.compile(r'\033\[[0-9;:]*m')
+
+## Down to the widest label and unit, which are never split
+
+@pytest.mark.parametrize('args', [['4-bit'], ['4-bit', '-w', 'all', '--stanzas'], ['4-bit', '--transpose'], ['8-bit'], ['8-bit', '--decimal', '--face', 'back'], ['8-bit', '--compact']])
+def test_fit_bounds_every_line(args: list[str]) -> None:
+	for width in range(24, 160, 9):
+		result = CliRunner().invoke(cli, [*args, '--fit', str(width)])
+		assert result.exit_code == 0, result.output
+		assert max(len(SGR.sub('', line)) for line in result.output.split('\n')) <= width, width
+
+def cells(n: int, text: str = 'ab') -> list:
+	return [Cell(f'0;4{i % 8}', text) for i in range(n)]
+
+def test_wide_block_wraps_in_whole_units() -> None:
+	block = Block([['x: ', *cells(12)], ['yy: ', *cells(12)]], key = 1, unit = 3, title = 'A title wider than the width')
+	rows  = list(wrap_block(block, 20))
+	assert [row_width(row) for row in rows if len(row) == 1] == [18, 9, 0]          ## The title in two lines, then the line between bands
+	bands = [row for row in rows if len(row) > 1]
+	assert all((len(row) - 1) % 3 == 0 and row_width(row) <= 20 for row in bands)
+	assert [item for row in bands[0::2] for item in row[1:]] == block.rows[0][1:]
+	assert all(row[0] == 'yy: ' for row in bands[1::2])
+
+def test_narrow_blocks_tile_side_by_side() -> None:
+	blocks = [Block([cells(2), cells(2)], title = f'T{i}', tile = True) for i in range(3)]
+	assert [row_width(row) for row in fit_blocks(blocks, 14)] == [12, 14, 14]
+	assert [row_width(row) for row in fit_blocks(blocks, 13)] == [7, 9, 9, 2, 4, 4]
+	assert [row_width(row) for row in fit_blocks([*blocks[:2], Block([cells(3)], tile = True)], 80)] == [7, 9, 9, 6]    ## Tiles only with as many rows
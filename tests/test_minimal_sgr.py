@@ -0,0 +1,32 @@
+import pytest
+
+from display_colors        import render
+from display_colors.decode import (
+	compare,
+	decode,
+)
+
+## Each command's pattern with --minimal-sgr must draw exactly what it draws with full SGR, in fewer bytes
+
+PATTERNS = {
+	'4-bit':                          lambda **kwargs: render.four_bit(**kwargs),
+	'4-bit -w all --reverse-video':   lambda **kwargs: render.four_bit(weights = ['all'], reverse_video = True, **kwargs),
+	'4-bit --transpose --stanzas':    lambda **kwargs: render.four_bit(weights = ['dim', 'medium'], transpose = True, stanzas = True, **kwargs),
+	'4-bit --fit 60':                 lambda **kwargs: render.four_bit(fit = 60, **kwargs),
+	'8-bit':                          lambda **kwargs: render.eight_bit(**kwargs),
+	'8-bit --decimal --face back':    lambda **kwargs: render.eight_bit(decimal = True, faces = ['back', 'bottom', 'right'], **kwargs),
+	'8-bit --compact':                lambda **kwargs: render.eight_bit(compact = True, **kwargs),
+	'24-bit --width 120':             lambda **kwargs: render.twenty_four_bit(width = 120, **kwargs),
+	'24-bit --width 3000 --height 2': lambda **kwargs: render.twenty_four_bit(width = 3000, height = 2, **kwargs),
+}
+
+@pytest.mark.parametrize('name', PATTERNS)
+def test_minimal_sgr_draws_the_same(name: str) -> None:
+	(full, minimal) = (decode(PATTERNS[name]()), decode(PATTERNS[name](minimal_sgr = True)))
+	assert full.chars == minimal.chars
+	assert list(compare(full, minimal, strict = True)) == []
+
+@pytest.mark.parametrize('name', PATTERNS)
+def test_minimal_sgr_is_smaller(name: str) -> None:
+	(full, minimal) = (''.join(PATTERNS[name]()).encode(), ''.join(PATTERNS[name](minimal_sgr = True)).encode())
+	assert len(minimal) < len(full)
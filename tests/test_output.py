@@ -0,0 +1,78 @@
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+from click.testing import CliRunner
+
+from display_colors.__main__ import (
+	cli,
+)
+from display_colors.output   import (
+	stream_writer,
+	write_fd,
+)
+
+HIGH_FD = 1500                         ## Beyond what select() can wait for
+
+def drain(fd: int, received: bytearray) -> None:
+	while data := os.read(fd, 2 ** 12):
+		received.extend(data)
+
+def test_full_pipe_beyond_select_is_waited_for() -> None:
+	(r, w) = os.pipe()
+	os.dup2(w, HIGH_FD)
+	os.close(w)
+	os.set_blocking(HIGH_FD, False)
+	data     = bytes(range(256)) * 2 ** 12                     ## More than a pipe holds
+	received = bytearray()
+	reader   = threading.Thread(target = drain, args = (r, received))
+	try:
+		reader.start()
+		(stalls, _) = write_fd(HIGH_FD, data)
+	finally:
+		os.close(HIGH_FD)
+		reader.join()
+		os.close(r)
+	assert received == data
+	assert stalls > 0
+
+def test_stream_is_written_when_not_posix(monkeypatch: pytest.MonkeyPatch, tmp_path) -> None:
+	with open(tmp_path / 'out.txt', 'w') as stream:
+		monkeypatch.setattr(os, 'name', 'nt')
+		write = stream_writer(stream)
+		monkeypatch.undo()
+		assert write == stream.write
+
+def test_closed_pipe_ends_the_command_quietly() -> None:
+	(r, w) = os.pipe()
+	os.close(r)                                                ## The reader has gone before the first write
+	try:
+		start  = time.monotonic()
+		result = subprocess.run([sys.executable, '-m', 'display_colors', '24-bit', '--width', '100000', '--height', '10000'],
+														stdout = w, stderr = subprocess.PIPE, text = True, timeout = 60)
+	finally:
+		os.close(w)
+	assert result.returncode == 1
+	assert 'Traceback' not in result.stderr
+	assert time.monotonic() - start < 30                      ## Rendering all of it would take far longer
+
+def test_non_blocking_stdout_gets_everything() -> None:
+	args   = ['24-bit', '--width', '600']
+	(r, w) = os.pipe()
+	os.set_blocking(w, False)                                  ## As a parent process might leave it
+	try:
+		writer = subprocess.Popen([sys.executable, '-m', 'display_colors', *args], stdout = w, stderr = subprocess.PIPE)
+	finally:
+		os.close(w)
+	time.sleep(0.5)                                            ## So the pipe fills before it is read
+	received = bytearray()
+	drain(r, received)
+	os.close(r)
+	assert writer.wait(timeout = 60) == 0, writer.stderr.read()
+	writer.stderr.close()
+	expected = CliRunner().invoke(cli, args).stdout_bytes
+	assert len(expected) > 2 ** 16                              ## More than a pipe holds
+	assert received == expected
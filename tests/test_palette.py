@@ -0,0 +1,35 @@
+import pytest
+
+from display_colors.const   import (
+	_8_BIT_PALETTE_CUBE_SIDE,
+	_8_BIT_PALETTE_OFFSET,
+)
+from display_colors.palette import (
+	CUBE_VIEWS,
+	Cube_View,
+	view_codes,
+)
+
+CUBE_CODES = list(range(_8_BIT_PALETTE_OFFSET, _8_BIT_PALETTE_OFFSET + _8_BIT_PALETTE_CUBE_SIDE ** 3))
+
+@pytest.mark.parametrize('face', CUBE_VIEWS)
+def test_each_face_lists_every_cube_code_once(face: str) -> None:
+	assert sorted(view_codes(CUBE_VIEWS[face])) == CUBE_CODES
+
+@pytest.mark.parametrize('face', CUBE_VIEWS)
+def test_slices_are_planes_of_the_face(face: str) -> None:
+	codes  = view_codes(CUBE_VIEWS[face])
+	planes = [view_codes(CUBE_VIEWS[face], (z,)) for z in range(_8_BIT_PALETTE_CUBE_SIDE)]
+	side   = _8_BIT_PALETTE_CUBE_SIDE
+	assert all(len(plane) == side ** 2 for plane in planes)
+	assert [codes[y * side ** 2 + z * side:][:side] for y in range(side) for z in range(side)] == [planes[z][y * side:][:side] for y in range(side) for z in range(side)]
+
+@pytest.mark.parametrize('slices', [(_8_BIT_PALETTE_CUBE_SIDE,), (-1,), (0, 9), ('0',)])
+def test_bad_slices_raise(slices) -> None:
+	with pytest.raises(ValueError):
+		view_codes(CUBE_VIEWS['front'], slices)
+
+@pytest.mark.parametrize('view', [Cube_View('r', 'r', 'b'), Cube_View('r', 'g', 'x')])
+def test_bad_view_raises(view: Cube_View) -> None:
+	with pytest.raises(ValueError):
+		view_codes(view)
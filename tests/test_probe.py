@@ -0,0 +1,112 @@
+import json
+import re
+import time
+
+import pytest
+from click.testing import CliRunner
+
+from display_colors.__main__  import (
+	cli,
+)
+from display_colors.cache     import (
+	read_json,
+	terminal_cache_path,
+)
+from display_colors.init      import (
+	EFFECT_SWITCH,
+)
+from display_colors.probe     import (
+	probe_terminal,
+)
+from display_colors.responder import (
+	Scripted_Responder,
+	capability_handlers,
+)
+from display_colors.tty       import (
+	raw_tty,
+)
+
+EFFECT_CODES = {sw.on for sw in EFFECT_SWITCH.values()}
+DEPTH_CODES  = {'91', '38;5', '38;2'}
+VERSION      = 'xterm(390)'
+TERMINFO     = {'TN': 'xterm-256color', 'colors': '256', 'RGB': '8'}
+
+def probe(handlers: list, timeout: float = 2.0) -> tuple[dict, float]:
+	with Scripted_Responder(handlers) as responder:
+		with raw_tty(responder.path) as fd:
+			start = time.monotonic()
+			capabilities = probe_terminal(fd, timeout)
+			return (capabilities, time.monotonic() - start)
+
+def test_every_capability() -> None:
+	(capabilities, seconds) = probe(capability_handlers(EFFECT_CODES | DEPTH_CODES, VERSION, TERMINFO), timeout = 5.0)
+	assert seconds < 2.0                                       ## Ended by the DA1 reply
+	assert capabilities['version'] == VERSION
+	assert capabilities['terminfo'] == TERMINFO
+	assert capabilities['color_depths'] == {'4-bit': True, '8-bit': True, '24-bit': True}
+	assert capabilities['effects'] == {name: None if sw.on == sw.off else True for name, sw in EFFECT_SWITCH.items()}
+
+def test_unsupported_codes_are_not_reported() -> None:
+	(capabilities, _) = probe(capability_handlers({'3', '4', '91', '38;5'}))
+	assert capabilities['effects']['Italic'] is True
+	assert capabilities['effects']['Underline'] is True
+	assert capabilities['effects']['Strikethru'] is False
+	assert capabilities['color_depths'] == {'4-bit': True, '8-bit': True, '24-bit': False}
+	assert capabilities['version'] is None
+	assert capabilities['terminfo'] == {}
+
+def test_partial_decrqss_replies_are_not_trusted() -> None:
+	handlers = capability_handlers(EFFECT_CODES | DEPTH_CODES)
+	replies  = iter(range(5))
+
+	def some_replies(m: re.Match):
+		return b'\033P1$r0;3m\033\\' if next(replies, None) is not None else None
+	handlers = [(pattern, some_replies if pattern.pattern == rb'\033P\$qm\033\\' else reply) for pattern, reply in handlers]
+	(capabilities, _) = probe(handlers)
+	assert set(capabilities['effects'].values()) == {None}
+	assert capabilities['da1']
+
+def test_no_da1_reply_waits_for_the_timeout() -> None:
+	handlers = capability_handlers(EFFECT_CODES | DEPTH_CODES)
+	(capabilities, seconds) = probe([h for h in handlers if h[0].pattern != rb'\033\[0?c'], timeout = 0.3)
+	assert seconds >= 0.3
+	assert capabilities['da1'] == []
+	assert capabilities['effects']['Italic'] is True
+
+def test_silent_terminal() -> None:
+	(capabilities, seconds) = probe([], timeout = 0.2)
+	assert seconds >= 0.2
+	assert capabilities['version'] is None and capabilities['da1'] == []
+	assert set(capabilities['effects'].values()) == {None}
+	assert set(capabilities['color_depths'].values()) == {None}
+
+def test_other_tty_is_not_cached(tmp_path) -> None:
+	with Scripted_Responder(capability_handlers(EFFECT_CODES, VERSION)) as responder:
+		result = CliRunner().invoke(cli, ['probe', '--tty', responder.path, '--format', 'json'], env = {'XDG_CACHE_HOME': str(tmp_path)})
+	assert result.exit_code == 0, result.output
+	assert json.loads(result.output)['version'] == VERSION
+	assert not (tmp_path / 'display-colors').exists()
+
+def test_refresh_keeps_the_complete_capabilities(tmp_path, monkeypatch: pytest.MonkeyPatch) -> None:
+	monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path))
+	for (supported, version, terminfo) in ((EFFECT_CODES | DEPTH_CODES, VERSION, TERMINFO), ({'1'}, None, None)):
+		with Scripted_Responder(capability_handlers(supported, version, terminfo)) as responder:
+			monkeypatch.setattr('display_colors.cmd.probe.TTY_PATH', responder.path)     ## As if it were this process's terminal
+			result = CliRunner().invoke(cli, ['probe', '--tty', responder.path, '--refresh', '--format', 'json'])
+		assert result.exit_code == 0, result.output
+		assert json.loads(result.output)['version'] == version
+	assert read_json(terminal_cache_path('capabilities'))['version'] == VERSION
+
+@pytest.mark.parametrize('cached', [[], {'version': VERSION}, {'version': 3, 'da1': [], 'effects': {}, 'color_depths': {}, 'terminfo': {}},
+																		{'version': None, 'da1': ['1'], 'effects': ['Bold'], 'color_depths': {}, 'terminfo': {}}])
+def test_cached_capabilities_of_another_shape_are_probed_again(cached, tmp_path, monkeypatch: pytest.MonkeyPatch) -> None:
+	monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path))
+	path = terminal_cache_path('capabilities')
+	path.parent.mkdir(parents = True)
+	path.write_text(json.dumps(cached))
+	with Scripted_Responder(capability_handlers(EFFECT_CODES | DEPTH_CODES, VERSION, TERMINFO)) as responder:
+		monkeypatch.setattr('display_colors.cmd.probe.TTY_PATH', responder.path)
+		result = CliRunner().invoke(cli, ['probe', '--tty', responder.path])
+	assert result.exit_code == 0, result.output
+	assert VERSION in result.output
+	assert read_json(path)['version'] == VERSION
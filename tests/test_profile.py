@@ -0,0 +1,33 @@
+import json
+import threading
+
+import click
+from click.testing import CliRunner
+
+from display_colors.__main__ import (
+	cli,
+)
+from display_colors.profile  import (
+	current_profile,
+	start_profile,
+)
+
+def test_profile_is_reported_and_cleared(tmp_path) -> None:
+	path   = tmp_path / 'profile.ndjson'
+	result = CliRunner().invoke(cli, ['--profile-json', str(path), '4-bit'])
+	assert result.exit_code == 0, result.output
+	summary = json.loads(path.read_text())
+	assert summary['command'] == '4-bit'
+	assert summary['counts']['cells'] > 0
+	assert current_profile() is None
+
+def test_other_threads_have_no_profile() -> None:
+	seen = []
+	with click.Context(cli) as ctx:
+		profile = start_profile(ctx)
+		assert current_profile() is profile
+		thread = threading.Thread(target = lambda: seen.append(current_profile()))
+		thread.start()
+		thread.join()
+	assert seen == [None]
+	assert current_profile() is None
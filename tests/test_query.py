@@ -0,0 +1,95 @@
+import json
+import time
+
+import pytest
+from click.testing import CliRunner
+
+from display_colors.__main__  import (
+	cli,
+)
+from display_colors.cache     import (
+	read_json,
+	replace_json,
+	terminal_cache_path,
+)
+from display_colors.cmd.query import (
+	known_colors,
+	query_palette,
+)
+from display_colors.responder import (
+	Scripted_Responder,
+	palette_handlers,
+)
+from display_colors.tty       import (
+	raw_tty,
+)
+
+PALETTE = [f'#{i:02x}{i * 7 % 256:02x}{255 - i:02x}' for i in range(256)]
+(FG, BG) = ('#d0d0d0', '#101010')
+
+def palette_colors(palette: list[str]) -> dict[str, str]:
+	return {'foreground': FG, 'background': BG, **{str(slot): color for slot, color in enumerate(palette)}}
+
+def query(handlers: list, batch: int = 64, timeout: float = 2.0) -> tuple[dict[str, str], float, list[bytes]]:
+	with Scripted_Responder(handlers) as responder:
+		with raw_tty(responder.path) as fd:
+			start  = time.monotonic()
+			colors = query_palette(fd, batch, timeout)
+			return (colors, time.monotonic() - start, responder.queries)
+
+def test_every_color_in_a_round_trip_per_batch() -> None:
+	(colors, _, queries) = query(palette_handlers(PALETTE, FG, BG))
+	assert colors == palette_colors(PALETTE)
+	assert queries.count(b'\033[c') == 256 // 64
+
+def test_unanswered_slots_cost_no_timeout() -> None:
+	(colors, seconds, _) = query(palette_handlers(PALETTE[:16], FG, BG), timeout = 5.0)
+	assert colors == palette_colors(PALETTE[:16])
+	assert seconds < 2.0                                       ## Each batch ends at the DA1 reply
+
+def test_no_da1_reply_waits_for_the_timeout() -> None:
+	handlers = palette_handlers(PALETTE, FG, BG)[:-1]
+	(colors, seconds, _) = query(handlers, batch = 256, timeout = 0.3)
+	assert colors == palette_colors(PALETTE)
+	assert seconds >= 0.3
+
+def test_silent_terminal() -> None:
+	(colors, seconds, _) = query([], batch = 256, timeout = 0.2)
+	assert colors == {}
+	assert seconds >= 0.2
+
+def test_partial_palette_does_not_replace_complete_one(tmp_path) -> None:
+	path = tmp_path / 'palette.json'
+	assert replace_json(path, palette_colors(PALETTE), known_colors)
+	assert not replace_json(path, palette_colors(PALETTE[:16]), known_colors)
+	assert read_json(path) == palette_colors(PALETTE)
+
+def test_other_tty_is_not_cached(tmp_path) -> None:
+	with Scripted_Responder(palette_handlers(PALETTE, FG, BG)) as responder:
+		result = CliRunner().invoke(cli, ['query', '--tty', responder.path, '--format', 'json'], env = {'XDG_CACHE_HOME': str(tmp_path)})
+	assert result.exit_code == 0, result.output
+	assert json.loads(result.output) == palette_colors(PALETTE)
+	assert not (tmp_path / 'display-colors').exists()
+
+def test_refresh_keeps_the_complete_palette(tmp_path, monkeypatch: pytest.MonkeyPatch) -> None:
+	monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path))
+	for palette in (PALETTE, PALETTE[:16]):
+		with Scripted_Responder(palette_handlers(palette, FG, BG)) as responder:
+			monkeypatch.setattr('display_colors.cmd.query.TTY_PATH', responder.path)     ## As if it were this process's terminal
+			result = CliRunner().invoke(cli, ['query', '--tty', responder.path, '--refresh', '--format', 'json'])
+		assert result.exit_code == 0, result.output
+		assert json.loads(result.output) == palette_colors(palette)
+	assert read_json(terminal_cache_path('palette')) == palette_colors(PALETTE)
+
+@pytest.mark.parametrize('cached', [['#000000'], {'0': 7}, {'0': 'red'}, 'palette'])
+def test_cached_palette_of_another_shape_is_queried_again(cached, tmp_path, monkeypatch: pytest.MonkeyPatch) -> None:
+	monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path))
+	path = terminal_cache_path('palette')
+	path.parent.mkdir(parents = True)
+	path.write_text(json.dumps(cached))
+	with Scripted_Responder(palette_handlers(PALETTE, FG, BG)) as responder:
+		monkeypatch.setattr('display_colors.cmd.query.TTY_PATH', responder.path)
+		result = CliRunner().invoke(cli, ['query', '--tty', responder.path])
+	assert result.exit_code == 0, result.output
+	assert 'Foreground: #d0d0d0' in result.output
+	assert read_json(path) == palette_colors(PALETTE)
@@ -0,0 +1,154 @@
+from concurrent.futures import ThreadPoolExecutor
+from itertools          import product
+
+import pytest
+
+from display_colors                     import render
+from display_colors.cell                import (
+	colored_cell,
+	create_attrs,
+	sgr_seq,
+)
+from display_colors.cmd.eight_bit       import (
+	COL_WIDTHS,
+	COMPACT_COL_WIDTHS,
+	FACE_NAME,
+	HALF_BLOCK,
+)
+from display_colors.cmd.twenty_four_bit import (
+	SEGMENT_CELLS,
+	VIEWS,
+	display_truecolor,
+)
+from display_colors.const               import (
+	_8_BIT_PALETTE_CUBE_SIDE,
+	ALL_WEIGHTS,
+	REV_VIDEO,
+	WEIGHT_ATTR,
+)
+from display_colors.decode              import (
+	decode,
+)
+from display_colors.init                import (
+	_4_BIT_BG_REPR_ATTR,
+	_4_BIT_FG_REPR_ATTR,
+	_8_BIT_BG_REPR_ATTR,
+	_8_BIT_FG_REPR_ATTR,
+)
+from display_colors.palette             import (
+	CUBE_VIEWS,
+	view_codes,
+)
+
+## Calls rendering different options, so that threads share the caches while each builds other rows
+
+CALLS = [
+	lambda: render.four_bit(),
+	lambda: render.four_bit(weights = ['all'], reverse_video = True, transpose = True),
+	lambda: render.four_bit(stanzas = True, gutter = '|', fit = 60),
+	lambda: render.four_bit(fmt = 'ndjson'),
+	lambda: render.eight_bit(),
+	lambda: render.eight_bit(decimal = True, faces = ['back', 'bottom', 'right']),
+	lambda: render.eight_bit(compact = True, fit = 40),
+	lambda: render.eight_bit(fmt = 'csv'),
+]
+
+def test_threads_render_what_one_thread_does() -> None:
+	serial = [''.join(call()) for call in CALLS]
+	with ThreadPoolExecutor(max_workers = 8) as pool:
+		threaded = list(pool.map(lambda i: ''.join(CALLS[i % len(CALLS)]()), range(8 * len(CALLS))))
+	assert threaded == serial * 8
+
+@pytest.mark.parametrize('call', [
+	lambda: render.four_bit(col_width = -3),
+	lambda: render.four_bit(col_width = '7'),
+	lambda: render.four_bit(text = None),
+	lambda: render.four_bit(gutter = 3),
+	lambda: render.four_bit(weights = [3]),
+	lambda: render.four_bit(fit = 0),
+	lambda: render.four_bit(fmt = 'html'),
+	lambda: render.eight_bit(std_col_width = -1),
+	lambda: render.eight_bit(rgb_col_width = -1, compact = True),
+	lambda: render.eight_bit(gray_col_width = 2.5),
+	lambda: render.eight_bit(faces = ['inside']),
+	lambda: render.twenty_four_bit(width = 1),
+	lambda: render.twenty_four_bit(width = '80'),
+	lambda: render.twenty_four_bit(slices = 0),
+	lambda: render.effects(pattern = None),
+	lambda: render.effects(gutter = 1),
+])
+def test_invalid_options_raise_when_called(call) -> None:
+	with pytest.raises(ValueError):
+		call()                                                   ## Not iterated: no row is rendered
+
+## The sequences are interned: each is what the original formatting built for every cell, and built once
+
+def uncached_cell(weight: str, fg_repr: str, bg_repr: str, rev_video: bool, _8_bit: bool, text: str) -> str:
+	(fg, bg) = (bg_repr, fg_repr) if rev_video else (fg_repr, bg_repr)
+	(fg_attr, bg_attr) = (_8_BIT_FG_REPR_ATTR, _8_BIT_BG_REPR_ATTR) if _8_bit else (_4_BIT_FG_REPR_ATTR, _4_BIT_BG_REPR_ATTR)
+	attrs = f'{WEIGHT_ATTR[weight]};{fg_attr[fg]};{bg_attr[bg]}{f";{REV_VIDEO}" if rev_video else ""}'
+	return f'\033[{attrs}m{text}\033[0m'
+
+@pytest.mark.parametrize('_8_bit', [False, True])
+def test_interned_cells_are_the_original_sequences(_8_bit: bool) -> None:
+	reprs = sorted(set(_8_BIT_FG_REPR_ATTR) & set(_8_BIT_BG_REPR_ATTR) if _8_bit else set(_4_BIT_FG_REPR_ATTR) & set(_4_BIT_BG_REPR_ATTR))
+	for (weight, fg, bg, rev_video) in product(ALL_WEIGHTS, reprs[:24], reprs[-24:], (False, True)):
+		attrs = create_attrs(weight, fg, bg, rev_video, _8_bit)
+		assert str(colored_cell(attrs, ' gYw ')) == uncached_cell(weight, fg, bg, rev_video, _8_bit, ' gYw ')
+		assert create_attrs(weight, fg, bg, rev_video, _8_bit) is attrs
+		assert sgr_seq(attrs) is sgr_seq(attrs)
+
+## 24-bit: every pattern line fills the width, ramps run from black to full, and wide lines are built a segment at a time
+
+def pattern_lines(grid) -> list[list]:
+	return [grid.renditions[y] for y in range(len(grid.chars)) if grid.renditions[y][:1] and grid.renditions[y][0].bg.startswith('48;2;')]
+
+@pytest.mark.parametrize('width', [2, 10, 81, 3000])
+def test_24_bit_lines_fill_the_width(width: int) -> None:
+	(ramps, hue, cube) = (pattern_lines(decode(render.twenty_four_bit(views = [view], width = width, height = 3, slices = 4))) for view in VIEWS)
+	assert (len(ramps), len(hue), len(cube)) == (4, 3, 3)
+	assert all(len(line) == width for line in ramps + hue)
+	assert all(width - 4 < len(line) <= width for line in cube)       ## Slices of equal width, as many columns as divide evenly
+
+def test_24_bit_ramps_run_from_black_to_full() -> None:
+	ramps = pattern_lines(decode(render.twenty_four_bit(views = ['ramps'], width = 120)))
+	assert [(line[0].bg, line[-2].bg) for line in ramps] == [
+		('48;2;0;0;0', '48;2;255;0;0'),
+		('48;2;0;0;0', '48;2;0;255;0'),
+		('48;2;0;0;0', '48;2;0;0;255'),
+		('48;2;0;0;0', '48;2;255;255;255'),
+	]
+
+def test_24_bit_slices_are_clamped_to_the_width() -> None:
+	cube = pattern_lines(decode(render.twenty_four_bit(views = ['cube'], width = 6, height = 2, slices = 100)))
+	assert [len(line) for line in cube] == [6, 6]
+	assert len({rendition.bg for rendition in cube[0] if rendition.bg.startswith('48;2;')}) == 3    ## A slice a cell wide, and a gap
+
+def test_24_bit_wide_lines_are_built_in_segments() -> None:
+	rows = display_truecolor(['ramps', 'hue', 'cube'], 100_000, 2, 2)
+	assert max(len(row) for row in rows) <= SEGMENT_CELLS + 1
+
+## 8-bit --compact: each character cell shows two rows of the cube, the upper in FG and the lower in BG
+
+def cube_lines(grid, cell_w: int) -> list[list]:
+	"""The renditions of the cells on the lines of cube colors (the codes from 16 to 231), one per cell of cell_w columns"""
+	cube = lambda rendition: rendition.bg.startswith('48;5;') and 16 <= int(rendition.bg.split(';')[2]) <= 231
+	return [line[0::cell_w] for line in (list(filter(cube, grid.renditions[y])) for y in range(len(grid.chars))) if line]
+
+@pytest.mark.parametrize('face', CUBE_VIEWS)
+def test_compact_shows_two_cube_rows_per_line(face: str) -> None:
+	full    = cube_lines(decode(render.eight_bit(faces = [face])), COL_WIDTHS[1])
+	compact = decode(render.eight_bit(faces = [face], compact = True))
+	side    = _8_BIT_PALETTE_CUBE_SIDE
+	codes   = view_codes(CUBE_VIEWS[face])
+	rows    = [codes[y * side ** 2:(y + 1) * side ** 2] for y in range(side)]
+	assert len(full) == side and len(cube_lines(compact, COMPACT_COL_WIDTHS[1])) == side // 2
+	assert [[int(r.bg.split(';')[2]) for r in line] for line in full] == [list(row) for row in rows]
+	assert [[(r.fg, r.bg) for r in line] for line in cube_lines(compact, COMPACT_COL_WIDTHS[1])] == [[(f'38;5;{upper}', f'48;5;{lower}') for upper, lower in zip(rows[y], rows[y + 1])] for y in range(0, side, 2)]
+	assert all(set(''.join(compact.chars[y])) <= {HALF_BLOCK, ' '} for y in range(len(compact.chars)) if HALF_BLOCK in compact.chars[y])
+
+@pytest.mark.parametrize('compact', [False, True])
+def test_faces_are_shown_once_in_the_given_order(compact: bool) -> None:
+	lines = ''.join(render.eight_bit(faces = ['back', 'top', 'back', 'right', 'top'], compact = compact)).split('\n')
+	cube  = 'RGB cube' if compact else 'RGB palette cube'
+	assert [line for line in lines if line.startswith(cube) or line[:-1].lower() in FACE_NAME.values()] == [f'{cube}, back:', 'Top:', 'Right side:']
@@ -0,0 +1,92 @@
+import asyncio
+import threading
+from collections.abc import Iterator
+
+import pytest
+
+from display_colors        import server
+from display_colors.server import (
+	HOST,
+	MAX_INT_VALUE,
+	MAX_TEXT_LENGTH,
+	STREAM_CHUNK_SIZE,
+	Pattern_Request,
+	Preview_Server,
+	Response_Cache,
+)
+from display_colors.themes import (
+	XTERM_THEME,
+)
+
+async def get(port: int, target: str, version: str = 'HTTP/1.1') -> bytes:
+	(reader, writer) = await asyncio.open_connection(HOST, port)
+	writer.write(f'GET {target} {version}\r\nConnection: close\r\n\r\n'.encode())
+	response = await reader.read()
+	writer.close()
+	return response
+
+def fetch(preview: Preview_Server, target: str, version: str = 'HTTP/1.1') -> bytes:
+	"""The bytes a client is sent for one GET request, up to when the server closes the connection"""
+	async def serve_one() -> bytes:
+		listener = await asyncio.start_server(preview.handle, HOST, 0)
+		async with listener:
+			return await get(listener.sockets[0].getsockname()[1], target, version)
+	return asyncio.run(serve_one())
+
+@pytest.mark.parametrize('version', ['HTTP/1.1', 'HTTP/1.0'])
+def test_invalid_option_is_a_bad_request(version: str) -> None:
+	response = fetch(Preview_Server(XTERM_THEME, 4), '/4-bit?col-width=-3', version)
+	assert response.startswith(b'HTTP/1.1 400 ')
+	assert b'col_width' in response
+
+def test_streamed_response_is_complete() -> None:
+	response = fetch(Preview_Server(XTERM_THEME, 4), '/8-bit?output=ansi')
+	assert b'Transfer-Encoding: chunked' in response
+	assert response.endswith(b'\r\n0\r\n\r\n')
+
+def test_error_while_streaming_ends_the_response(monkeypatch: pytest.MonkeyPatch) -> None:
+	def failing(**options) -> Iterator[str]:
+		yield 'x' * STREAM_CHUNK_SIZE
+		raise ValueError('Failed after the head')
+	monkeypatch.setitem(server.PATTERNS, '4-bit', failing)
+	preview  = Preview_Server(XTERM_THEME, 4)
+	response = fetch(preview, '/4-bit?output=ansi')
+	assert response.startswith(b'HTTP/1.1 200 ')
+	assert not response.endswith(b'0\r\n\r\n')
+	assert not preview.cache.bodies
+
+@pytest.mark.parametrize('target', [f'/4-bit?col-width={MAX_INT_VALUE + 1}', '/8-bit?fit=100000000', f'/4-bit?text={"x" * (MAX_TEXT_LENGTH + 1)}', f'/effects?pattern={"x" * 10 ** 4}'])
+def test_oversized_option_is_a_bad_request(target: str) -> None:
+	response = fetch(Preview_Server(XTERM_THEME, 2 ** 20), target)
+	assert response.startswith(b'HTTP/1.1 400 ')
+
+def test_cache_is_bounded_by_bytes() -> None:
+	cache    = Response_Cache(100)
+	requests = [Pattern_Request('4-bit', 'ansi', (('text', str(i)),)) for i in range(4)]
+	for request in requests[:3]:
+		cache.put(request, b'x' * 40)
+	assert list(cache.bodies) == requests[1:3] and cache.n_bytes == 80
+	cache.get(requests[1])
+	cache.put(requests[3], b'x' * 30)
+	assert list(cache.bodies) == [requests[1], requests[3]] and cache.n_bytes == 70
+	cache.put(requests[0], b'x' * 101)                             ## Larger than the whole cache: not kept
+	assert requests[0] not in cache.bodies and cache.n_bytes == 70
+
+def test_rendering_does_not_block_other_clients(monkeypatch: pytest.MonkeyPatch) -> None:
+	other_served = threading.Event()
+	def slow(**options) -> Iterator[str]:
+		yield 'served meanwhile' if other_served.wait(5) else 'blocked'
+	monkeypatch.setitem(server.PATTERNS, '4-bit', slow)
+
+	async def clients() -> tuple[bytes, bytes]:
+		listener = await asyncio.start_server(Preview_Server(XTERM_THEME, 2 ** 20).handle, HOST, 0)
+		async with listener:
+			port = listener.sockets[0].getsockname()[1]
+			slow_response = asyncio.create_task(get(port, '/4-bit?output=ansi'))
+			await asyncio.sleep(0.1)
+			index = await asyncio.wait_for(get(port, '/'), 2)
+			other_served.set()
+			return (await slow_response, index)
+	(slow_response, index) = asyncio.run(clients())
+	assert index.startswith(b'HTTP/1.1 200 ')
+	assert b'served meanwhile' in slow_response
@@ -0,0 +1,37 @@
+import re
+
+from display_colors.cell  import (
+	Cell,
+)
+from display_colors.watch import (
+	Screen,
+	screen_lines,
+)
+
+CURSOR_MOVE = re.compile(r'\033\[(\d+);(\d+)H')
+
+def frame(changed: int = -1) -> list:
+	"""Four lines of ten cells, the cell at changed (line * 10 + column) in another color"""
+	return [[f'{y}:'] + [Cell('0;30;4' + ('1' if y * 10 + x == changed else '2'), f'{x:^3}') for x in range(10)] for y in range(4)]
+
+def test_unchanged_frame_writes_nothing() -> None:
+	screen = Screen()
+	assert screen.update(screen_lines(frame()), 80, 24)
+	assert screen.update(screen_lines(frame()), 80, 24) == ''
+
+def test_one_cell_change_rewrites_only_its_span() -> None:
+	screen = Screen()
+	screen.update(screen_lines(frame()), 80, 24)
+	out = screen.update(screen_lines(frame(changed = 2 * 10 + 5)), 80, 24)
+	assert [m.groups() for m in CURSOR_MOVE.finditer(out)] == [('3', str(len('2:') + 5 * 3 + 1))]
+	assert out.count('\033[0;30;41m') == 1 and ' 5 ' in out and ' 4 ' not in out and ' 6 ' not in out
+	assert screen.update(screen_lines(frame()), 80, 24).count('\033[0;30;42m') == 1
+
+def test_resize_redraws_everything() -> None:
+	screen = Screen()
+	screen.update(screen_lines(frame()), 80, 24)
+	out = screen.update(screen_lines(frame()), 100, 30)
+	assert out.startswith('\033[2J')
+	assert [m.group(1) for m in CURSOR_MOVE.finditer(out)] == ['1', '2', '3', '4']
+	assert out.count('\033[0;30;42m') == 4 * 10
+	assert screen.update(screen_lines(frame()), 100, 30) == ''